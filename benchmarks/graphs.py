@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: networkx
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Generates synthetic context graphs in the Verum schema for the benchmarks.
+
+ NOTES:
+ Graphs grow outward from the topic nodes.  Each new attribute node describes one to three existing nodes
+  (existing -describedBy-> new) chosen in proportion to their degree, so a few nodes become hubs the way shared
+  name servers, ASNs, and registrant organizations do in real enrichment data.  Each edge of a node whose key is
+  in HUB_KEYS counts extra, so those nodes grow into the largest hubs.
+ Edges always point from older to newer nodes so the graph is acyclic (bayes_net does not tolerate cycles).
+ Nodes carry class, key, value, uri, start_time and topic_distance.  Edges carry relationship, origin, confidence,
+  start_time, and uri.  The same seed always generates the same graph.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+KEYS = [("domain", 4), ("ip", 4), ("email", 2), ("nameserver", 1), ("asn", 1), ("organization", 1)]  # (key, weight)
+HUB_KEYS = {"nameserver": 2, "asn": 2, "organization": 1}  # Extra weight per edge of a key when picking nodes to describe
+EDGES_PER_NODE = [(1, 6), (2, 3), (3, 1)]  # (existing nodes a new node describes, weight)
+PREFERENTIAL = 0.8  # Chance a described node is picked by degree rather than uniformly
+START_TIME = "2015-01-01T00:00:00Z"
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import random
+import inspect
+import sys
+import imp
+import networkx as nx
+
+## SETUP
+__author__ = "Gabriel Bassett"
+loc = inspect.getfile(inspect.currentframe())
+i = loc.rfind("/")
+loc = loc[:i+1]
+# Shared URI builders so the graphs match those the plugins produce
+uris = sys.modules.get("verum.uri", sys.modules.get("verum_uri"))
+if uris is None:
+    fp, pathname, description = imp.find_module("uri", [loc + "../verum/"])
+    uris = imp.load_module("verum_uri", fp, pathname, description)
+
+
+## EXECUTION
+def weighted(choices):
+    """ Expands [(value, weight), ...] into a list random.choice() picks from in proportion to the weights. """
+    out = list()
+    for value, weight in choices:
+        out.extend([value] * weight)
+    return out
+
+
+def value_of(key, n):
+    """
+
+    :param key: the node key
+    :param n: the node number
+    :return: a unique, realistic looking value for the key
+    """
+    if key == "ip":
+        return "10.{0}.{1}.{2}".format((n >> 16) & 255, (n >> 8) & 255, n & 255)
+    if key == "email":
+        return "user{0}@mail{1}.com".format(n, n % 97)
+    if key == "nameserver":
+        return "ns{0}.dns{1}.net".format(n % 2, n)
+    if key == "asn":
+        return "AS{0}".format(n)
+    if key == "organization":
+        return "Organization {0}".format(n)
+    return "d{0}.example.com".format(n)
+
+
+def context_graph(size, topics=1, seed=0):
+    """ int, int, int -> networkx MultiDiGraph, networkx MultiDiGraph
+
+    :param size: number of nodes in the context graph (including the topics)
+    :param topics: number of topic nodes
+    :param seed: random seed.  The same seed generates the same graph.
+    :return: the context graph and a graph of its topic nodes (as passed to app.score_subgraph())
+    """
+    rand = random.Random(seed)
+    keys = weighted(KEYS)
+    fan_out = weighted(EDGES_PER_NODE)
+    g = nx.MultiDiGraph()
+    topic = nx.MultiDiGraph()
+    nodes = list()  # node URIs by number
+    distances = list()  # topic_distance by number
+    hub = list()  # extra weight of each node number from HUB_KEYS
+    targets = list()  # node numbers, each repeated by degree (and hub weight) for preferential picks
+
+    for n in range(min(topics, size)):
+        uri = uris.node_uri("domain", value_of("domain", n))
+        attr = {"class": "attribute", "key": "domain", "value": value_of("domain", n), "uri": uri,
+                "start_time": START_TIME, "topic_distance": 0}
+        g.add_node(uri, attr)
+        topic.add_node(uri, dict(attr))
+        nodes.append(uri)
+        distances.append(0)
+        hub.append(0)
+        targets.append(n)
+
+    for n in range(len(nodes), size):
+        key = rand.choice(keys)
+        value = value_of(key, n)
+        uri = uris.node_uri(key, value)
+
+        described = set()
+        for _ in range(min(rand.choice(fan_out), n)):
+            if rand.random() < PREFERENTIAL:
+                described.add(rand.choice(targets))
+            else:
+                described.add(rand.randrange(n))
+
+        distance = min(distances[d] for d in described) + 1
+        g.add_node(uri, {"class": "attribute", "key": key, "value": value, "uri": uri, "start_time": START_TIME,
+                         "topic_distance": distance})
+        nodes.append(uri)
+        distances.append(distance)
+        hub.append(HUB_KEYS.get(key, 0))
+
+        for d in described:
+            attr = {"relationship": "describedBy", "origin": "benchmark", "start_time": START_TIME,
+                    "confidence": round(rand.uniform(0.5, 1.0), 2)}
+            attr["uri"] = uris.edge_uri(nodes[d], uri, attr)
+            g.add_edge(nodes[d], uri, attr["uri"], attr)
+            targets.extend([d] * (1 + hub[d]))
+        targets.extend([n] * (1 + hub[n]))
+
+    return g, topic
+
+
+def describe(g):
+    """
+
+    :param g: a context graph
+    :return: dictionary of its size and hub structure (e.g. to print alongside benchmark results)
+    """
+    degrees = sorted(g.degree().values(), reverse=True)
+    distances = nx.get_node_attributes(g, "topic_distance").values()
+    return {
+        'nodes': g.number_of_nodes(),
+        'edges': g.number_of_edges(),
+        'max_degree': degrees[0] if degrees else 0,
+        'top_1pct_edge_share': sum(degrees[:max(1, len(degrees) / 100)]) / float(max(1, sum(degrees))),
+        'max_topic_distance': max(distances) if distances else 0
+    }
+
+
+def fragments(g, nodes_per_fragment=10):
+    """ networkx graph, int -> generator of networkx MultiDiGraphs
+
+    :param g: a context graph from context_graph()
+    :param nodes_per_fragment: new nodes per fragment
+    :return: the graph split into enrichment fragments in the order it grew.  Each fragment holds its new nodes, the
+              edges describing them, and the nodes they describe, the way an enrichment returns a topic and the
+              attributes it found.
+    """
+    order = nx.topological_sort(g)
+    for start in range(0, len(order), nodes_per_fragment):
+        new_nodes = order[start:start + nodes_per_fragment]
+        f = nx.MultiDiGraph()
+        for n in new_nodes:
+            f.add_node(n, dict(g.node[n]))
+        for src, dst, key, data in g.in_edges_iter(new_nodes, data=True, keys=True):
+            if src not in f:
+                f.add_node(src, dict(g.node[src]))
+            f.add_edge(src, dst, key, dict(data))
+        yield f
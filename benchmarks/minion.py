@@ -0,0 +1,511 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: networkx, yapsy, and the minion's own dependencies (requests, tldextract, pandas)
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Benchmarks the ingest throughput of a minion against a replayed feed and replayed enrichments.
+
+ NOTES:
+ e.g. python benchmarks/minion.py --minion alexa --rows 5000
+      python benchmarks/minion.py --minion bambenek_v2 --feed c2-masterlist.txt --responses responses.jsonl
+      python benchmarks/minion.py --minion bambenek_v2 --feed c2-masterlist.txt --record responses.jsonl
+ The feed (a recorded file given with --feed, or a synthetic one of --rows rows in the minion's format) is served
+  by a local stand-in (see standins.py) and the minion's FEED is pointed at it.  The minion's minion() loop is run
+  for one cycle: it stops after the flush() at the end of the cycle.
+ Enrichments are replayed rather than run: the app's run_enrichments() answers from --responses, a JSONL file of
+  {"plugin": .., "topic": .., "topic_type": .., "seconds": .., "graph": <node link data>}, one line per enrichment
+  call.  Calls with no recorded response are answered with a small synthetic graph of the plugin's shape and
+  counted as synthesized.  --latency sleeps the recorded seconds of each replayed response.  --record runs the
+  real enrichment plugins instead and writes their responses to the file for later replays.
+ Reports rows per second, the time and calls of each stage (fetch, classify, each enrichment, sanitize, store,
+  flush, and the minion's own parsing and graph building), and peak memory (maximum resident set size, and how far
+  it rose during the cycle).  With write-behind on, store only buffers the graphs and the writes are timed under
+  flush and the buffer's thread.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+MINIONS = {"alexa": "alexa_1M",
+           "bambenek": "osint_bambenekconsulting_com",
+           "bambenek_v2": "osint_bambenekconsulting_com_v2"}  # benchmark name -> minion module
+FEEDS = {"alexa_1M": ("/top-1m.csv.zip", "application/zip"),
+         "osint_bambenekconsulting_com": ("/c2-masterlist.txt", "text/plain"),
+         "osint_bambenekconsulting_com_v2": ("/c2-masterlist.txt", "text/plain")}  # minion -> (feed path, type)
+ROWS = 1000  # Rows in a synthetic feed
+STORAGE = "Networkx Interface"  # Storage the minion writes to
+SUFFIXES = ["com", "net", "org", "info", "co.uk", "ru", "de"]  # Suffixes of synthetic domains
+MALWARE = ["banjori", "cryptolocker", "necurs", "ramnit", "tinba", "pykspa"]  # Families in synthetic bambenek feeds
+FEED_TIME = "2015-10-18 14:04"  # Generation time of synthetic bambenek feeds
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import argparse
+import logging
+import inspect
+import imp
+import json
+import random
+import time
+import zipfile
+import zlib
+from StringIO import StringIO
+import networkx as nx
+from networkx.readwrite import json_graph
+from score import rss, peak_rss
+import standins
+
+## SETUP
+__author__ = "Gabriel Bassett"
+loc = inspect.getfile(inspect.currentframe())
+i = loc.rfind("/")
+loc = loc[:i+1]
+# Parse Arguments (should correspond to user variables)
+parser = argparse.ArgumentParser(description='Benchmarks the ingest throughput of a minion over a replayed feed.')
+parser.add_argument('-d', '--debug',
+                    help='Print lots of debugging statements',
+                    action="store_const", dest="loglevel", const=logging.DEBUG,
+                    default=logging.WARNING
+                   )
+parser.add_argument('-v', '--verbose',
+                    help='Be verbose',
+                    action="store_const", dest="loglevel", const=logging.INFO
+                   )
+parser.add_argument('--log', help='Location of log file', default=None)
+parser.add_argument('--minion', help='Minion to benchmark', choices=sorted(MINIONS), default="alexa")
+parser.add_argument('--feed', help='Recorded feed file to serve.  Defaults to a synthetic feed.', default=None)
+parser.add_argument('--rows', help='Rows in the synthetic feed', type=int, default=ROWS)
+parser.add_argument('--seed', help='Random seed of the synthetic feed', type=int, default=0)
+parser.add_argument('--responses', help='JSONL file of recorded enrichment responses to replay', default=None)
+parser.add_argument('--record', help='Run the real enrichments and write their responses to this JSONL file',
+                    default=None)
+parser.add_argument('--latency', help='Sleep the recorded time of each replayed enrichment', action="store_true")
+parser.add_argument('--storage', help='Storage plugin the minion writes to', default=STORAGE)
+parser.add_argument('--save', help='Write the results to this JSON file', default=None)
+
+
+## EXECUTION
+def synthetic_domain(rand, n):
+    return "site{0}-{1}.{2}".format(n, rand.randrange(1000), rand.choice(SUFFIXES))
+
+
+def synthetic_ip(rand):
+    return "{0}.{1}.{2}.{3}".format(rand.randrange(1, 224), rand.randrange(256), rand.randrange(256),
+                                    rand.randrange(1, 255))
+
+
+def synthetic_feed(module, rows, seed=0):
+    """
+
+    :param module: the minion module (a key of FEEDS)
+    :param rows: number of records in the feed
+    :param seed: random seed.  The same seed generates the same feed.
+    :return: the feed file's bytes in the format the minion downloads
+    """
+    rand = random.Random(seed)
+    if module == "alexa_1M":
+        lines = ["{0},{1}".format(n + 1, synthetic_domain(rand, n)) for n in range(rows)]
+        out = StringIO()
+        z = zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED)
+        z.writestr("top-1m.csv", "\n".join(lines) + "\n")
+        z.close()
+        return out.getvalue()
+
+    lines = ["#############################################################",
+             "## Master Feed of known, active and non-sinkholed C&Cs",
+             "## Feed generated at: {0} ".format(FEED_TIME),
+             "##",
+             "#############################################################"]
+    for n in range(rows):
+        malware = rand.choice(MALWARE)
+        source = "http://osint.bambenekconsulting.com/manual/{0}.txt".format(malware)
+        if module == "osint_bambenekconsulting_com":
+            kind = rand.choice(["Domain", "Domain", "IP", "Nameserver", "Nameserver IP"])
+            if kind.endswith("IP"):
+                indicator = synthetic_ip(rand)
+            else:
+                indicator = synthetic_domain(rand, n)
+            threat = malware + (" C&C" if rand.random() < 0.5 else "")
+            lines.append("{0},{1} used by {2},{3},{4}".format(indicator, kind, threat, FEED_TIME, source))
+        else:
+            domain = synthetic_domain(rand, n)
+            ips = [synthetic_ip(rand) for _ in range(rand.randrange(1, 4))]
+            nameservers = ["ns{0}.{1}".format(k + 1, synthetic_domain(rand, n)) for k in range(2)]
+            ns_ips = [synthetic_ip(rand) for _ in range(2 * rand.randrange(1, 3))]
+            lines.append("{0},{1},{2},{3},Master Indicator Feed for {4} non-sinkholed domains,{5}".format(
+                domain, "|".join(ips), "|".join(nameservers), "|".join(ns_ips), malware, source))
+    return "\n".join(lines) + "\n"
+
+
+def count_rows(module, data):
+    """
+
+    :param module: the minion module
+    :param data: the feed file's bytes
+    :return: number of records the minion will read from the feed
+    """
+    if module == "alexa_1M":
+        z = zipfile.ZipFile(StringIO(data))
+        return len([l for l in z.read("top-1m.csv").split("\n") if l.strip()])
+    if module == "osint_bambenekconsulting_com":
+        return len([l for l in data.split("\n") if l and l[0] != "#" and len(l.split(",")) == 4])
+    return len([l for l in data.split("\n") if len(l.split(",")) == 6])
+
+
+class Stages():
+    """ Accumulates the time and calls of each stage of a minion cycle. """
+    seconds = None  # stage -> seconds
+    calls = None  # stage -> calls
+    order = None  # stages in the order first seen
+
+    def __init__(self):
+        self.seconds = dict()
+        self.calls = dict()
+        self.order = list()
+
+
+    def add(self, stage, seconds):
+        if stage not in self.seconds:
+            self.seconds[stage] = 0.0
+            self.calls[stage] = 0
+            self.order.append(stage)
+        self.seconds[stage] += seconds
+        self.calls[stage] += 1
+
+
+    def wrap(self, stage, fn):
+        """
+
+        :param stage: name of the stage
+        :param fn: the function the stage calls
+        :return: fn, timed under the stage
+        """
+        def timed(*args, **kwargs):
+            start = time.time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(stage, time.time() - start)
+        return timed
+
+
+    def report(self, total):
+        """
+
+        :param total: seconds of the whole cycle
+        :return: list of dictionaries of each stage's seconds, calls, and share of the cycle.  The time not spent in
+                  a stage is the minion's own ("minion (parse and build)").
+        """
+        stages = list()
+        for stage in self.order:
+            stages.append({'stage': stage, 'seconds': self.seconds[stage], 'calls': self.calls[stage],
+                           'share': self.seconds[stage] / total if total else None})
+        own = max(total - sum(self.seconds.values()), 0)
+        stages.append({'stage': "minion (parse and build)", 'seconds': own, 'calls': 1,
+                       'share': own / total if total else None})
+        return stages
+
+
+def topic_key(topic):
+    """ The topic of an enrichment call as a string.  (Cymru is called with a set of IPs.) """
+    if isinstance(topic, basestring):
+        return topic
+    return "|".join(sorted(topic))
+
+
+def synthetic_response(uris, name, topic, topic_type):
+    """
+
+    :param uris: the verum uri module
+    :param name: name of the enrichment plugin
+    :param topic: the topic enriched (a set of IPs for Cymru)
+    :param topic_type: the type of the topic
+    :return: a small deterministic graph of the shape the plugin returns: the topic, an enrichment node, and the
+              attributes the plugin finds
+    """
+    g = nx.MultiDiGraph()
+    topics = [topic] if isinstance(topic, basestring) else sorted(topic)
+    for t in topics:
+        h = zlib.crc32(name + t) & 0xffffffff
+        if name == "DNS Enrichment":
+            found = [("ip", "10.{0}.{1}.{2}".format((h >> 16) & 255, (h >> 8) & 255, (h + k) & 255)) for k in range(2)]
+        elif name == "TLD Enrichment":
+            found = [("domain", t.split(".", 1)[-1])]
+        elif name == "IP Whois Enrichment":
+            found = [("organization", "Organization {0}".format(h % 1000))]
+        else:  # Maxmind, Cymru and any other IP enrichment
+            found = [("asn", "AS{0}".format(h % 65536))]
+        key = topic_type or "ip"
+        topic_uri = uris.node_uri(key, t)
+        g.add_node(topic_uri, {'class': 'attribute', 'key': key, 'value': t, 'uri': topic_uri})
+        enrichment_uri = uris.node_uri("enrichment", name)
+        g.add_node(enrichment_uri, {'class': 'attribute', 'key': "enrichment", 'value': name, 'uri': enrichment_uri})
+        for k, v in found:
+            node_uri = uris.node_uri(k, v)
+            g.add_node(node_uri, {'class': 'attribute', 'key': k, 'value': v, 'uri': node_uri})
+            edge_attr = {"relationship": "describedBy", "origin": name}
+            edge_attr["uri"] = uris.edge_uri(topic_uri, node_uri, edge_attr)
+            g.add_edge(topic_uri, node_uri, edge_attr["uri"], edge_attr)
+    return g
+
+
+class Replay():
+    """ Stands in for the app's run_enrichments(), answering from recorded responses (or recording them). """
+    Verum = None  # The verum module
+    responses = None  # (plugin, topic) -> (seconds, networkx graph)
+    stages = None
+    latency = False  # Sleep the recorded seconds of each response
+    live = None  # The app's real run_enrichments() when recording
+    out = None  # The open file responses are recorded to
+    replayed = 0
+    synthesized = 0
+    recorded = 0
+
+    def __init__(self, Verum, stages, responses=None, latency=False, live=None, record=None):
+        """
+
+        :param Verum: the verum module
+        :param stages: Stages the enrichments are timed under (as "enrich: <plugin>")
+        :param responses: JSONL file of recorded responses to replay
+        :param latency: If true, replays sleep the recorded seconds of the response
+        :param live: the app's real run_enrichments().  Required to record.
+        :param record: JSONL file to record the real enrichments' responses to
+        """
+        self.Verum = Verum
+        self.stages = stages
+        self.latency = latency
+        self.live = live
+        self.responses = dict()
+        if responses is not None:
+            self.load(responses)
+        if record is not None:
+            if live is None:
+                raise ValueError("Recording responses requires the app's run_enrichments().")
+            self.out = open(record, "w")
+
+
+    def load(self, path):
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                r = json.loads(line)
+                g = json_graph.node_link_graph(r['graph'], directed=True, multigraph=True)
+                self.responses[(r['plugin'], r['topic'])] = (r.get('seconds', 0), g)
+
+
+    def enrich(self, name, topic, topic_type):
+        """
+
+        :return: the response of one enrichment plugin to the topic
+        """
+        if self.out is not None:
+            start = time.time()
+            g = self.live(topic, topic_type, names=[name])
+            seconds = time.time() - start
+            self.out.write(json.dumps({'plugin': name, 'topic': topic_key(topic), 'topic_type': topic_type,
+                                       'seconds': seconds, 'graph': json_graph.node_link_data(g)},
+                                      default=str) + "\n")
+            self.recorded += 1
+            return g
+
+        response = self.responses.get((name, topic_key(topic)))
+        if response is None:
+            self.synthesized += 1
+            return synthetic_response(self.Verum.uri, name, topic, topic_type)
+        self.replayed += 1
+        seconds, g = response
+        if self.latency and seconds:
+            time.sleep(seconds)
+        return g.copy()  # The minion merges into and sanitizes what it's given
+
+
+    def run_enrichments(self, topic, topic_type=None, names=None, *args, **kwargs):
+        """ The app's run_enrichments() for the named enrichments.  Without names, nothing is enriched. """
+        g = self.Verum.GraphAccumulator()
+        for name in names or []:
+            g.add(self.stages.wrap("enrich: " + name, self.enrich)(name, topic, topic_type))
+        return g.build()
+
+
+    def close(self):
+        if self.out is not None:
+            self.out.close()
+            self.out = None
+
+
+class Fetcher():
+    """ Stands in for the requests module in a minion so the feed download is timed. """
+    def __init__(self, requests_module, stages):
+        self.get = stages.wrap("fetch", requests_module.get)
+
+
+def load_app(storage):
+    """
+
+    :param storage: name of the storage plugin the minion writes to
+    :return: (the verum module, an app with the repository's plugins and the storage set)
+    """
+    fp, pathname, description = imp.find_module("verum", [loc + "../"])
+    Verum = imp.load_module("verum", fp, pathname, description)
+    app = Verum.app(PluginFolder=loc + "../plugins/", MinionFolder=None)
+    app.set_interface(storage)
+    plugin = app.get_plugin(storage).plugin_object
+    if hasattr(plugin, "context_graph"):
+        plugin.context_graph = nx.MultiDiGraph()  # Don't benchmark against (or add to) a saved graph
+    return Verum, app
+
+
+def load_minion(module, app):
+    """
+
+    :param module: name of a minion module in the minions directory
+    :param app: the verum app the minion runs in
+    :return: (the minion's module, the configured minion plugin object)
+    :raises ValueError: if the minion doesn't configure
+    """
+    fp, pathname, description = imp.find_module(module, [loc + "../minions/"])
+    try:
+        mod = imp.load_module("benchmark_" + module, fp, pathname, description)
+    finally:
+        if fp:
+            fp.close()
+    plugin = mod.PluginOne()
+    config = plugin.configure(parent=app)
+    if not config[1]:
+        raise ValueError("Minion {0} did not configure.  Check its dependencies.".format(module))
+    return mod, plugin
+
+
+def run_cycle(mod, plugin, app, storage, stages):
+    """ Runs the minion's minion() loop for one cycle.
+
+    :param mod: the minion's module
+    :param plugin: the configured minion plugin object
+    :param app: the app the minion was configured with
+    :param storage: the storage the minion writes to
+    :param stages: Stages to time the cycle's stages under
+    :return: seconds the cycle took
+    """
+    mod.requests = Fetcher(mod.requests, stages)
+    app.classify.run = stages.wrap("classify", app.classify.run)
+    plugin.Verum.remove_non_ascii_from_graph = stages.wrap("sanitize", plugin.Verum.remove_non_ascii_from_graph)
+    app.store_graph = stages.wrap("store", app.store_graph)
+
+    flush = stages.wrap("flush", app.flush)
+    def flush_and_stop(*args, **kwargs):
+        flush(*args, **kwargs)
+        plugin.shutdown = True  # The flush ends the cycle.  Stop rather than sleep until the next one.
+    app.flush = flush_and_stop
+
+    plugin.shutdown = False
+    start = time.time()
+    plugin.minion(storage=storage)
+    return time.time() - start
+
+
+def mb(size):
+    return size / float(1024 * 1024)
+
+
+## MAIN LOOP EXECUTION
+def main():
+    args = parser.parse_args()
+    if args.log is not None:
+        logging.basicConfig(filename=args.log, level=args.loglevel)
+    else:
+        logging.basicConfig(level=args.loglevel)
+
+    module = MINIONS[args.minion]
+    if args.feed is not None:
+        with open(args.feed, "rb") as f:
+            data = f.read()
+    else:
+        data = synthetic_feed(module, args.rows, args.seed)
+    rows = count_rows(module, data)
+
+    Verum, app = load_app(args.storage)
+    stages = Stages()
+    replay = Replay(Verum, stages, responses=args.responses, latency=args.latency, live=app.run_enrichments,
+                    record=args.record)
+    app.run_enrichments = replay.run_enrichments
+
+    server = standins.start("feed")
+    try:
+        mod, plugin = load_minion(module, app)
+        path, content_type = FEEDS[module]
+        mod.FEED = server.add(path, data, content_type)
+        print "Serving a {0} byte feed of {1} rows at {2}".format(len(data), rows, mod.FEED)
+
+        start_rss = rss()
+        seconds = run_cycle(mod, plugin, app, args.storage, stages)
+        peak = peak_rss()
+    finally:
+        replay.close()
+        server.stop()
+
+    report = {
+        'minion': module,
+        'feed': args.feed or "synthetic",
+        'feed_bytes': len(data),
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds else None,
+        'stages': stages.report(seconds),
+        'enrichments': {'replayed': replay.replayed, 'synthesized': replay.synthesized, 'recorded': replay.recorded},
+        'peak_rss': peak,
+        'rss_growth': max(peak - start_rss, 0)
+    }
+    storage = app.get_plugin(args.storage).plugin_object
+    if hasattr(storage, "context_graph"):
+        report['stored'] = {'nodes': storage.context_graph.number_of_nodes(),
+                            'edges': storage.context_graph.number_of_edges()}
+
+    print "\n{0}: {1} rows in {2:.2f}s ({3:.1f} rows/s)".format(module, rows, seconds,
+                                                               report['rows_per_second'] or 0)
+    print "  Enrichments: {0} replayed, {1} synthesized, {2} recorded".format(
+        replay.replayed, replay.synthesized, replay.recorded)
+    if 'stored' in report:
+        print "  Storage holds {0} nodes and {1} edges".format(report['stored']['nodes'], report['stored']['edges'])
+    print "  Peak RSS {0:.1f}MB ({1:.1f}MB during the cycle)".format(mb(peak), mb(report['rss_growth']))
+    print "\n  {0:<40} {1:>10} {2:>8} {3:>7}".format("stage", "seconds", "calls", "share")
+    for s in report['stages']:
+        print "  {0:<40} {1:>10.3f} {2:>8} {3:>6.1f}%".format(s['stage'], s['seconds'], s['calls'],
+                                                               100 * (s['share'] or 0))
+
+    if args.save is not None:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+        print "\nSaved results to {0}".format(args.save)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: networkx, yapsy (and the dependencies of the scoring plugins)
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Benchmarks the scoring plugins over synthetic context graphs of increasing size.
+
+ NOTES:
+ e.g. python benchmarks/score.py --sizes 1000,10000,100000 --save /tmp/score.json
+      python benchmarks/score.py --sizes 1000,10000,100000 --baseline /tmp/score.json
+ Each plugin scores each graph in its own forked process so a slow plugin can be stopped at --timeout and its peak
+  memory (maximum resident set size above what it started with) isn't mixed with the other plugins'.
+ Agreement is the overlap of the --top highest scored nodes (excluding the topics): between each pair of plugins
+  on the same graph, and between a plugin and its saved baseline.  Plugins returning a partition (modularity)
+  are compared by the nodes grouped with the topic instead.
+ With --baseline, runs slower or larger than the baseline by more than --tolerance, or agreeing with it less than
+  AGREEMENT, are reported as regressions and the script exits 1.
+ The graphs are generated by graphs.py.  The same --seed always benchmarks the same graphs.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+SIZES = [1000, 10000, 100000]  # Nodes in the context graphs.  (1000000 needs several GB of memory.)
+PLUGINS = ["page_rank", "page_rank_2", "path_count", "bayes_net", "modularity"]  # Plugin modules benchmarked
+TIMEOUT = 300  # Seconds a plugin may score one graph before it is stopped
+TOP = 100  # Highest scored nodes compared for agreement
+TOLERANCE = 0.25  # Fraction slower or larger than the baseline before a run is a regression
+AGREEMENT = 0.9  # Overlap with the baseline's top nodes below which a run is a regression
+MIN_SECONDS = 0.05  # Differences in time smaller than this are noise
+MIN_MB = 5  # Differences in memory smaller than this are noise
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import argparse
+import logging
+import inspect
+import imp
+import json
+import multiprocessing
+import Queue
+import resource
+import sys
+import time
+from graphs import context_graph, describe
+
+## SETUP
+__author__ = "Gabriel Bassett"
+loc = inspect.getfile(inspect.currentframe())
+i = loc.rfind("/")
+loc = loc[:i+1]
+# Parse Arguments (should correspond to user variables)
+parser = argparse.ArgumentParser(description='Benchmarks the scoring plugins over synthetic context graphs.')
+parser.add_argument('-d', '--debug',
+                    help='Print lots of debugging statements',
+                    action="store_const", dest="loglevel", const=logging.DEBUG,
+                    default=logging.WARNING
+                   )
+parser.add_argument('-v', '--verbose',
+                    help='Be verbose',
+                    action="store_const", dest="loglevel", const=logging.INFO
+                   )
+parser.add_argument('--log', help='Location of log file', default=None)
+parser.add_argument('--sizes', help='Comma separated nodes per graph (e.g. 1000,10000)',
+                    default=",".join(str(s) for s in SIZES))
+parser.add_argument('--plugins', help='Comma separated plugin modules to benchmark', default=",".join(PLUGINS))
+parser.add_argument('--seed', help='Random seed of the graphs', type=int, default=0)
+parser.add_argument('--topics', help='Topic nodes per graph', type=int, default=1)
+parser.add_argument('--timeout', help='Seconds a plugin may score one graph', type=float, default=TIMEOUT)
+parser.add_argument('--top', help='Highest scored nodes compared for agreement', type=int, default=TOP)
+parser.add_argument('--save', help='Write the results to this JSON file to use as a baseline', default=None)
+parser.add_argument('--baseline', help='Compare the results to this JSON file from --save', default=None)
+parser.add_argument('--tolerance', help='Fraction slower or larger than the baseline allowed', type=float,
+                    default=TOLERANCE)
+
+
+## EXECUTION
+def load_plugin(module):
+    """
+
+    :param module: name of a scoring plugin module in the plugins directory (e.g. "page_rank")
+    :return: the configured plugin object
+    :raises ValueError: if the plugin doesn't configure (e.g. a dependency is missing)
+    """
+    fp, pathname, description = imp.find_module(module, [loc + "../plugins/"])
+    try:
+        mod = imp.load_module("benchmark_" + module, fp, pathname, description)
+    finally:
+        if fp:
+            fp.close()
+    plugin = mod.PluginOne()
+    config = plugin.configure()
+    if not config[1]:
+        raise ValueError("Plugin {0} did not configure.  Check its dependencies.".format(module))
+    return plugin
+
+
+def rss():
+    """ Current resident set size in bytes (0 where /proc isn't available). """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (IOError, OSError, IndexError, ValueError):
+        return 0
+
+
+def peak_rss():
+    """ Peak resident set size in bytes. """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak  # bytes on OS X
+    return peak * 1024  # kilobytes on Linux
+
+
+def summarize(scores, topic, top):
+    """
+
+    :param scores: dictionary returned by a scoring plugin
+    :param topic: graph of the topic nodes
+    :param top: number of highest scored nodes to keep
+    :return: dictionary of what is compared for agreement
+    """
+    if scores and all(isinstance(v, (int, long)) and not isinstance(v, bool) for v in scores.values()):
+        # A partition (community per node) rather than a score
+        groups = set(scores.get(t) for t in topic.nodes() if t in scores)
+        grouped = sorted(n for n, c in scores.iteritems() if c in groups and n not in topic)
+        return {'kind': 'partition', 'communities': len(set(scores.values())), 'top': grouped[:top]}
+    ranked = sorted((n for n in scores if n not in topic), key=lambda n: (-scores[n], n))
+    return {'kind': 'score', 'top': ranked[:top]}
+
+
+def run_plugin(plugin, sg, topic, top, out):
+    """ Runs in the forked process.  Puts (status, seconds, peak bytes, summary) on out. """
+    start_rss = rss()
+    start = time.time()
+    try:
+        scores = plugin.score(sg, topic)
+        seconds = time.time() - start
+        out.put(("ok", seconds, max(0, peak_rss() - start_rss), summarize(scores, topic, top)))
+    except Exception as e:
+        out.put(("error: {0}".format(repr(e)[:200]), time.time() - start, max(0, peak_rss() - start_rss), None))
+
+
+def benchmark(plugin, sg, topic, top, timeout):
+    """
+
+    :return: dictionary of the status, seconds, peak_mb, and summary of the plugin scoring the graph
+    """
+    out = multiprocessing.Queue()
+    p = multiprocessing.Process(target=run_plugin, args=(plugin, sg, topic, top, out))
+    p.start()
+    try:
+        status, seconds, peak, summary = out.get(timeout=timeout)
+    except Queue.Empty:
+        p.terminate()
+        p.join()
+        return {'status': 'timeout', 'seconds': timeout, 'peak_mb': None, 'summary': None}
+    p.join()
+    return {'status': status, 'seconds': seconds, 'peak_mb': peak / 1048576.0, 'summary': summary}
+
+
+def overlap(a, b):
+    """ Fraction of the larger of two lists of nodes found in both.  None if either is missing. """
+    if a is None or b is None:
+        return None
+    if not a and not b:
+        return 1.0
+    return len(set(a).intersection(b)) / float(max(len(a), len(b)))
+
+
+def agreement(results):
+    """
+
+    :param results: dictionary of plugin -> result for one graph
+    :return: dictionary of "plugin_a/plugin_b" -> overlap of their top nodes for plugins returning scores
+    """
+    scored = sorted(p for p, r in results.iteritems()
+                    if r['summary'] is not None and r['summary']['kind'] == 'score')
+    pairs = dict()
+    for i, a in enumerate(scored):
+        for b in scored[i + 1:]:
+            pairs["{0}/{1}".format(a, b)] = overlap(results[a]['summary']['top'], results[b]['summary']['top'])
+    return pairs
+
+
+def compare(result, base, tolerance):
+    """
+
+    :param result: result of a plugin on a graph
+    :param base: the baseline result of the plugin on the same graph
+    :param tolerance: fraction slower or larger than the baseline allowed
+    :return: list of regressions (strings)
+    """
+    regressions = list()
+    if base['status'] == 'ok' and result['status'] != 'ok':
+        return ["now {0}".format(result['status'])]
+    if result['status'] != 'ok' or base['status'] != 'ok':
+        return regressions
+    if result['seconds'] > base['seconds'] * (1 + tolerance) and result['seconds'] - base['seconds'] > MIN_SECONDS:
+        regressions.append("{0:.2f}s vs {1:.2f}s".format(result['seconds'], base['seconds']))
+    if result['peak_mb'] > base['peak_mb'] * (1 + tolerance) and result['peak_mb'] - base['peak_mb'] > MIN_MB:
+        regressions.append("{0:.1f}MB vs {1:.1f}MB".format(result['peak_mb'], base['peak_mb']))
+    agree = overlap(result['summary']['top'], base['summary']['top'])
+    if agree is not None and agree < AGREEMENT:
+        regressions.append("top nodes {0:.0%} agree".format(agree))
+    return regressions
+
+
+## MAIN LOOP EXECUTION
+def main():
+    args = parser.parse_args()
+    if args.log is not None:
+        logging.basicConfig(filename=args.log, level=args.loglevel)
+    else:
+        logging.basicConfig(level=args.loglevel)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    plugins = dict()
+    for module in [m.strip() for m in args.plugins.split(",") if m.strip()]:
+        try:
+            plugins[module] = load_plugin(module)
+        except Exception as e:
+            logging.warning("Skipping plugin {0} due to {1}.".format(module, e))
+            print "{0}: not benchmarked ({1})".format(module, e)
+
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('seed') != args.seed or baseline.get('topics') != args.topics:
+            raise ValueError("Baseline was run with a different --seed or --topics so its graphs differ.")
+
+    report = {'seed': args.seed, 'topics': args.topics, 'top': args.top, 'graphs': dict(), 'results': dict(),
+              'agreement': dict()}
+    regressions = list()
+    for size in sizes:
+        start = time.time()
+        sg, topic = context_graph(size, args.topics, args.seed)
+        stats = describe(sg)
+        stats['seconds'] = time.time() - start
+        report['graphs'][str(size)] = stats
+        print "\n{0} nodes, {1} edges (max degree {2}, top 1% of nodes hold {3:.0%} of edges) generated in {4:.1f}s".format(
+            stats['nodes'], stats['edges'], stats['max_degree'], stats['top_1pct_edge_share'], stats['seconds'])
+
+        results = dict()
+        for module in sorted(plugins):
+            r = benchmark(plugins[module], sg, topic, args.top, args.timeout)
+            results[module] = r
+            line = "  {0:<12} {1:<10} {2:>9.3f}s".format(module, r['status'][:10], r['seconds'])
+            if r['peak_mb'] is not None:
+                line += " {0:>9.1f}MB".format(r['peak_mb'])
+            if baseline is not None:
+                base = baseline['results'].get(str(size), {}).get(module)
+                if base is not None:
+                    found = compare(r, base, args.tolerance)
+                    if found:
+                        line += "  REGRESSION: " + ", ".join(found)
+                        regressions.append((size, module, found))
+            print line
+            if r['status'].startswith("error"):
+                logging.info("{0} on {1} nodes failed with {2}".format(module, size, r['status']))
+        report['results'][str(size)] = results
+
+        pairs = agreement(results)
+        report['agreement'][str(size)] = pairs
+        for pair in sorted(pairs):
+            print "  agreement {0}: {1:.0%}".format(pair, pairs[pair])
+        del sg, topic
+
+    if args.save is not None:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+        print "\nSaved results to {0}".format(args.save)
+
+    if regressions:
+        print "\n{0} regressions against {1}".format(len(regressions), args.baseline)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,638 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Local, in-memory stand-ins of the Neo4j and Rexster (Titan) HTTP endpoints used by the storage benchmark, and of
+  the threat intel feeds the minions download used by the minion benchmark.
+
+ NOTES:
+ The stand-ins answer only the requests the neo4j and titan storage plugins make (through py2neo and bulbs), so
+  the benchmark measures the plugin, client library, HTTP, and JSON overhead without a database cluster.  They
+  are not a database: the time they take isn't comparable to a real server's query planning and disk access.
+ Neo4j: the REST service root, node and relationship resources, and the transactional cypher endpoint (plus the
+  legacy /db/data/cypher endpoint).  Statements are recognized by the exact forms plugins/neo4j.py sends: node
+  MERGE, relationship CREATE by id, topic lookup, and the context query of build_query().  The context query is
+  answered with the context it describes (a breadth first search to the depth of its MATCH clauses which doesn't
+  cross DONT_FOLLOW keys, plus the DONT_FOLLOW nodes the collected nodes point to) in a single record.
+ Rexster: vertex and edge resources, key lookups (GET vertices?key=..&value=..), and the gremlin traversals
+  plugins/titan.py sends (g.v(id).both/out/in/outE/inE and the edge lookup of enrich()).  Other statements and
+  scripts are answered with a 400 naming them so unsupported requests are obvious.
+ Feeds: recorded feed files served as is (GET only) at the paths they're registered under.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+HOST = "127.0.0.1"  # Interface the stand-ins listen on
+NEO4J_VERSION = "2.2.0"  # Version reported by the Neo4j stand-in
+REXSTER_VERSION = "2.5.0"  # Version reported by the Rexster stand-in
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import BaseHTTPServer
+import SocketServer
+import threading
+import logging
+import json
+import re
+import urlparse
+from collections import defaultdict
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+MERGE_NODE = re.compile(r"^MERGE \(node: (\w+) \{key:\{KEY\}, value:\{VALUE\}\}\) ON CREATE SET node = \{MAP\} "
+                        r"RETURN collect\(node\) as nodes\s*$")
+CREATE_REL = re.compile(r"^MATCH \(src: (\w+)\), \(dst: (\w+)\) WHERE id\(src\) = \{SRC_ID\} AND id\(dst\) = \{DST_ID\} "
+                        r"CREATE \(src\)-\[rel: (\w+) \{MAP\}\]->\(dst\)\s*$")
+FIND_TOPIC = re.compile(r"^MATCH \(topic: (\w+) \{key:\{KEY\}, value:\{VALUE\}\}\) RETURN collect\(topic\) as topics\s*$")
+CONTEXT_START = "MATCH (topics:attribute)"
+CONTEXT_DEPTH = "MATCH (src)-[r:describedBy|influences]-(dst: attribute)"
+CONTEXT_TYPES = frozenset(["describedBy", "influences"])
+
+STEP = re.compile(r"^g\.v\((\d+)\)\.(both|out|in|outE|inE|bothE)$")
+EDGE_LOOKUP = re.compile(r"^g\.v\((\d+)\)\.outE\('(\w+)'\)(?:\.filter\{(.*)\})?\.as\('r'\)\.inV"
+                         r"\.retain\(\[g\.v\((\d+)\)\]\)\.back\('r'\)$")
+CONDITION = re.compile(r"it\.(\w+) == '(.*?)'")
+
+
+## EXECUTION
+class Store():
+    """ An in-memory property graph shared by the stand-ins. """
+    nodes = None  # id -> {"labels": set, "props": dict}
+    rels = None  # id -> {"start": id, "end": id, "type": str, "props": dict}
+    out_rels = None  # node id -> list of relationship ids
+    in_rels = None  # node id -> list of relationship ids
+    index = None  # (label, key, value) or ("uri", uri) -> node id
+    next_id = 0
+    lock = None
+
+    def __init__(self):
+        self.nodes = dict()
+        self.rels = dict()
+        self.out_rels = defaultdict(list)
+        self.in_rels = defaultdict(list)
+        self.index = dict()
+        self.lock = threading.RLock()
+
+
+    def new_id(self):
+        self.next_id += 1
+        return self.next_id
+
+
+    def add_node(self, props, labels=()):
+        node_id = self.new_id()
+        self.nodes[node_id] = {"labels": set(labels), "props": dict(props)}
+        self.index_node(node_id)
+        return node_id
+
+
+    def index_node(self, node_id):
+        node = self.nodes[node_id]
+        props = node["props"]
+        for label in node["labels"]:
+            if "key" in props and "value" in props:
+                self.index[(label, props["key"], props["value"])] = node_id
+        if "uri" in props:
+            self.index[("uri", props["uri"])] = node_id
+
+
+    def add_rel(self, start, end, rel_type, props):
+        if start not in self.nodes or end not in self.nodes:
+            raise ValueError("Node {0} or {1} does not exist.".format(start, end))
+        rel_id = self.new_id()
+        self.rels[rel_id] = {"start": start, "end": end, "type": rel_type, "props": dict(props)}
+        self.out_rels[start].append(rel_id)
+        self.in_rels[end].append(rel_id)
+        return rel_id
+
+
+class StandIn(BaseHTTPServer.BaseHTTPRequestHandler):
+    """ Dispatches requests to the stand-in's route() and writes JSON responses. """
+    server_version = "VerumStandIn/0.1"
+
+    def log_message(self, format, *args):
+        logging.debug("Stand-in: " + format % args)
+
+
+    def body(self):
+        length = int(self.headers.getheader("content-length") or 0)
+        if length == 0:
+            return dict()
+        data = self.rfile.read(length)
+        try:
+            return json.loads(data)
+        except ValueError:
+            return dict(urlparse.parse_qsl(data))
+
+
+    def handle_method(self, method):
+        url = urlparse.urlparse(self.path)
+        params = dict(urlparse.parse_qsl(url.query))
+        if method in ("POST", "PUT"):
+            body = self.body()
+            if isinstance(body, dict):
+                params.update(body)
+            else:
+                params["_body"] = body
+        try:
+            with self.server.store.lock:
+                status, content, headers = self.server.route(method, url.path.rstrip("/") or "/", params)
+        except Exception as e:
+            logging.exception("Stand-in failed on {0} {1}.".format(method, self.path))
+            status, content, headers = 500, {"message": repr(e)}, {}
+        data = json.dumps(content)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in headers.iteritems():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+    def do_GET(self):
+        self.handle_method("GET")
+
+    def do_POST(self):
+        self.handle_method("POST")
+
+    def do_PUT(self):
+        self.handle_method("PUT")
+
+    def do_DELETE(self):
+        self.handle_method("DELETE")
+
+
+class FeedHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """ Serves the feed files of a FeedStandIn. """
+    server_version = "VerumStandIn/0.1"
+
+    def log_message(self, format, *args):
+        logging.debug("Feed stand-in: " + format % args)
+
+
+    def do_GET(self):
+        path = urlparse.urlparse(self.path).path
+        feed = self.server.files.get(path)
+        if feed is None:
+            self.send_error(404, "No feed at {0}".format(path))
+            return
+        data, content_type = feed
+        with self.server.store.lock:
+            self.server.requests += 1
+            self.server.bytes_served += len(data)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    handler = StandIn  # Request handler class
+    store = None
+    thread = None
+
+    def __init__(self, port=0):
+        """
+
+        :param port: port to listen on.  0 picks a free port.
+        """
+        BaseHTTPServer.HTTPServer.__init__(self, (HOST, port), self.handler)
+        self.store = Store()
+
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+    @property
+    def base(self):
+        return "http://{0}:{1}".format(HOST, self.port)
+
+
+    def start(self):
+        """ Serves on a background thread.  Returns the server. """
+        self.thread = threading.Thread(target=self.serve_forever, name="verum-standin-{0}".format(self.port))
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+    def route(self, method, path, params):
+        """
+
+        :return: (HTTP status, JSON-able content, dictionary of extra headers)
+        """
+        raise NotImplementedError
+
+
+class Neo4jStandIn(Server):
+    transactions = 0
+
+    def data(self):
+        return self.base + "/db/data/"
+
+
+    def node_repr(self, node_id):
+        node = self.store.nodes[node_id]
+        uri = "{0}node/{1}".format(self.data(), node_id)
+        return {
+            "self": uri,
+            "labels": uri + "/labels",
+            "properties": uri + "/properties",
+            "property": uri + "/properties/{key}",
+            "outgoing_relationships": uri + "/relationships/out",
+            "incoming_relationships": uri + "/relationships/in",
+            "all_relationships": uri + "/relationships/all",
+            "create_relationship": uri + "/relationships",
+            "extensions": {},
+            "data": node["props"],
+            "metadata": {"id": node_id, "labels": sorted(node["labels"])}
+        }
+
+
+    def rel_repr(self, rel_id):
+        rel = self.store.rels[rel_id]
+        uri = "{0}relationship/{1}".format(self.data(), rel_id)
+        return {
+            "self": uri,
+            "start": "{0}node/{1}".format(self.data(), rel["start"]),
+            "end": "{0}node/{1}".format(self.data(), rel["end"]),
+            "type": rel["type"],
+            "properties": uri + "/properties",
+            "property": uri + "/properties/{key}",
+            "extensions": {},
+            "data": rel["props"],
+            "metadata": {"id": rel_id, "type": rel["type"]}
+        }
+
+
+    def route(self, method, path, params):
+        if path == "/":
+            return 200, {"data": self.data(), "management": self.base + "/db/manage/"}, {}
+        if path == "/db/data":
+            data = self.data()
+            return 200, {
+                "extensions": {},
+                "node": data + "node",
+                "node_index": data + "index/node",
+                "relationship_index": data + "index/relationship",
+                "extensions_info": data + "ext",
+                "relationship_types": data + "relationship/types",
+                "batch": data + "batch",
+                "cypher": data + "cypher",
+                "indexes": data + "schema/index",
+                "constraints": data + "schema/constraint",
+                "transaction": data + "transaction",
+                "node_labels": data + "labels",
+                "neo4j_version": NEO4J_VERSION
+            }, {}
+        if path.startswith("/user/"):
+            return 200, {"username": path.split("/")[-1], "password_change_required": False}, {}
+
+        parts = path.split("/")[3:]  # after /db/data/
+        if parts[0] == "node" and len(parts) >= 2:
+            node_id = int(parts[1])
+            if node_id not in self.store.nodes:
+                return 404, {"message": "Node {0} not found".format(node_id)}, {}
+            if len(parts) == 3 and parts[2] == "labels":
+                return 200, sorted(self.store.nodes[node_id]["labels"]), {}
+            if len(parts) == 3 and parts[2] == "properties":
+                return 200, self.store.nodes[node_id]["props"], {}
+            return 200, self.node_repr(node_id), {}
+        if parts[0] == "relationship" and len(parts) >= 2 and parts[1].isdigit():
+            rel_id = int(parts[1])
+            if rel_id not in self.store.rels:
+                return 404, {"message": "Relationship {0} not found".format(rel_id)}, {}
+            if len(parts) == 3 and parts[2] == "properties":
+                return 200, self.store.rels[rel_id]["props"], {}
+            return 200, self.rel_repr(rel_id), {}
+        if parts[0] == "cypher" and method == "POST":
+            try:
+                columns, rows = self.execute(params.get("query", ""), params.get("params") or {})
+            except ValueError as e:
+                return 400, {"message": str(e), "exception": "SyntaxException"}, {}
+            return 200, {"columns": columns, "data": rows}, {}
+        if parts[0] == "transaction":
+            return self.transaction(method, parts[1:], params)
+        return 404, {"message": "Stand-in does not serve {0} {1}".format(method, path)}, {}
+
+
+    def transaction(self, method, parts, params):
+        """ Statements are applied as they arrive.  Rollback isn't supported. """
+        if not parts or parts == ["commit"]:
+            self.transactions += 1
+            tx = self.transactions
+        else:
+            tx = int(parts[0])
+        results = list()
+        errors = list()
+        if method == "POST":
+            for statement in params.get("statements", []):
+                try:
+                    columns, rows = self.execute(statement.get("statement", ""), statement.get("parameters") or {})
+                except ValueError as e:
+                    errors.append({"code": "Neo.ClientError.Statement.InvalidSyntax", "message": str(e)})
+                    break
+                results.append({"columns": columns, "data": [{"rest": row, "row": row} for row in rows]})
+        content = {"results": results, "errors": errors}
+        headers = dict()
+        if parts[-1:] != ["commit"] and method != "DELETE":
+            uri = "{0}transaction/{1}".format(self.data(), tx)
+            content["commit"] = uri + "/commit"
+            content["transaction"] = {"expires": "Thu, 01 Jan 2099 00:00:00 +0000"}
+            headers["Location"] = uri
+            return 201 if not parts else 200, content, headers
+        return 200, content, headers
+
+
+    def execute(self, statement, parameters):
+        """
+
+        :return: (columns, rows) of the statement
+        :raises ValueError: if the statement isn't one plugins/neo4j.py sends
+        """
+        statement = " ".join(statement.split())
+        store = self.store
+
+        m = MERGE_NODE.match(statement)
+        if m:
+            label = m.group(1)
+            node_id = store.index.get((label, parameters["KEY"], parameters["VALUE"]))
+            if node_id is None:
+                node_id = store.add_node(parameters.get("MAP") or {}, [label])
+            return ["nodes"], [[[self.node_repr(node_id)]]]
+
+        m = CREATE_REL.match(statement)
+        if m:
+            store.add_rel(int(parameters["SRC_ID"]), int(parameters["DST_ID"]), m.group(3),
+                          parameters.get("MAP") or {})
+            return [], []
+
+        m = FIND_TOPIC.match(statement)
+        if m:
+            node_id = store.index.get((m.group(1), parameters["KEY"], parameters["VALUE"]))
+            found = [self.node_repr(node_id)] if node_id is not None else []
+            return ["topics"], [[found]]
+
+        if statement.startswith(CONTEXT_START):
+            depth = statement.count(" ".join(CONTEXT_DEPTH.split()))
+            nodes, rels = self.context([int(t) for t in parameters.get("TOPICS", [])], depth,
+                                       set(parameters.get("DONT_FOLLOW", [])))
+            return ["nodes", "rels"], [[[self.node_repr(n) for n in nodes], [self.rel_repr(r) for r in rels]]]
+
+        raise ValueError("Stand-in does not support statement: {0}".format(statement[:200]))
+
+
+    def context(self, topics, depth, dont_follow):
+        """
+
+        :return: (list of node ids, list of relationship ids) of the context around the topics
+        """
+        store = self.store
+        key = lambda n: store.nodes[n]["props"].get("key")
+        found = [t for t in topics if t in store.nodes and "attribute" in store.nodes[t]["labels"]]
+        seen = set(found)
+        rels = list()
+        seen_rels = set()
+        frontier = list(found)
+        for _ in range(depth):
+            next_frontier = list()
+            for src in frontier:
+                if key(src) in dont_follow:
+                    continue
+                for rel_id, dst in [(r, store.rels[r]["end"]) for r in store.out_rels[src]] + \
+                                   [(r, store.rels[r]["start"]) for r in store.in_rels[src]]:
+                    rel = store.rels[rel_id]
+                    if rel["type"] not in CONTEXT_TYPES or key(dst) in dont_follow or \
+                       "attribute" not in store.nodes[dst]["labels"]:
+                        continue
+                    if rel_id not in seen_rels:
+                        seen_rels.add(rel_id)
+                        rels.append(rel_id)
+                    if dst not in seen:
+                        seen.add(dst)
+                        found.append(dst)
+                        next_frontier.append(dst)
+            frontier = next_frontier
+
+        for src in list(found):
+            for rel_id in store.out_rels[src]:
+                dst = store.rels[rel_id]["end"]
+                if key(dst) in dont_follow:
+                    if rel_id not in seen_rels:
+                        seen_rels.add(rel_id)
+                        rels.append(rel_id)
+                    if dst not in seen:
+                        seen.add(dst)
+                        found.append(dst)
+        return found, rels
+
+
+class RexsterStandIn(Server):
+    graph = None  # Name of the graph served
+
+    def __init__(self, port=0, graph="vzgraph"):
+        Server.__init__(self, port)
+        self.graph = graph
+
+
+    def vertex(self, node_id):
+        out = dict(self.store.nodes[node_id]["props"])
+        out.update({"_id": node_id, "_type": "vertex"})
+        return out
+
+
+    def edge(self, rel_id):
+        rel = self.store.rels[rel_id]
+        out = dict(rel["props"])
+        out.update({"_id": rel_id, "_type": "edge", "_outV": rel["start"], "_inV": rel["end"], "_label": rel["type"]})
+        return out
+
+
+    def results(self, results):
+        size = len(results) if isinstance(results, list) else (0 if results is None else 1)
+        return 200, {"results": results, "totalSize": size, "success": True, "version": REXSTER_VERSION,
+                     "queryTime": 0.0}, {}
+
+
+    def route(self, method, path, params):
+        store = self.store
+        parts = path.split("/")[1:]
+        if parts[:1] == ["graphs"] and len(parts) == 1:
+            return 200, {"graphs": [self.graph], "version": REXSTER_VERSION}, {}
+        if parts[:2] != ["graphs", self.graph]:
+            return 404, {"message": "Graph {0} not found".format("/".join(parts[1:2]))}, {}
+        parts = parts[2:]
+        data = dict((k, v) for k, v in params.iteritems() if not k.startswith("_"))  # Properties of a POST or PUT
+        if not parts:
+            return 200, {"name": self.graph, "graph": "titangraph[standin]", "version": REXSTER_VERSION,
+                         "features": {}, "extensions": []}, {}
+
+        if parts[0] == "vertices":
+            if len(parts) == 1 and method == "GET":
+                if "key" in params:
+                    node_id = store.index.get((params["key"], params["value"])) if params["key"] == "uri" else None
+                    if node_id is None and params["key"] != "uri":
+                        matches = [n for n, v in store.nodes.iteritems()
+                                   if v["props"].get(params["key"]) == params["value"]]
+                    else:
+                        matches = [node_id] if node_id is not None else []
+                    return self.results([self.vertex(n) for n in matches])
+                return self.results([self.vertex(n) for n in store.nodes])
+            if len(parts) == 1 and method == "POST":
+                return self.results(self.vertex(store.add_node(data)))
+            node_id = int(parts[1])
+            if node_id not in store.nodes:
+                return 404, {"message": "Vertex {0} not found".format(node_id)}, {}
+            if method == "PUT":
+                store.nodes[node_id]["props"] = data
+                store.index_node(node_id)
+            elif method == "POST":
+                store.nodes[node_id]["props"].update(data)
+                store.index_node(node_id)
+            return self.results(self.vertex(node_id))
+
+        if parts[0] == "edges":
+            if len(parts) == 1 and method == "POST":
+                rel_id = store.add_rel(int(params["_outV"]), int(params["_inV"]), params["_label"], data)
+                return self.results(self.edge(rel_id))
+            rel_id = int(parts[1])
+            if rel_id not in store.rels:
+                return 404, {"message": "Edge {0} not found".format(rel_id)}, {}
+            if method == "PUT":
+                store.rels[rel_id]["props"] = data
+            elif method == "POST":
+                store.rels[rel_id]["props"].update(data)
+            return self.results(self.edge(rel_id))
+
+        if parts[0] == "keyindices":
+            return self.results([])
+
+        if parts[:2] == ["tp", "gremlin"]:
+            try:
+                return self.results(self.gremlin(" ".join(params.get("script", "").split())))
+            except ValueError as e:
+                return 400, {"message": str(e), "success": False}, {}
+
+        return 404, {"message": "Stand-in does not serve {0} {1}".format(method, path)}, {}
+
+
+    def gremlin(self, script):
+        """
+
+        :return: list of vertices or edges the traversal returns
+        :raises ValueError: if the script isn't one plugins/titan.py sends
+        """
+        store = self.store
+        m = STEP.match(script)
+        if m:
+            node_id, step = int(m.group(1)), m.group(2)
+            if node_id not in store.nodes:
+                return []
+            out_rels, in_rels = store.out_rels[node_id], store.in_rels[node_id]
+            if step == "out":
+                return [self.vertex(store.rels[r]["end"]) for r in out_rels]
+            if step == "in":
+                return [self.vertex(store.rels[r]["start"]) for r in in_rels]
+            if step == "both":
+                return [self.vertex(store.rels[r]["end"]) for r in out_rels] + \
+                       [self.vertex(store.rels[r]["start"]) for r in in_rels]
+            if step == "outE":
+                return [self.edge(r) for r in out_rels]
+            if step == "inE":
+                return [self.edge(r) for r in in_rels]
+            return [self.edge(r) for r in out_rels + in_rels]
+
+        m = EDGE_LOOKUP.match(script)
+        if m:
+            src, label, conditions, dst = int(m.group(1)), m.group(2), m.group(3), int(m.group(4))
+            conditions = CONDITION.findall(conditions or "")
+            found = list()
+            for r in store.out_rels.get(src, []):
+                rel = store.rels[r]
+                if rel["type"] == label and rel["end"] == dst and \
+                   all(unicode(rel["props"].get(k)) == v for k, v in conditions):
+                    found.append(self.edge(r))
+            return found
+
+        raise ValueError("Stand-in does not support gremlin script: {0}".format(script[:200]))
+
+
+class FeedStandIn(Server):
+    handler = FeedHandler
+    files = None  # URL path -> (bytes, content type)
+    requests = 0  # Feeds served
+    bytes_served = 0
+
+    def __init__(self, port=0):
+        Server.__init__(self, port)
+        self.files = dict()
+
+
+    def add(self, path, data, content_type="text/plain"):
+        """
+
+        :param path: URL path to serve the feed at (e.g. "/top-1m.csv.zip")
+        :param data: the recorded feed file's bytes
+        :param content_type: Content-Type of the feed
+        :return: the URL of the feed
+        """
+        self.files[path] = (data, content_type)
+        return self.base + path
+
+
+def start(backend, port=0):
+    """
+
+    :param backend: "neo4j", "titan", or "feed"
+    :param port: port to listen on.  0 picks a free port.
+    :return: the running stand-in server (see its port and stop())
+    """
+    if backend == "feed":
+        return FeedStandIn(port).start()
+    if backend == "neo4j":
+        return Neo4jStandIn(port).start()
+    if backend == "titan":
+        return RexsterStandIn(port).start()
+    raise ValueError("No stand-in for backend {0}.  Use neo4j, titan, or feed.".format(backend))
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: networkx, yapsy (and py2neo or bulbs for the neo4j and titan backends)
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Benchmarks the enrich (write) and query throughput of a storage plugin.
+
+ NOTES:
+ e.g. python benchmarks/storage.py --backend networkx --nodes 10000
+      python benchmarks/storage.py --backend neo4j --standin
+      python benchmarks/storage.py --backend titan --host 10.0.0.5 --port 8182 --graph vzgraph
+ A synthetic context graph (see graphs.py) is split into enrichment fragments which are replayed into the plugin
+  with enrich() in the order the graph grew.  Then query() is issued around randomly chosen nodes at each depth.
+ Reports writes per second (fragments, nodes, and edges), write and query latency percentiles, and the sizes of
+  the subgraphs returned.
+ --standin runs the neo4j or titan plugin against a local, in-memory stand-in of its HTTP endpoint (see
+  standins.py) rather than a database.  That measures the plugin, client library, and HTTP overhead; it says
+  nothing about the database's own query time.  Without --standin, the plugin's configured endpoint (or --host,
+  --port) is used.  Point it at a scratch database: the benchmark writes to it.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+BACKENDS = {"networkx": "networkx", "neo4j": "neo4j", "titan": "titan"}  # backend name -> plugin module
+NODES = 10000  # Nodes in the synthetic graph written to the storage
+FRAGMENT_NODES = 10  # New nodes per enrichment fragment
+DEPTHS = [1, 2, 3, 4]  # Query depths
+QUERIES = 50  # Queries per depth
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import argparse
+import logging
+import inspect
+import imp
+import json
+import random
+import time
+import networkx as nx
+from graphs import context_graph, fragments
+import standins
+
+## SETUP
+__author__ = "Gabriel Bassett"
+loc = inspect.getfile(inspect.currentframe())
+i = loc.rfind("/")
+loc = loc[:i+1]
+# Parse Arguments (should correspond to user variables)
+parser = argparse.ArgumentParser(description='Benchmarks the write and query throughput of a storage plugin.')
+parser.add_argument('-d', '--debug',
+                    help='Print lots of debugging statements',
+                    action="store_const", dest="loglevel", const=logging.DEBUG,
+                    default=logging.WARNING
+                   )
+parser.add_argument('-v', '--verbose',
+                    help='Be verbose',
+                    action="store_const", dest="loglevel", const=logging.INFO
+                   )
+parser.add_argument('--log', help='Location of log file', default=None)
+parser.add_argument('--backend', help='Storage to benchmark', choices=sorted(BACKENDS), default="networkx")
+parser.add_argument('--standin', help='Run neo4j or titan against a local stand-in of its HTTP endpoint',
+                    action="store_true")
+parser.add_argument('--host', help='Host of the neo4j or titan endpoint (defaults to the plugin config)', default=None)
+parser.add_argument('--port', help='Port of the neo4j or titan endpoint', type=int, default=None)
+parser.add_argument('--graph', help='Rexster graph name for titan', default="vzgraph")
+parser.add_argument('--nodes', help='Nodes in the synthetic graph', type=int, default=NODES)
+parser.add_argument('--fragment-nodes', help='New nodes per enrichment fragment', type=int, default=FRAGMENT_NODES,
+                    dest="fragment_nodes")
+parser.add_argument('--depths', help='Comma separated query depths', default=",".join(str(d) for d in DEPTHS))
+parser.add_argument('--queries', help='Queries per depth', type=int, default=QUERIES)
+parser.add_argument('--seed', help='Random seed of the graph and query topics', type=int, default=0)
+parser.add_argument('--save', help='Write the results to this JSON file', default=None)
+
+
+## EXECUTION
+def load_storage(backend, host=None, port=None, graph=None):
+    """
+
+    :param backend: "networkx", "neo4j", or "titan"
+    :param host: host of the endpoint.  None to use the plugin's configuration.
+    :param port: port of the endpoint
+    :param graph: Rexster graph name (titan)
+    :return: the configured storage plugin object, empty if it's the networkx backend
+    :raises ValueError: if the plugin doesn't configure (e.g. py2neo or bulbs is not installed)
+    """
+    module = BACKENDS[backend]
+    fp, pathname, description = imp.find_module(module, [loc + "../plugins/"])
+    try:
+        mod = imp.load_module("benchmark_" + module, fp, pathname, description)
+    finally:
+        if fp:
+            fp.close()
+    plugin = mod.PluginOne()
+    config = plugin.configure()
+    if not config[1]:
+        raise ValueError("Storage plugin {0} did not configure.  Check its dependencies.".format(module))
+
+    if backend == "networkx":
+        plugin.context_graph = nx.MultiDiGraph()  # Don't benchmark against (or add to) a saved graph
+    elif backend == "neo4j" and host is not None:
+        plugin.set_neo4j_config(host, port)
+    elif backend == "titan" and host is not None:
+        plugin.set_titan_config(host, port, graph)
+    return plugin
+
+
+def percentile(values, p):
+    """ Nearest rank percentile (p between 0 and 100) of a list of numbers.  None if empty. """
+    if not values:
+        return None
+    values = sorted(values)
+    rank = int(round(p / 100.0 * len(values) + 0.5)) - 1
+    return values[min(max(rank, 0), len(values) - 1)]
+
+
+def summary(seconds):
+    return {
+        'count': len(seconds),
+        'mean': sum(seconds) / len(seconds) if seconds else None,
+        'p50': percentile(seconds, 50),
+        'p99': percentile(seconds, 99),
+        'max': max(seconds) if seconds else None
+    }
+
+
+def benchmark_writes(plugin, graph_fragments):
+    """
+
+    :param plugin: a storage plugin
+    :param graph_fragments: list of networkx graphs to enrich() into the storage
+    :return: dictionary of write throughput and latency
+    """
+    seconds = list()
+    nodes = edges = 0
+    for f in graph_fragments:
+        nodes += f.number_of_nodes()
+        edges += f.number_of_edges()
+        start = time.time()
+        plugin.enrich(f)
+        seconds.append(time.time() - start)
+    total = sum(seconds)
+    return {
+        'fragments': len(graph_fragments),
+        'nodes': nodes,
+        'edges': edges,
+        'seconds': total,
+        'fragments_per_second': len(graph_fragments) / total if total else None,
+        'nodes_per_second': nodes / total if total else None,
+        'edges_per_second': edges / total if total else None,
+        'latency': summary(seconds)
+    }
+
+
+def benchmark_queries(plugin, g, depth, queries, rand):
+    """
+
+    :param plugin: a storage plugin holding g
+    :param g: the graph written to the storage
+    :param depth: max_depth of the queries
+    :param queries: number of queries
+    :param rand: random.Random choosing the topics
+    :return: dictionary of query latency and subgraph sizes
+    """
+    candidates = g.nodes()
+    seconds = list()
+    nodes = list()
+    edges = list()
+    for _ in range(queries):
+        t = rand.choice(candidates)
+        topic = nx.MultiDiGraph()
+        attr = g.node[t]
+        topic.add_node(t, {k: attr[k] for k in ("class", "key", "value", "uri") if k in attr})
+        start = time.time()
+        sg = plugin.query(topic, max_depth=depth)
+        seconds.append(time.time() - start)
+        nodes.append(sg.number_of_nodes())
+        edges.append(sg.number_of_edges())
+    return {
+        'depth': depth,
+        'latency': summary(seconds),
+        'nodes': summary(nodes),
+        'edges': summary(edges),
+        'queries_per_second': len(seconds) / sum(seconds) if sum(seconds) else None
+    }
+
+
+def ms(seconds):
+    return "{0:.1f}ms".format(seconds * 1000) if seconds is not None else "-"
+
+
+## MAIN LOOP EXECUTION
+def main():
+    args = parser.parse_args()
+    if args.log is not None:
+        logging.basicConfig(filename=args.log, level=args.loglevel)
+    else:
+        logging.basicConfig(level=args.loglevel)
+
+    server = None
+    host, port = args.host, args.port
+    if args.standin:
+        server = standins.start(args.backend)
+        host, port = standins.HOST, server.port
+        print "Started a local {0} stand-in on port {1}".format(args.backend, port)
+    try:
+        plugin = load_storage(args.backend, host, port, args.graph)
+
+        g, _ = context_graph(args.nodes, seed=args.seed)
+        graph_fragments = list(fragments(g, args.fragment_nodes))
+        report = {'backend': args.backend, 'standin': args.standin, 'seed': args.seed,
+                  'graph': {'nodes': g.number_of_nodes(), 'edges': g.number_of_edges()}}
+
+        writes = benchmark_writes(plugin, graph_fragments)
+        report['writes'] = writes
+        print "\n{0}: wrote {1} fragments ({2} nodes, {3} edges) in {4:.2f}s".format(
+            args.backend, writes['fragments'], writes['nodes'], writes['edges'], writes['seconds'])
+        print "  {0:.1f} fragments/s, {1:.0f} nodes/s, {2:.0f} edges/s.  Latency p50 {3}, p99 {4}".format(
+            writes['fragments_per_second'] or 0, writes['nodes_per_second'] or 0, writes['edges_per_second'] or 0,
+            ms(writes['latency']['p50']), ms(writes['latency']['p99']))
+
+        rand = random.Random(args.seed)
+        report['queries'] = list()
+        print "\n  depth   p50        p99        queries/s  nodes (p50/max)  edges (p50/max)"
+        for depth in [int(d) for d in args.depths.split(",") if d.strip()]:
+            q = benchmark_queries(plugin, g, depth, args.queries, rand)
+            report['queries'].append(q)
+            print "  {0:<7} {1:<10} {2:<10} {3:<10.1f} {4:>6}/{5:<9} {6:>6}/{7}".format(
+                depth, ms(q['latency']['p50']), ms(q['latency']['p99']), q['queries_per_second'] or 0,
+                q['nodes']['p50'], q['nodes']['max'], q['edges']['p50'], q['edges']['max'])
+    finally:
+        if server is not None:
+            server.stop()
+
+    if args.save is not None:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+        print "\nSaved results to {0}".format(args.save)
+
+
+if __name__ == "__main__":
+    main()
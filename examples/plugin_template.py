@@ -224,8 +224,8 @@ class PluginOne(IPlugin):
     #  -     The minion configuration function must take an argument of the parent verum object.  When not present, it shouldn't error but
     #  -      instead return with successful_load set to false and a logging.info message that the parent was not passed in.
     #  -     Must have 4 functions: minion(), start(), and stop() and isAlive()
-    #  -     minion() is the function which will be threaded.  **Make sure to call create the new verum instance WITHIN this function
-    #  -      to avoid SQLite errors!**
+    #  -     minion() is the function which will be threaded.  It should use the parent verum instance (it is thread safe) and
+    #  -      pass its storage to store_graph() rather than calling set_interface() on the shared instance.
     #  -     start() creates the thread object as an attribute of the plugin class and starts it
     #  -     stop() stops the thread.  Preferably with both a normal exit by setting a shutdown variable of the plugin class as well as a 
     #  -      force stop option which removes the thread object
@@ -91,6 +91,7 @@ else:
 ## EXECUTION
 class PluginOne(IPlugin):
     thread = None
+    storage = None  # The storage plugin the minion writes to
     app = None  # The object instance
     Verum = None  # the module
     today = datetime.strptime("1970", "%Y")  # Today's date
@@ -163,18 +164,19 @@ class PluginOne(IPlugin):
 
 
     def minion(self,  storage=None, *args, **xargs):        
-        self.app = self.Verum.app(self.parent.PluginFolder, None)
-        # set storage
+        # Share the parent app rather than loading a copy of every plugin.  The app is thread safe.
+        self.app = self.parent
+        # set storage.  Passed to store_graph() rather than set on the shared app.
         if storage is None:
             storage = self.parent.storage
-        self.app.set_interface(storage)
+        self.storage = storage
 
         # Check until stopped
         while not self.shutdown:
             # Check to see if it's the same day, if it is, sleep for a while, otherwise run the import
 #            delta = datetime.utcnow() - self.today
 #            if delta.days <= 0:
-            if datatime.utcnow() <= self.today + REFRESH_TIME:
+            if datetime.utcnow() <= self.today + REFRESH_TIME:
                 time.sleep(SLEEP_TIME)
             else:
                 logging.info("Starting daily {0} enrichment.".format(NAME))
@@ -191,49 +193,55 @@ class PluginOne(IPlugin):
                 # get the time
                 dt = datetime.utcnow()
 
-                with z.open('top-1m.csv') as f:
+                # Rank of each domain read from the feed and not yet enriched
+                ranks = dict()
+
+                def domains(f):
                     for line in f:
-                        try:
-                            line = line.strip().split(",")
+                        line = line.strip().split(",")
 
-                            # Validate data in row
-                            ext = tldextract.extract(line[1])
-                            if not ext.domain or not ext.suffix:
-                                # domain is not legitimate
-                                next
+                        # Validate data in row
+                        ext = tldextract.extract(line[1])
+                        if not ext.domain or not ext.suffix:
+                            # domain is not legitimate
+                            continue
 
-                            # classify benign and merge with current graph
-                            g =  self.app.classify.run({'key': 'domain', 'value': line[1], 'classification': 'benign'}, confidence=1 - (int(line[0])-1)/float(1000000))
+                        if line[1] in ranks:
+                            # repeated while the first is still being enriched
+                            continue
 
-                            # enrich depending on type
-                            try:
-                                g = self.Verum.merge_graphs(g, self.app.run_enrichments(line[1], "domain", names=['TLD Enrichment']))
-                                g = self.Verum.merge_graphs(g, self.app.run_enrichments(line[1], "domain", names=['DNS Enrichment']))
-                                g = self.Verum.merge_graphs(g, self.app.run_enrichments(line[1], "domain", names=['IP Whois Enrichment']))
-                            except Exception as e:
-                                logging.info("Enrichment of {0} failed due to {1}.".format(line[1], e))
-                                #print "Enrichment of {0} failed due to {1}.".format(domain, e)  # DEBUG
-                                #raise
-                                pass
+                        ranks[line[1]] = int(line[0])
+                        yield line[1]
+
+                with z.open('top-1m.csv') as f:
+                    # Enrich the domains concurrently on the app's worker pool rather than one at a time
+                    for domain, domain_g in self.app.run_enrichments_many(domains(f), "domain", names=['TLD Enrichment', 'DNS Enrichment', 'IP Whois Enrichment']):
+                        try:
+                            rank = ranks.pop(domain)
+
+                            # classify benign and start the row's graph
+                            g = self.Verum.GraphAccumulator(self.app.classify.run({'key': 'domain', 'value': domain, 'classification': 'benign'}, confidence=1 - (rank-1)/float(1000000)))
+                            g.add(domain_g)
 
                             # Collect IPs
                             line_ips = set()
-                            for node, data in g.nodes(data=True):
+                            for node, data in g.graph.nodes(data=True):
                                 if data['key'] == 'ip':
                                     line_ips.add(data['value']) 
 
                             for ip in line_ips:
                                 try:
-                                    g = self.Verum.merge_graphs(g, self.app.run_enrichments(ip, "ip", names=[u'Maxmind ASN Enrichment']))
+                                    g.add(self.app.run_enrichments(ip, "ip", names=[u'Maxmind ASN Enrichment']))
                                 except Exception as e:
                                     logging.info("Enrichment of {0} failed due to {1}.".format(ip, e))
                                     pass
 
+                            g = g.build()
                             try:
-                                self.app.store_graph(self.Verum.remove_non_ascii_from_graph(g))
+                                self.app.store_graph(self.Verum.remove_non_ascii_from_graph(g), storage=self.storage)
                             except:
-                                print g.nodes(data=True)  # DEBUG
-                                print g.edges(data=True)  # DEBUG
+                                logging.exception("Unable to store graph of {0} with nodes {1} and edges {2}.".format(
+                                    domain, g.nodes(data=True), g.edges(data=True)))
                                 raise
 
                             ips = ips.union(line_ips)
@@ -250,7 +258,7 @@ class PluginOne(IPlugin):
                                 ips = ips2
                                 del(ips2)
                                 try:
-                                    self.app.store_graph(self.app.run_enrichments(ips, 'ip', names=[u'Cymru Enrichment']))
+                                    self.app.store_graph(self.app.run_enrichments(ips, 'ip', names=[u'Cymru Enrichment']), storage=self.storage)
                                     #print "Cymru enrichment complete."
                                 except Exception as e:
                                     logging.info("Cymru enrichment of {0} IPs failed due to {1}.".format(len(ips), e))
@@ -259,10 +267,15 @@ class PluginOne(IPlugin):
                                 ips = set()
 
                         except Exception as e:
-                            print line
-                            print e
+                            logging.exception("Enrichment of {0} failed due to {1}.".format(domain, e))
                             raise
 
+                # Forget the domains given up on while waiting for their enrichments
+                ranks.clear()
+
+                # Write anything still buffered by write-behind before waiting for the next feed
+                self.app.flush(self.storage)
+
                 # Copy today's date to today
                 self.today = datetime.utcnow()
 
@@ -196,8 +196,8 @@ class PluginOne(IPlugin):
     #  -     The minion configuration function must take an argument of the parent verum object.  When not present, it shouldn't error but
     #  -      instead return with successful_load set to false and a logging.info message that the parent was not passed in.
     #  -     Must have 4 functions: minion(), start(), and stop() and isAlive()
-    #  -     minion() is the function which will be threaded.  **Make sure to call create the new verum instance WITHIN this function
-    #  -      to avoid SQLite errors!**
+    #  -     minion() is the function which will be threaded.  It should use the parent verum instance (it is thread safe) and
+    #  -      pass its storage to store_graph() rather than calling set_interface() on the shared instance.
     #  -     start() creates the thread object as an attribute of the plugin class and starts it
     #  -     stop() stops the thread.  Preferably with both a normal exit by setting a shutdown variable of the plugin class as well as a 
     #  -      force stop option which removes the thread object
@@ -248,16 +248,7 @@ class PluginOne(IPlugin):
                     dest_uri = self.Verum.removeNonAscii(dest_uri)
 
                     # Edge URI
-                    source_hash = uuid.uuid3(uuid.NAMESPACE_URL, source_uri)
-                    dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, dest_uri)
-
-                    edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-                    rel_chain = "relationship"
-                    while rel_chain in rel.properties:
-                        edge_uri = edge_uri + "&{0}={1}".format(rel_chain,rel.properties[rel_chain])
-                        rel_chain = rel.properties[rel_chain]
-                    if "origin" in rel.properties:
-                        edge_uri += "&{0}={1}".format("origin", rel.properties["origin"])
+                    edge_uri = self.Verum.uri.edge_uri(source_uri, dest_uri, rel.properties)
 
                 # aggregate edges by dst, and uri
                 edges[edge_uri].add(rel)  # WARNING: The use of URI here is vulnerable to values being out of order in the URI and edges not being removed.
@@ -51,8 +51,6 @@ from yapsy.IPlugin import IPlugin
 import logging
 import networkx as nx
 from datetime import datetime # timedelta imported above
-import dateutil
-import uuid
 import ConfigParser
 import inspect
 import pandas as pd  # for organizing the intel list data
@@ -82,6 +80,7 @@ if config.has_section('Log'):
 ## EXECUTION
 class PluginOne(IPlugin):
     thread = None
+    storage = None  # The storage plugin the minion writes to
     app = None  # The object instance
     Verum = None  # the module
     yesterday = pd.DataFrame(columns=("indicator", "context", "date", "source", "key", "threat"))  # Yesterday's data
@@ -155,11 +154,12 @@ class PluginOne(IPlugin):
 
 
     def minion(self,  storage=None, *args, **xargs):
-        self.app = self.Verum.app(self.parent.PluginFolder, None)
-        # set storage
+        # Share the parent app rather than loading a copy of every plugin.  The app is thread safe.
+        self.app = self.parent
+        # set storage.  Passed to store_graph() rather than set on the shared app.
         if storage is None:
             storage = self.parent.storage
-        self.app.set_interface(storage)
+        self.storage = storage
 
         # Check until stopped
         while not self.shutdown:
@@ -197,12 +197,12 @@ class PluginOne(IPlugin):
                         g = nx.MultiDiGraph()
                         
                         # convert date to correct format
-                        dt = dateutil.parser.parse(row[1]['date']).strftime("%Y-%m-%dT%H:%M:%SZ")
+                        dt = self.Verum.timeutil.parse(row[1]['date'])
 
                         # Add indicator to graph
                         ## (Must account for the different types of indicators)
                         key = keys[row[1]['key']]
-                        target_uri = "class=attribute&key={0}&value={1}".format(key, row[1]['indicator']) 
+                        target_uri = self.Verum.uri.node_uri(key, row[1]['indicator']) 
                         g.add_node(target_uri, {
                             'class': 'attribute',
                             'key': key,
@@ -220,7 +220,7 @@ class PluginOne(IPlugin):
                             threat = row[1]['threat']
 
                         # Threat node
-                        threat_uri = "class=attribute&key={0}&value={1}".format("malware", threat) 
+                        threat_uri = self.Verum.uri.node_uri("malware", threat) 
                         g.add_node(threat_uri, {
                             'class': 'attribute',
                             'key': "malware",
@@ -238,22 +238,14 @@ class PluginOne(IPlugin):
                         # test for nameserver and update edge_attr
                         if nameserver[row[1]['key']] == True:
                             edge_attr['describedBy'] = 'nameserver'
-                        source_hash = uuid.uuid3(uuid.NAMESPACE_URL, target_uri)
-                        dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, threat_uri)
-                        edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-                        rel_chain = "relationship"
-                        while rel_chain in edge_attr:
-                            edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                            rel_chain = edge_attr[rel_chain]
-                        if "origin" in edge_attr:
-                            edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+                        edge_uri = self.Verum.uri.edge_uri(target_uri, threat_uri, edge_attr)
                         edge_attr["uri"] = edge_uri
                         g.add_edge(target_uri, threat_uri, edge_uri, edge_attr)
 
                         # Add C&C to list if applicable
                         if CandC:
                             # C2 node
-                            c2_uri = "class=attribute&key={0}&value={1}".format("classification", "c2") 
+                            c2_uri = self.Verum.uri.node_uri("classification", "c2") 
                             g.add_node(c2_uri, {
                                 'class': 'attribute',
                                 'key': "classification",
@@ -271,25 +263,18 @@ class PluginOne(IPlugin):
                             # test for nameserver and update edge_attr
                             if nameserver[row[1]['key']] == True:
                                 edge_attr['describedBy'] = 'nameserver'
-                            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, target_uri)
-                            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, c2_uri)
-                            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-                            rel_chain = "relationship"
-                            while rel_chain in edge_attr:
-                                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                                rel_chain = edge_attr[rel_chain]
-                            if "origin" in edge_attr:
-                                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+                            edge_uri = self.Verum.uri.edge_uri(target_uri, c2_uri, edge_attr)
                             edge_attr["uri"] = edge_uri
                             g.add_edge(target_uri, c2_uri, edge_uri, edge_attr)
 
 
                         # classify malicious and merge with current graph
-                        g = self.Verum.merge_graphs(g, self.app.classify.run({'key': key, 'value': row[1]['indicator'], 'classification': 'malice'}))
+                        g = self.Verum.GraphAccumulator(g)
+                        g.add(self.app.classify.run({'key': key, 'value': row[1]['indicator'], 'classification': 'malice'}))
 
                         # enrich depending on type
                         try:
-                            g = self.Verum.merge_graphs(g, self.app.run_enrichments(row[1]['indicator'], key, names=[u'DNS Enrichment', u'TLD Enrichment', u'Maxmind ASN Enrichment', 'IP Whois Enrichment']))
+                            g.add(self.app.run_enrichments(row[1]['indicator'], key, names=[u'DNS Enrichment', u'TLD Enrichment', u'Maxmind ASN Enrichment', 'IP Whois Enrichment']))
                         except Exception as e:
                             #print "Enrichment of {0} failed due to {1}.".format(row[1]['indicator'], e)  # DEBUG
                             logging.info("Enrichment of {0} failed due to {1}.".format(row[1]['indicator'], e))
@@ -303,8 +288,9 @@ class PluginOne(IPlugin):
                             except:
                                 pass
 
+                        g = g.build()
                         try:
-                            self.app.store_graph(self.Verum.remove_non_ascii_from_graph(g))
+                            self.app.store_graph(self.Verum.remove_non_ascii_from_graph(g), storage=self.storage)
                         except:
                             print g.nodes(data=True)  # DEBUG
                             print g.edges(data=True)  # DEBUG
@@ -313,7 +299,7 @@ class PluginOne(IPlugin):
                     if len(ips) >= 50:
                         # Do cymru enrichment
                         try:
-                            self.app.store_graph(self.app.run_enrichments(ips, 'ip', names=[u'Cymru Enrichment']))
+                            self.app.store_graph(self.app.run_enrichments(ips, 'ip', names=[u'Cymru Enrichment']), storage=self.storage)
                         except:
                             logging.info("Cymru enrichment of {0} IPs failed.".format(len(ips)))
                             pass
@@ -322,6 +308,9 @@ class PluginOne(IPlugin):
                 # Copy today's data to yesterday
                 self.yesterday = df
 
+                # Write anything still buffered by write-behind before waiting for the next feed
+                self.app.flush(self.storage)
+
                 # Copy today's date to today
                 self.today = datetime.utcnow()
 
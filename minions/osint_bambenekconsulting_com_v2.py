@@ -51,8 +51,6 @@ from yapsy.IPlugin import IPlugin
 import logging
 import networkx as nx
 from datetime import datetime # timedelta imported above
-import dateutil
-import uuid
 import ConfigParser
 import inspect
 import pandas as pd  # for organizing the intel list data
@@ -90,6 +88,7 @@ else:
 ## EXECUTION
 class PluginOne(IPlugin):
     thread = None
+    storage = None  # The storage plugin the minion writes to
     app = None  # The object instance
     Verum = None  # the module
     today = datetime.strptime("1970", "%Y")  # Today's date
@@ -162,11 +161,12 @@ class PluginOne(IPlugin):
 
 
     def minion(self,  storage=None, *args, **xargs):        
-        self.app = self.Verum.app(self.parent.PluginFolder, None)
-        # set storage
+        # Share the parent app rather than loading a copy of every plugin.  The app is thread safe.
+        self.app = self.parent
+        # set storage.  Passed to store_graph() rather than set on the shared app.
         if storage is None:
             storage = self.parent.storage
-        self.app.set_interface(storage)
+        self.storage = storage
 
         # Check until stopped
         while not self.shutdown:
@@ -191,7 +191,7 @@ class PluginOne(IPlugin):
                     l = row.find("Feed generated at:")
                     if l > -1:
                         dt = row[l+18:].strip()
-                        dt = dateutil.parser.parse(dt).strftime("%Y-%m-%dT%H:%M:%SZ")
+                        dt = self.Verum.timeutil.parse(dt)
                         next
                     row = row.split(",")
 
@@ -241,7 +241,7 @@ class PluginOne(IPlugin):
 
                             # Add indicator to graph
                             ## (Must account for the different types of indicators)
-                            target_uri = "class=attribute&key={0}&value={1}".format('domain', row[0]) 
+                            target_uri = self.Verum.uri.node_uri('domain', row[0]) 
                             g.add_node(target_uri, {
                                 'class': 'attribute',
                                 'key': 'domain',
@@ -252,7 +252,7 @@ class PluginOne(IPlugin):
 
 
                             # Threat node
-                            threat_uri = "class=attribute&key={0}&value={1}".format("malware", row[4]) 
+                            threat_uri = self.Verum.uri.node_uri("malware", row[4]) 
                             g.add_node(threat_uri, {
                                 'class': 'attribute',
                                 'key': "malware",
@@ -267,22 +267,14 @@ class PluginOne(IPlugin):
                                 "origin": row[5],
                                 "start_time": dt
                             }
-                            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, target_uri)
-                            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, threat_uri)
-                            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-                            rel_chain = "relationship"
-                            while rel_chain in edge_attr:
-                                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                                rel_chain = edge_attr[rel_chain]
-                            if "origin" in edge_attr:
-                                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+                            edge_uri = self.Verum.uri.edge_uri(target_uri, threat_uri, edge_attr)
                             edge_attr["uri"] = edge_uri
                             g.add_edge(target_uri, threat_uri, edge_uri, edge_attr)                        
 
                             # for each IP associated with the domain, connect it to the target
                             for ip in row[1]:
                                 # Create IP node
-                                target_ip_uri = "class=attribute&key={0}&value={1}".format("ip", ip) 
+                                target_ip_uri = self.Verum.uri.node_uri("ip", ip) 
                                 g.add_node(target_ip_uri, {
                                     'class': 'attribute',
                                     'key': "ip",
@@ -297,22 +289,14 @@ class PluginOne(IPlugin):
                                     "origin": row[5],
                                     "start_time": dt,
                                 }
-                                source_hash = uuid.uuid3(uuid.NAMESPACE_URL, target_uri)
-                                dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, target_ip_uri)
-                                edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-                                rel_chain = "relationship"
-                                while rel_chain in edge_attr:
-                                    edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                                    rel_chain = edge_attr[rel_chain]
-                                if "origin" in edge_attr:
-                                    edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+                                edge_uri = self.Verum.uri.edge_uri(target_uri, target_ip_uri, edge_attr)
                                 edge_attr["uri"] = edge_uri
                                 g.add_edge(target_uri, target_ip_uri, edge_uri, edge_attr)
 
 
                             for nameserver in row[2]:
                                 # Create nameserver node
-                                ns_uri = "class=attribute&key={0}&value={1}".format("domain", nameserver) 
+                                ns_uri = self.Verum.uri.node_uri("domain", nameserver) 
                                 g.add_node(ns_uri, {
                                     'class': 'attribute',
                                     'key': "domain",
@@ -328,15 +312,7 @@ class PluginOne(IPlugin):
                                     "start_time": dt,
                                     'describedBy': 'nameserver'
                                 }
-                                source_hash = uuid.uuid3(uuid.NAMESPACE_URL, target_uri)
-                                dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, target_ip_uri)
-                                edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-                                rel_chain = "relationship"
-                                while rel_chain in edge_attr:
-                                    edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                                    rel_chain = edge_attr[rel_chain]
-                                if "origin" in edge_attr:
-                                    edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+                                edge_uri = self.Verum.uri.edge_uri(target_uri, target_ip_uri, edge_attr)
                                 edge_attr["uri"] = edge_uri
                                 g.add_edge(target_uri, ns_uri, edge_uri, edge_attr)
 
@@ -345,7 +321,7 @@ class PluginOne(IPlugin):
                                 for i in range(len(row[2])):
                                     for j in range(len(row[3])/len(row[2])):
                                         # Create NS IP node
-                                        ns_ip_uri = "class=attribute&key={0}&value={1}".format("ip", row[3][i*len(row[3])/len(row[2]) + j]) 
+                                        ns_ip_uri = self.Verum.uri.node_uri("ip", row[3][i*len(row[3])/len(row[2]) + j]) 
                                         g.add_node(ns_ip_uri, {
                                             'class': 'attribute',
                                             'key': "ip",
@@ -355,7 +331,7 @@ class PluginOne(IPlugin):
                                         })
 
                                         # create NS uri
-                                        ns_uri = "class=attribute&key={0}&value={1}".format("domain", row[2][i]) 
+                                        ns_uri = self.Verum.uri.node_uri("domain", row[2][i]) 
 
 
                                         # link NS to IP
@@ -364,15 +340,7 @@ class PluginOne(IPlugin):
                                             "origin": row[5],
                                             "start_time": dt
                                         }
-                                        source_hash = uuid.uuid3(uuid.NAMESPACE_URL, ns_uri)
-                                        dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, ns_ip_uri)
-                                        edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-                                        rel_chain = "relationship"
-                                        while rel_chain in edge_attr:
-                                            edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                                            rel_chain = edge_attr[rel_chain]
-                                        if "origin" in edge_attr:
-                                            edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+                                        edge_uri = self.Verum.uri.edge_uri(ns_uri, ns_ip_uri, edge_attr)
                                         edge_attr["uri"] = edge_uri
                                         g.add_edge(ns_uri, ns_ip_uri, edge_uri, edge_attr)
 
@@ -380,7 +348,7 @@ class PluginOne(IPlugin):
                             else:
                                 for ip in row[3]:
                                     # Create NS IP node
-                                    ns_ip_uri = "class=attribute&key={0}&value={1}".format("ip", ip) 
+                                    ns_ip_uri = self.Verum.uri.node_uri("ip", ip) 
                                     g.add_node(ns_ip_uri, {
                                         'class': 'attribute',
                                         'key': "ip",
@@ -391,7 +359,7 @@ class PluginOne(IPlugin):
                                     
                                     for ns in row[2]:
                                         # create NS uri
-                                        ns_uri = "class=attribute&key={0}&value={1}".format("domain", ns)
+                                        ns_uri = self.Verum.uri.node_uri("domain", ns)
 
                                          # link NS to IP
                                         edge_attr = {
@@ -399,26 +367,19 @@ class PluginOne(IPlugin):
                                             "origin": row[5],
                                             "start_time": dt
                                         }
-                                        source_hash = uuid.uuid3(uuid.NAMESPACE_URL, ns_uri)
-                                        dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, ns_ip_uri)
-                                        edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-                                        rel_chain = "relationship"
-                                        while rel_chain in edge_attr:
-                                            edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                                            rel_chain = edge_attr[rel_chain]
-                                        if "origin" in edge_attr:
-                                            edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+                                        edge_uri = self.Verum.uri.edge_uri(ns_uri, ns_ip_uri, edge_attr)
                                         edge_attr["uri"] = edge_uri
                                         g.add_edge(ns_uri, ns_ip_uri, edge_uri, edge_attr)
 
                             # classify malicious and merge with current graph
-                            g = self.Verum.merge_graphs(g, self.app.classify.run({'key': 'domain', 'value': row[0], 'classification': 'malice'}))
+                            g = self.Verum.GraphAccumulator(g)
+                            g.add(self.app.classify.run({'key': 'domain', 'value': row[0], 'classification': 'malice'}))
 
                             # enrich depending on type
                             for domain in [row[0]] + row[2]:
                                 try:
-                                    g = self.Verum.merge_graphs(g, self.app.run_enrichments(domain, "domain", names=['TLD Enrichment']))
-                                    g = self.Verum.merge_graphs(g, self.app.run_enrichments(domain, "domain", names=['IP Whois Enrichment']))
+                                    g.add(self.app.run_enrichments(domain, "domain", names=['TLD Enrichment']))
+                                    g.add(self.app.run_enrichments(domain, "domain", names=['IP Whois Enrichment']))
                                 except Exception as e:
                                     logging.info("Enrichment of {0} failed due to {1}.".format(domain, e))
                                     #print "Enrichment of {0} failed due to {1}.".format(domain, e)  # DEBUG
@@ -426,13 +387,14 @@ class PluginOne(IPlugin):
                                     pass
                             for ip in row[1] + row[3]:
                                 try:
-                                    g = self.Verum.merge_graphs(g, self.app.run_enrichments(ip, "ip", names=[u'Maxmind ASN Enrichment']))
+                                    g.add(self.app.run_enrichments(ip, "ip", names=[u'Maxmind ASN Enrichment']))
                                 except Exception as e:
                                     logging.info("Enrichment of {0} failed due to {1}.".format(ip, e))
                                     pass
 
+                            g = g.build()
                             try:
-                                self.app.store_graph(self.Verum.remove_non_ascii_from_graph(g))
+                                self.app.store_graph(self.Verum.remove_non_ascii_from_graph(g), storage=self.storage)
                             except:
                                 print g.nodes(data=True)  # DEBUG
                                 print g.edges(data=True)  # DEBUG
@@ -451,7 +413,7 @@ class PluginOne(IPlugin):
                                 ips = ips2
                                 del(ips2)
                                 try:
-                                    self.app.store_graph(self.app.run_enrichments(ips, 'ip', names=[u'Cymru Enrichment']))
+                                    self.app.store_graph(self.app.run_enrichments(ips, 'ip', names=[u'Cymru Enrichment']), storage=self.storage)
                                     #print "Cymru enrichment complete."
                                 except Exception as e:
                                     logging.info("Cymru enrichment of {0} IPs failed due to {1}.".format(len(ips), e))
@@ -464,6 +426,9 @@ class PluginOne(IPlugin):
                             print e
                             raise
 
+                # Write anything still buffered by write-behind before waiting for the next feed
+                self.app.flush(self.storage)
+
                 # Copy today's date to today
                 self.today = datetime.utcnow()
 
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ The verum modules the plugins share, loaded once for all of them.
+
+ NOTES:
+ Plugins are loaded by location (by yapsy or standalone) so they can't import verum's modules relatively.  Each
+  plugin loads this file once with:
+  shared = sys.modules.get("verum_plugins_shared") or imp.load_source("verum_plugins_shared", loc + "_shared.py")
+ When the plugins are loaded by the app, these are the app's own modules (verum.uri etc.) so module state such as
+  the uri memos and the tracer is shared.  Otherwise they're loaded from ../verum/ by location.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import sys
+import imp
+import os
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+helper = sys.modules.get("verum.helper", sys.modules.get("verum_helper"))
+if helper is None:
+    fp, pathname, description = imp.find_module("helper", [os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                        "..", "verum")])
+    try:
+        helper = imp.load_module("verum_helper", fp, pathname, description)
+    finally:
+        if fp is not None:
+            fp.close()
+uri = helper.load_shared("uri")
+timeutil = helper.load_shared("timeutil")
+sanitize = helper.load_shared("sanitize")
+tracing = helper.load_shared("tracing")
@@ -48,8 +48,8 @@ from yapsy.IPlugin import IPlugin
 import logging
 import networkx as nx
 from datetime import datetime # timedelta imported above
-import dateutil  # to parse variable time strings
-import uuid
+import sys
+import imp
 import ConfigParser
 import inspect
 try:
@@ -65,6 +65,8 @@ except:
 loc = inspect.getfile(inspect.currentframe())
 ind = loc.rfind("/")
 loc = loc[:ind+1]
+shared = sys.modules.get("verum_plugins_shared") or imp.load_source("verum_plugins_shared", loc + "_shared.py")
+uris, timeutil = shared.uri, shared.timeutil
 config = ConfigParser.SafeConfigParser()
 config.readfp(open(loc + PLUGIN_CONFIG_FILE))
 
@@ -137,18 +139,10 @@ class PluginOne(IPlugin):
 
         g = nx.MultiDiGraph()
 
-        if type(start_time) is str:
-            try:
-                time = dateutil.parser.parse(start_time).strftime("%Y-%m-%dT%H:%M:%SZ")
-            except:
-                time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-        elif type(start_time) is datetime:
-            time = start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
-        else:
-            time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        time = timeutil.normalize(start_time)
 
         # Get or create target node
-        target_uri = "class=attribute&key={0}&value={1}".format(key, value)
+        target_uri = uris.node_uri(key, value)
         g.add_node(target_uri, {
             'class': 'attribute',
             'key': key,
@@ -158,7 +152,7 @@ class PluginOne(IPlugin):
         })
 
         # Get or create classification node
-        classification_uri = "class=attribute&key={0}&value={1}".format("classification", classification)
+        classification_uri = uris.node_uri("classification", classification)
         g.add_node(classification_uri, {
             'class': 'attribute',
             'key': "classification",
@@ -175,15 +169,7 @@ class PluginOne(IPlugin):
             "origin": "classification",
             "confidence": confidence
         }
-        source_hash = uuid.uuid3(uuid.NAMESPACE_URL, target_uri)
-        dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, classification_uri)
-        edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-        rel_chain = "relationship"
-        while rel_chain in edge_attr:
-            edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-            rel_chain = edge_attr[rel_chain]
-        if "origin" in edge_attr:
-            edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+        edge_uri = uris.edge_uri(target_uri, classification_uri, edge_attr)
         edge_attr["uri"] = edge_uri
         g.add_edge(target_uri, classification_uri, edge_uri, edge_attr)
 
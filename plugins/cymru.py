@@ -49,8 +49,7 @@ from yapsy.IPlugin import IPlugin
 import logging
 import ConfigParser
 from datetime import datetime # timedelta imported above
-import dateutil  # to parse variable time strings
-import uuid
+import sys
 import imp
 import ipaddress
 import inspect
@@ -61,6 +60,8 @@ __author__ = "Gabriel Bassett"
 loc = inspect.getfile(inspect.currentframe())
 i = loc.rfind("/")
 loc = loc[:i+1]
+shared = sys.modules.get("verum_plugins_shared") or imp.load_source("verum_plugins_shared", loc + "_shared.py")
+uris, timeutil = shared.uri, shared.timeutil
 config = ConfigParser.SafeConfigParser()
 config.readfp(open(loc + CYMRU_CONFIG_FILE))
 
@@ -140,15 +141,7 @@ class PluginOne(IPlugin):
         """
 
         # Parse the start_time
-        if type(start_time) is str:
-            try:
-                time = dateutil.parser.parse(start_time).strftime("%Y-%m-%dT%H:%M:%SZ")
-            except:
-                time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-        elif type(start_time) is datetime:
-            time = start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
-        else:
-            time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        time = timeutil.normalize(start_time)
 
 
         # Since sometimes I just pass in an IP, we'll fix it here.
@@ -162,7 +155,7 @@ class PluginOne(IPlugin):
         g = nx.MultiDiGraph()
 
         # Create cymru ASN enrichment node
-        cymru_asn_uri = "class=attribute&key={0}&value={1}".format("enrichment", "cymru_asn_enrichment")
+        cymru_asn_uri = uris.node_uri("enrichment", "cymru_asn_enrichment")
         attributes = {
             'class': 'attribute',
             'key': 'enrichment',
@@ -178,11 +171,11 @@ class PluginOne(IPlugin):
 
         for result in a.query(ips):
             try:
-                t = dateutil.parser(result.allocated_at).strftime("%Y-%m-%dT%H:%M:%SZ")
+                t = timeutil.parse(result.allocated_at)
             except:
                 t = time
             # Create ip's node
-            ip_uri = "class=attribute&key={0}&value={1}".format("ip", result.ip_address)
+            ip_uri = uris.node_uri("ip", result.ip_address)
             g.add_node(ip_uri, {
                 'class': 'attribute',
                 'key': "ip",
@@ -197,21 +190,13 @@ class PluginOne(IPlugin):
                 "origin": "cymru_asn_enrichment",
                 "start_time": time,
             }
-            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, ip_uri)
-            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, cymru_asn_uri)
-            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-            rel_chain = "relationship"
-            while rel_chain in edge_attr:
-                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                rel_chain = edge_attr[rel_chain]
-            if "origin" in edge_attr:
-                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+            edge_uri = uris.edge_uri(ip_uri, cymru_asn_uri, edge_attr)
             edge_attr["uri"] = edge_uri
             g.add_edge(ip_uri, cymru_asn_uri, edge_uri, edge_attr)
 
 
             # Create bgp prefix node
-            bgp_uri = "class=attribute&key={0}&value={1}".format("bgp", result.bgp_prefix)
+            bgp_uri = uris.node_uri("bgp", result.bgp_prefix)
             attributes = {
                 'class': 'attribute',
                 'key': 'bgp',
@@ -227,21 +212,13 @@ class PluginOne(IPlugin):
                 "origin": "cymru_asn_enrichment",
                 "start_time": time,
             }
-            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, ip_uri)
-            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, bgp_uri)
-            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-            rel_chain = "relationship"
-            while rel_chain in edge_attr:
-                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                rel_chain = edge_attr[rel_chain]
-            if "origin" in edge_attr:
-                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+            edge_uri = uris.edge_uri(ip_uri, bgp_uri, edge_attr)
             edge_attr["uri"] = edge_uri
             g.add_edge(ip_uri, bgp_uri, edge_uri, edge_attr)
 
 
             # create asn node
-            asn_uri = "class=attribute&key={0}&value={1}".format("asn", result.as_number)
+            asn_uri = uris.node_uri("asn", result.as_number)
             attributes = {
                 'class': 'attribute',
                 'key': 'asn',
@@ -261,15 +238,7 @@ class PluginOne(IPlugin):
                 "origin": "cymru_asn_enrichment",
                 "start_time": t,
             }
-            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, ip_uri)
-            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, asn_uri)
-            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-            rel_chain = "relationship"
-            while rel_chain in edge_attr:
-                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                rel_chain = edge_attr[rel_chain]
-            if "origin" in edge_attr:
-                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+            edge_uri = uris.edge_uri(ip_uri, asn_uri, edge_attr)
             edge_attr["uri"] = edge_uri
             g.add_edge(ip_uri, asn_uri, edge_uri, edge_attr)
 
@@ -44,9 +44,9 @@ NAME = "DNS Enrichment"
 from yapsy.IPlugin import IPlugin
 import networkx as nx
 from datetime import datetime
-import dateutil  # to parse variable time strings
 import socket
-import uuid
+import sys
+import imp
 import ConfigParser
 import logging
 import inspect
@@ -61,6 +61,8 @@ __author__ = "Gabriel Bassett"
 loc = inspect.getfile(inspect.currentframe())
 ind = loc.rfind("/")
 loc = loc[:ind+1]
+shared = sys.modules.get("verum_plugins_shared") or imp.load_source("verum_plugins_shared", loc + "_shared.py")
+uris, timeutil = shared.uri, shared.timeutil
 config = ConfigParser.SafeConfigParser()
 config.readfp(open(loc + DNS_CONFIG_FILE))
 
@@ -114,20 +116,12 @@ class PluginOne(IPlugin):
         """
 
         # Parse the start_time
-        if type(start_time) is str:
-            try:
-                time = dateutil.parser.parse(start_time).strftime("%Y-%m-%dT%H:%M:%SZ")
-            except:
-                time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-        elif type(start_time) is datetime:
-            time = start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
-        else:
-            time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        time = timeutil.normalize(start_time)
 
         g = nx.MultiDiGraph()
 
         # Get or create Domain node
-        domain_uri = "class=attribute&key={0}&value={1}".format("domain", domain)
+        domain_uri = uris.node_uri("domain", domain)
         g.add_node(domain_uri, {
             'class': 'attribute',
             'key': "domain",
@@ -143,7 +137,7 @@ class PluginOne(IPlugin):
             return g
 
         # Get or create Enrichment node
-        dns_uri = "class=attribute&key={0}&value={1}".format("enrichment", "dns")
+        dns_uri = uris.node_uri("enrichment", "dns")
         g.add_node(dns_uri, {
             'class': 'attribute',
             'key': "enrichment",
@@ -152,7 +146,7 @@ class PluginOne(IPlugin):
             "uri": dns_uri
         })
 
-        ip_uri = "class=attribute&key={0}&value={1}".format("ip", ip)
+        ip_uri = uris.node_uri("ip", ip)
         g.add_node(ip_uri, {
             'class': 'attribute',
             'key': "ip",
@@ -167,15 +161,7 @@ class PluginOne(IPlugin):
             "start_time": time,
             "origin": "dns"
         }
-        source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-        dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, ip_uri)
-        edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-        rel_chain = "relationship"
-        while rel_chain in edge_attr:
-            edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-            rel_chain = edge_attr[rel_chain]
-        if "origin" in edge_attr:
-            edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+        edge_uri = uris.edge_uri(domain_uri, ip_uri, edge_attr)
         edge_attr["uri"] = edge_uri
         g.add_edge(domain_uri, ip_uri, edge_uri, {"start_time": time})
 
@@ -185,15 +171,7 @@ class PluginOne(IPlugin):
             "start_time": time,
             "origin": "dns"
         }
-        source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-        dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, dns_uri)
-        edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-        rel_chain = "relationship"
-        while rel_chain in edge_attr:
-            edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-            rel_chain = edge_attr[rel_chain]
-        if "origin" in edge_attr:
-            edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+        edge_uri = uris.edge_uri(domain_uri, dns_uri, edge_attr)
         edge_attr["uri"] = edge_uri
         g.add_edge(domain_uri, dns_uri, edge_uri, edge_attr)
 
@@ -210,7 +188,7 @@ class PluginOne(IPlugin):
                 ns = ns.to_text().rstrip(".")
 
                 # Create the nameserver node
-                ns_uri = "class=attribute&key={0}&value={1}".format("domain", ns)
+                ns_uri = uris.node_uri("domain", ns)
                 g.add_node(ns_uri, {
                     'class': 'attribute',
                     'key': "domain",
@@ -226,15 +204,7 @@ class PluginOne(IPlugin):
                     "origin": "dns",
                     "describedBy": "nameserver" 
                 }
-                source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-                dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, ns_uri)
-                edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-                rel_chain = "relationship"
-                while rel_chain in edge_attr:
-                    edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                    rel_chain = edge_attr[rel_chain]
-                if "origin" in edge_attr:
-                    edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+                edge_uri = uris.edge_uri(domain_uri, ns_uri, edge_attr)
                 edge_attr["uri"] = edge_uri
                 g.add_edge(domain_uri, ns_uri, edge_uri, edge_attr)
 
@@ -48,8 +48,8 @@ from yapsy.IPlugin import IPlugin
 import logging
 import networkx as nx
 from datetime import datetime # timedelta imported above
-import dateutil  # to parse variable time strings
-import uuid
+import sys
+import imp
 import ConfigParser
 import inspect
 try:
@@ -65,6 +65,8 @@ except:
 loc = inspect.getfile(inspect.currentframe())
 ind = loc.rfind("/")
 loc = loc[:ind+1]
+shared = sys.modules.get("verum_plugins_shared") or imp.load_source("verum_plugins_shared", loc + "_shared.py")
+uris, timeutil = shared.uri, shared.timeutil
 config = ConfigParser.SafeConfigParser()
 config.readfp(open(loc + PLUGIN_CONFIG_FILE))
 
@@ -139,18 +141,10 @@ class PluginOne(IPlugin):
 
         g = nx.MultiDiGraph()
 
-        if type(start_time) is str:
-            try:
-                time = dateutil.parser.parse(start_time).strftime("%Y-%m-%dT%H:%M:%SZ")
-            except:
-                time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-        elif type(start_time) is datetime:
-            time = start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
-        else:
-            time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        time = timeutil.normalize(start_time)
 
         # Get or create target node
-        described_uri = "class=attribute&key={0}&value={1}".format(described_key, described_value)
+        described_uri = uris.node_uri(described_key, described_value)
         g.add_node(described_uri, {
             'class': 'attribute',
             'key': described_key,
@@ -160,7 +154,7 @@ class PluginOne(IPlugin):
         })
 
         # Get or create classification node
-        describing_uri = "class=attribute&key={0}&value={1}".format(describing_key, describing_value)
+        describing_uri = uris.node_uri(describing_key, describing_value)
         g.add_node(describing_uri , {
             'class': 'attribute',
             'key': describing_key,
@@ -177,15 +171,7 @@ class PluginOne(IPlugin):
             "origin": "generic",
             "confidence": confidence
         }
-        source_hash = uuid.uuid3(uuid.NAMESPACE_URL, described_uri)
-        dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, describing_uri )
-        edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-        rel_chain = "relationship"
-        while rel_chain in edge_attr:
-            edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-            rel_chain = edge_attr[rel_chain]
-        if "origin" in edge_attr:
-            edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+        edge_uri = uris.edge_uri(described_uri, describing_uri, edge_attr)
         edge_attr["uri"] = edge_uri
         g.add_edge(described_uri, describing_uri , edge_uri, edge_attr)
 
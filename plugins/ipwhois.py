@@ -59,8 +59,8 @@ import logging
 import ConfigParser
 import networkx as nx
 from datetime import datetime # timedelta imported above
-import dateutil  # to parse variable time strings
-import uuid
+import sys
+import imp
 import inspect
 import socket
 import tldextract
@@ -77,6 +77,8 @@ __author__ = "Gabriel Bassett"
 loc = inspect.getfile(inspect.currentframe())
 ind = loc.rfind("/")
 loc = loc[:ind+1]
+shared = sys.modules.get("verum_plugins_shared") or imp.load_source("verum_plugins_shared", loc + "_shared.py")
+uris, timeutil = shared.uri, shared.timeutil
 config = ConfigParser.SafeConfigParser()
 config.readfp(open(loc + WHOIS_CONFIG_FILE))
 
@@ -175,15 +177,7 @@ class PluginOne(IPlugin):
         """
 
         # Parse the start_time
-        if type(start_time) is str:
-            try:
-                time = dateutil.parser.parse(start_time).strftime("%Y-%m-%dT%H:%M:%SZ")
-            except:
-                time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-        elif type(start_time) is datetime:
-            time = start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
-        else:
-            time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        time = timeutil.normalize(start_time)
 
         # Create the graph
         g = nx.MultiDiGraph()
@@ -195,7 +189,7 @@ class PluginOne(IPlugin):
         else:
             raise ValueError("Record not in correct format.")
         try:
-            record_time = dateutil.parser.parse(record[1]).strftime("%Y-%m-%dT%H:%M:%SZ")
+            record_time = timeutil.parse(record[1])
         except:
             raise ValueError("Record date {0} in wrong format.".format(record[1]))
         try:
@@ -216,7 +210,7 @@ class PluginOne(IPlugin):
 
 
         # Get or create Domain node
-        domain_uri = "class=attribute&key={0}&value={1}".format("domain", record[2])
+        domain_uri = uris.node_uri("domain", record[2])
         g.add_node(domain_uri, {
             'class': 'attribute',
             'key': "domain",
@@ -230,7 +224,7 @@ class PluginOne(IPlugin):
             return g
 
         # Get or create Enrichment node
-        whois_record_uri = "class=attribute&key={0}&value={1}".format("enrichment", "whois_record")
+        whois_record_uri = uris.node_uri("enrichment", "whois_record")
         g.add_node(whois_record_uri, {
             'class': 'attribute',
             'key': "enrichment",
@@ -241,7 +235,7 @@ class PluginOne(IPlugin):
 
         if record[3] and record[3].lower() != 'none':
             # Registrant Name node
-            name_uri = "class=attribute&key={0}&value={1}".format("name", record[3].encode("ascii", "ignore"))
+            name_uri = uris.node_uri("name", record[3].encode("ascii", "ignore"))
             g.add_node(name_uri, {
                 'class': 'attribute',
                 'key': "name",
@@ -257,21 +251,13 @@ class PluginOne(IPlugin):
                 "describeBy": "registrant_name",
                 "origin": "ipwhois_record_enrichment"
             }
-            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, name_uri)
-            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-            rel_chain = "relationship"
-            while rel_chain in edge_attr:
-                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                rel_chain = edge_attr[rel_chain]
-            if "origin" in edge_attr:
-                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+            edge_uri = uris.edge_uri(domain_uri, name_uri, edge_attr)
             edge_attr["uri"] = edge_uri
             g.add_edge(domain_uri, name_uri, edge_uri, edge_attr)
 
         if record[4] and record[4].lower() != 'none':
             # Registrant Organization Node
-            reg_org_uri = "class=attribute&key={0}&value={1}".format("organization", record[4].encode("ascii", "ignore"))
+            reg_org_uri = uris.node_uri("organization", record[4].encode("ascii", "ignore"))
             g.add_node(reg_org_uri, {
                 'class': 'attribute',
                 'key': "organization",
@@ -287,21 +273,13 @@ class PluginOne(IPlugin):
                 "describeBy": "registrant_organization",
                 "origin": "ipwhois_record_enrichment"
             }
-            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, reg_org_uri)
-            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-            rel_chain = "relationship"
-            while rel_chain in edge_attr:
-                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                rel_chain = edge_attr[rel_chain]
-            if "origin" in edge_attr:
-                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+            edge_uri = uris.edge_uri(domain_uri, reg_org_uri, edge_attr)
             edge_attr["uri"] = edge_uri
             g.add_edge(domain_uri, reg_org_uri, edge_uri, edge_attr)
 
         if record[5] and record[5].lower() != 'none':
             # Registrant Organization Address Node
-            reg_org_addr_uri = "class=attribute&key={0}&value={1}".format("address", record[5].encode("ascii", "ignore"))
+            reg_org_addr_uri = uris.node_uri("address", record[5].encode("ascii", "ignore"))
             g.add_node(reg_org_addr_uri, {
                 'class': 'attribute',
                 'key': "address",
@@ -317,21 +295,13 @@ class PluginOne(IPlugin):
                 "describeBy": "registrant_organization_address",
                 "origin": "ipwhois_record_enrichment"
             }
-            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, reg_org_addr_uri)
-            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-            rel_chain = "relationship"
-            while rel_chain in edge_attr:
-                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                rel_chain = edge_attr[rel_chain]
-            if "origin" in edge_attr:
-                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+            edge_uri = uris.edge_uri(domain_uri, reg_org_addr_uri, edge_attr)
             edge_attr["uri"] = edge_uri
             g.add_edge(domain_uri, reg_org_addr_uri, edge_uri, edge_attr)
 
         if record[6] and record[6].lower() != 'none':
             # Registrant Organization City Node
-            reg_org_city_uri = "class=attribute&key={0}&value={1}".format("city", record[6].encode("ascii", "ignore").lower())
+            reg_org_city_uri = uris.node_uri("city", record[6].encode("ascii", "ignore").lower())
             g.add_node(reg_org_city_uri, {
                 'class': 'attribute',
                 'key': "city",
@@ -347,15 +317,7 @@ class PluginOne(IPlugin):
                 "describeBy": "registrant_organization_city",
                 "origin": "ipwhois_record_enrichment"
             }
-            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, reg_org_city_uri)
-            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-            rel_chain = "relationship"
-            while rel_chain in edge_attr:
-                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                rel_chain = edge_attr[rel_chain]
-            if "origin" in edge_attr:
-                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+            edge_uri = uris.edge_uri(domain_uri, reg_org_city_uri, edge_attr)
             edge_attr["uri"] = edge_uri
             g.add_edge(domain_uri, reg_org_city_uri, edge_uri, edge_attr)
 
@@ -366,7 +328,7 @@ class PluginOne(IPlugin):
             else:
                 state = record[7]
             # Registrant Organization State Node
-            reg_org_state_uri = "class=attribute&key={0}&value={1}".format("state", state.encode("ascii", "ignore").lower())
+            reg_org_state_uri = uris.node_uri("state", state.encode("ascii", "ignore").lower())
             g.add_node(reg_org_state_uri, {
                 'class': 'attribute',
                 'key': "state",
@@ -382,21 +344,13 @@ class PluginOne(IPlugin):
                 "describeBy": "registrant_organization_state",
                 "origin": "ipwhois_record_enrichment"
             }
-            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, reg_org_state_uri)
-            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-            rel_chain = "relationship"
-            while rel_chain in edge_attr:
-                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                rel_chain = edge_attr[rel_chain]
-            if "origin" in edge_attr:
-                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+            edge_uri = uris.edge_uri(domain_uri, reg_org_state_uri, edge_attr)
             edge_attr["uri"] = edge_uri
             g.add_edge(domain_uri, reg_org_state_uri, edge_uri, edge_attr)
 
         if record[8] and record[8].lower() != 'none':
         # Registrant Organization Country Node
-            reg_org_country_uri = "class=attribute&key={0}&value={1}".format("country", record[8].encode("ascii", "ignore").lower())
+            reg_org_country_uri = uris.node_uri("country", record[8].encode("ascii", "ignore").lower())
             g.add_node(reg_org_country_uri, {
                 'class': 'attribute',
                 'key': "country",
@@ -412,21 +366,13 @@ class PluginOne(IPlugin):
                 "describeBy": "registrant_organization_country",
                 "origin": "ipwhois_record_enrichment"
             }
-            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, reg_org_country_uri)
-            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-            rel_chain = "relationship"
-            while rel_chain in edge_attr:
-                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                rel_chain = edge_attr[rel_chain]
-            if "origin" in edge_attr:
-                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+            edge_uri = uris.edge_uri(domain_uri, reg_org_country_uri, edge_attr)
             edge_attr["uri"] = edge_uri
             g.add_edge(domain_uri, reg_org_country_uri, edge_uri, edge_attr)
 
         if record[9] and record[9].lower() != 'none':
             # Registrant Organization email Node
-            reg_org_email_uri = "class=attribute&key={0}&value={1}".format("email_address", record[9].encode("ascii", "ignore"))
+            reg_org_email_uri = uris.node_uri("email_address", record[9].encode("ascii", "ignore"))
             g.add_node(reg_org_email_uri, {
                 'class': 'attribute',
                 'key': "email_address",
@@ -442,15 +388,7 @@ class PluginOne(IPlugin):
                 "describeBy": "registrant_email",
                 "origin": "ipwhois_record_enrichment"
             }
-            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, reg_org_email_uri)
-            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-            rel_chain = "relationship"
-            while rel_chain in edge_attr:
-                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                rel_chain = edge_attr[rel_chain]
-            if "origin" in edge_attr:
-                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+            edge_uri = uris.edge_uri(domain_uri, reg_org_email_uri, edge_attr)
             edge_attr["uri"] = edge_uri
             g.add_edge(domain_uri, reg_org_email_uri, edge_uri, edge_attr)
 
@@ -460,15 +398,7 @@ class PluginOne(IPlugin):
             "start_time": time,
             "origin": "ipwhois_record_enrichment"
         }
-        source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-        dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, whois_record_uri)
-        edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-        rel_chain = "relationship"
-        while rel_chain in edge_attr:
-            edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-            rel_chain = edge_attr[rel_chain]
-        if "origin" in edge_attr:
-            edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+        edge_uri = uris.edge_uri(domain_uri, whois_record_uri, edge_attr)
         edge_attr["uri"] = edge_uri
         g.add_edge(domain_uri, whois_record_uri, edge_uri, edge_attr)
 
@@ -45,8 +45,8 @@ NAME = "Maxmind ASN Enrichment"
 from yapsy.IPlugin import IPlugin
 import logging
 from datetime import datetime # timedelta imported above
-import dateutil  # to parse variable time strings
-import uuid
+import sys
+import imp
 import ConfigParser
 import os
 import inspect
@@ -65,6 +65,8 @@ __author__ = "Gabriel Bassett"
 loc = inspect.getfile(inspect.currentframe())
 ind = loc.rfind("/")
 loc = loc[:ind+1]
+shared = sys.modules.get("verum_plugins_shared") or imp.load_source("verum_plugins_shared", loc + "_shared.py")
+uris, timeutil = shared.uri, shared.timeutil
 config = ConfigParser.SafeConfigParser()
 config.readfp(open(loc + MAXMIND_CONFIG_FILE))
 
@@ -144,15 +146,7 @@ class PluginOne(IPlugin):
         """
 
         # Parse the start_time
-        if type(start_time) is str:
-            try:
-                time = dateutil.parser.parse(start_time).strftime("%Y-%m-%dT%H:%M:%SZ")
-            except:
-                time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-        elif type(start_time) is datetime:
-            time = start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
-        else:
-            time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        time = timeutil.normalize(start_time)
 
         # Validate IP
         _ = ipaddress.ip_address(unicode(ip))
@@ -162,7 +156,7 @@ class PluginOne(IPlugin):
 
         g = nx.MultiDiGraph()
         # Create the maxmind ASN node
-        maxmind_asn_uri = "class=attribute&key={0}&value={1}".format("enrichment", "maxmind_asn")  # Move prefix assignment to merge_titan
+        maxmind_asn_uri = uris.node_uri("enrichment", "maxmind_asn")  # Move prefix assignment to merge_titan
         g.add_node(maxmind_asn_uri, {
             'class': 'attribute',
             'key': "enrichment",
@@ -172,7 +166,7 @@ class PluginOne(IPlugin):
         })
 
         # set IP URI
-        ip_uri = "class=attribute&key={0}&value={1}".format("ip", ip)
+        ip_uri = uris.node_uri("ip", ip)
         g.add_node(ip_uri, {
             'class': 'attribute',
             'key': "ip",
@@ -192,7 +186,7 @@ class PluginOne(IPlugin):
             ASN = ASN.split(" ", 1)
 
             # create ASN node
-            asn_uri = "class=attribute&key={0}&value={1}".format("asn", ASN[0][2:])
+            asn_uri = uris.node_uri("asn", ASN[0][2:])
             attributes = {
                 'class': 'attribute',
                 'key': 'asn',
@@ -210,15 +204,7 @@ class PluginOne(IPlugin):
                 "origin": "maxmind_enrichment",
                 "start_time": time,
             }
-            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, ip_uri)
-            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, asn_uri)
-            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-            rel_chain = "relationship"
-            while rel_chain in edge_attr:
-                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                rel_chain = edge_attr[rel_chain]
-            if "origin" in edge_attr:
-                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+            edge_uri = uris.edge_uri(ip_uri, asn_uri, edge_attr)
             edge_attr["uri"] = edge_uri
             g.add_edge(ip_uri, asn_uri, edge_uri, edge_attr)
 
@@ -229,15 +215,7 @@ class PluginOne(IPlugin):
                 "origin": "maxmind_enrichment",
                 "start_time": time,
             }
-            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, ip_uri)
-            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, maxmind_asn_uri)
-            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-            rel_chain = "relationship"
-            while rel_chain in edge_attr:
-                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                rel_chain = edge_attr[rel_chain]
-            if "origin" in edge_attr:
-                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+            edge_uri = uris.edge_uri(ip_uri, maxmind_asn_uri, edge_attr)
             edge_attr["uri"] = edge_uri
             g.add_edge(ip_uri, maxmind_asn_uri, edge_uri, edge_attr)
 
@@ -73,7 +73,8 @@ import sqlite3
 import networkx as nx
 import os
 import inspect
-import uuid
+import sys
+import imp
 
 ## SETUP
 __author__ = "Gabriel Bassett"
@@ -81,6 +82,8 @@ __author__ = "Gabriel Bassett"
 loc = inspect.getfile(inspect.currentframe())
 i = loc.rfind("/")
 loc = loc[:i+1]
+shared = sys.modules.get("verum_plugins_shared") or imp.load_source("verum_plugins_shared", loc + "_shared.py")
+uris, sanitize, tracing = shared.uri, shared.sanitize, shared.tracing
 config = ConfigParser.SafeConfigParser()
 config.readfp(open(loc + NEO4J_CONFIG_FILE))
 if config.has_section('neo4j'):
@@ -115,6 +118,8 @@ else:
 ## EXECUTION
 class PluginOne(IPlugin):
     neo4j_config = None
+    neo_graph = None  # py2neo graph reused by enrich().  Reset when the config changes.
+    tracer = tracing.Tracer()  # Records the plugin's spans.  Off until the app replaces it with its own tracer.
 
     def __init__(self):
         pass
@@ -156,9 +161,10 @@ class PluginOne(IPlugin):
             self.neo4j_config = "http://{2}:{3}@{0}:{1}/db/data/".format(host, port, username, password)
         else:
             self.neo4j_config = "http://{0}:{1}/db/data/".format(host, port)
+        self.neo_graph = None
 
 
-    def removeNonAscii(self, s): return "".join(i for i in s if ord(i)<128)
+    def removeNonAscii(self, s): return sanitize.ascii_only(s)
 
 
     def enrich(self, g):  # Neo4j
@@ -173,7 +179,9 @@ class PluginOne(IPlugin):
                merge.
         """
         #neo4j_graph = NEO_Graph(neo4j)  # Bulbs
-        neo_graph = py2neoGraph(self.neo4j_config)
+        if self.neo_graph is None:
+            self.neo_graph = py2neoGraph(self.neo4j_config)
+        neo_graph = self.neo_graph
         nodes = set()
         node_map = dict()
         edges = set()
@@ -194,7 +202,9 @@ class PluginOne(IPlugin):
             # TODO:  variables.
             tx.append(query, props)
         # commit transaction and create mapping of returned nodes to URIs for edge creation
-        for record_list in tx.commit():
+        with self.tracer.span("neo4j.commit_nodes", nodes=g.number_of_nodes()):
+            results = tx.commit()
+        for record_list in results:
             for record in record_list:
     #            print record, record.nodes[0]._Node__id, len(record.nodes)
                 for n in record.nodes:
@@ -249,7 +259,8 @@ class PluginOne(IPlugin):
         # create edges all at once
         #print edges  # Debug
     #    neo_graph.create(*edges)
-        tx.commit()
+        with self.tracer.span("neo4j.commit_edges", edges=g.number_of_edges()):
+            tx.commit()
 
 
     def query(self, topic, max_depth=3, dont_follow=['enrichment', 'classification'], config=None):
@@ -274,7 +285,8 @@ class PluginOne(IPlugin):
             cypher = ("MATCH (topic: {0} {1}) "
                       "RETURN collect(topic) as topics").format(data['class'], "{key:{KEY}, value:{VALUE}}")
             props = {"KEY":data['key'], "VALUE":data['value']}
-            records = neo_graph.cypher.execute(cypher, props)
+            with self.tracer.span("neo4j.find_topic", key=data['key'], value=data['value']):
+                records = neo_graph.cypher.execute(cypher, props)
             #print cypher, props  #  DEBUG
             #print type(records)
             for record in records:
@@ -293,7 +305,10 @@ class PluginOne(IPlugin):
                     "DONT_FOLLOW": dont_follow}
             #print cypher, attr  # DEBUG
 #            for record in neo_graph.cypher.stream(cypher, attr):  # Prefer streaming to execute, if it works
-            for record in neo_graph.cypher.execute(cypher, attr):
+            with self.tracer.span("neo4j.query_context", topics=len(topic_ids), max_depth=max_depth) as span:
+                records = neo_graph.cypher.execute(cypher, attr)
+                span.set(records=len(records))
+            for record in records:
                 #print record  # DEBUG
                 for node in record.nodes:
                     attr = dict(node.properties)
@@ -317,15 +332,7 @@ class PluginOne(IPlugin):
                     # add edge
                     edge_attr = dict(rel.properties)
                     edge_attr['relationship'] = rel.type
-                    source_hash = uuid.uuid3(uuid.NAMESPACE_URL, src_uri)
-                    dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, dst_uri)
-                    edge_uri = u"source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-                    rel_chain = u"relationship"
-                    while rel_chain in edge_attr:
-                        edge_uri = edge_uri + u"&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                        rel_chain = edge_attr[rel_chain]
-                    if "origin" in edge_attr:
-                        edge_uri += u"&{0}={1}".format(u"origin", edge_attr["origin"])
+                    edge_uri = uris.edge_uri(src_uri, dst_uri, edge_attr)
                     edge_attr["uri"] = edge_uri
                     sg.add_edge(src_uri, dst_uri, edge_uri, edge_attr)
 
@@ -124,9 +124,18 @@ class PluginOne(IPlugin):
             else:
                 self.context_graph.add_node(uri, attr_dict=data)
         # For each edge:
-        for edge in g.edges(data=True):
-            # Add it
-            self.context_graph.add_edge(edge[0], edge[1], attr_dict=data)
+        if g.is_multigraph():
+            edges = g.edges_iter(data=True, keys=True)
+        else:
+            edges = ((src, dst, None, data) for src, dst, data in g.edges_iter(data=True))
+        for src, dst, key, data in edges:
+            # Add it, keyed by its edge URI so an edge already in the context graph is updated rather than duplicated
+            edge_uri = data.get("uri", key if isinstance(key, basestring) else None)
+            if edge_uri is None:
+                # No URI to match it on (networkx's integer keys only count parallel edges), so it's a new edge
+                self.context_graph.add_edge(src, dst, attr_dict=data)
+            else:
+                self.context_graph.add_edge(src, dst, edge_uri, attr_dict=data)
 
 
     def query(self, topic, max_depth=4, config=None, dont_follow=['enrichment', 'classification']):
@@ -71,6 +71,8 @@ import sqlite3
 import networkx as nx
 import os
 import inspect
+import sys
+import imp
 
 ## SETUP
 __author__ = "Gabriel Bassett"
@@ -78,6 +80,8 @@ __author__ = "Gabriel Bassett"
 loc = inspect.getfile(inspect.currentframe())
 i = loc.rfind("/")
 loc = loc[:i+1]
+shared = sys.modules.get("verum_plugins_shared") or imp.load_source("verum_plugins_shared", loc + "_shared.py")
+timeutil, sanitize = shared.timeutil, shared.sanitize
 config = ConfigParser.SafeConfigParser()
 config.readfp(open(loc + TITAN_CONFIG_FILE))
 if config.has_section('titanDB'):
@@ -158,10 +162,10 @@ class PluginOne(IPlugin):
   
 
     def set_titan_config(self, host, port, graph):
-        self.titan_config = TITAN_Config('http://{0}:{1}/graphs/{2}'.format(host, port, graph))
+        self.titandb_config = TITAN_Config('http://{0}:{1}/graphs/{2}'.format(host, port, graph))
 
 
-    def removeNonAscii(self, s): return "".join(i for i in s if ord(i)<128)
+    def removeNonAscii(self, s): return sanitize.ascii_only(s)
 
 
     def enrich(self, g):
@@ -197,13 +201,11 @@ class PluginOne(IPlugin):
             # Update the times
             if "start_time" in attr and attr["start_time"] is not "":
                 if "start_time" in src and (src.start_time == "" or
-                                            datetime.strptime(src.start_time, "%Y-%m-%dT%H:%M:%SZ") >
-                                            datetime.strptime(attr["start_time"], "%Y-%m-%dT%H:%M:%SZ")):
+                                            timeutil.earlier(attr["start_time"], src.start_time)):
                     src.start_time = attr["start_time"]
             if "finish_time" in attr:
                 if "finish_time" in src and (src.finish_time == "" or
-                                             datetime.strptime(src.finish_time, "%Y-%m-%dT%H:%M:%SZ") <
-                                             datetime.strptime(attr["finish_time"], "%Y-%m-%dT%H:%M:%SZ")):
+                                             timeutil.earlier(src.finish_time, attr["finish_time"])):
                     src.finish_time = attr["finish_time"]
             src.save()
 
@@ -215,13 +217,11 @@ class PluginOne(IPlugin):
             # Update the times
             if "start_time" in attr and attr["start_time"] is not "":
                 if "start_time" in dst and (dst.start_time == "" or
-                                            datetime.strptime(dst.start_time, "%Y-%m-%dT%H:%M:%SZ") >
-                                            datetime.strptime(attr["start_time"], "%Y-%m-%dT%H:%M:%SZ")):
+                                            timeutil.earlier(attr["start_time"], dst.start_time)):
                     dst.start_time = attr["start_time"]
             if "finish_time" in attr:
                 if "finish_time" in dst and (dst.finish_time == "" or
-                                             datetime.strptime(dst.finish_time, "%Y-%m-%dT%H:%M:%SZ") <
-                                             datetime.strptime(attr["finish_time"], "%Y-%m-%dT%H:%M:%SZ")):
+                                             timeutil.earlier(dst.finish_time, attr["finish_time"])):
                     dst.finish_time = attr["finish_time"]
             dst.save()
 
@@ -269,12 +269,10 @@ class PluginOne(IPlugin):
     #            print "e is\n".format(e)  # DEBUG
     #            print "edge 2 is\n{0}".format(edge[2])
                 if "start_time" in e and (e.start_time == "" or
-                                          datetime.strptime(e.start_time, "%Y-%m-%dT%H:%M:%SZ") >
-                                          datetime.strptime(edge[2]["start_time"], "%Y-%m-%dT%H:%M:%SZ")):
+                                          timeutil.earlier(edge[2]["start_time"], e.start_time)):
                     e.start_time = edge[2]["start_time"]
                 if "finish_time" in e and (e.finish_time == "" or
-                                           datetime.strptime(e.finish_time, "%Y-%m-%dT%H:%M:%SZ") <
-                                           datetime.strptime(edge[2]["finish_time"], "%Y-%m-%dT%H:%M:%SZ")):
+                                           timeutil.earlier(e.finish_time, edge[2]["finish_time"])):
                     e.finish_time = edge[2]["finish_time"]
                 e.save()
             else:
@@ -304,11 +302,9 @@ class PluginOne(IPlugin):
             # Get/Create node in titan
             node = titan_graph.vertices.get_or_create("uri", node_uri, attr) # WARNING: This only works if g was created correctly
             # Update the times
-            if node.start_time == "" or datetime.strptime(node.start_time, "%Y-%m-%dT%H:%M:%SZ") > \
-               datetime.strptime(attr["start_time"], "%Y-%m-%dT%H:%M:%SZ"):
+            if node.start_time == "" or timeutil.earlier(attr["start_time"], node.start_time):
                 node.start_time = attr["start_time"]
-            if "finish_time" in node and datetime.strptime(node.finish_time, "%Y-%m-%dT%H:%M:%SZ") < \
-               datetime.strptime(attr["finish_time"], "%Y-%m-%dT%H:%M:%SZ"):
+            if "finish_time" in node and timeutil.earlier(node.finish_time, attr["finish_time"]):
                 node.finish_time = attr["finish_time"]
             node.save()
 
@@ -46,8 +46,8 @@ from yapsy.IPlugin import IPlugin
 import logging
 import networkx as nx
 from datetime import datetime # timedelta imported above
-import dateutil  # to parse variable time strings
-import uuid
+import sys
+import imp
 import ConfigParser
 import inspect
 try:
@@ -64,6 +64,8 @@ __author__ = "Gabriel Bassett"
 loc = inspect.getfile(inspect.currentframe())
 ind = loc.rfind("/")
 loc = loc[:ind+1]
+shared = sys.modules.get("verum_plugins_shared") or imp.load_source("verum_plugins_shared", loc + "_shared.py")
+uris, timeutil = shared.uri, shared.timeutil
 config = ConfigParser.SafeConfigParser()
 config.readfp(open(loc + TLD_CONFIG_FILE))
 
@@ -121,22 +123,14 @@ class PluginOne(IPlugin):
         :return: a networkx graph representing the sections of the domain
         """
         # Parse the start_time
-        if type(start_time) is str:
-            try:
-                time = dateutil.parser.parse(start_time).strftime("%Y-%m-%dT%H:%M:%SZ")
-            except:
-                time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-        elif type(start_time) is datetime:
-            time = start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
-        else:
-            time = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        time = timeutil.normalize(start_time)
 
         ext = tldextract.extract(domain)
         
         g = nx.MultiDiGraph()
 
         # Get or create Domain node
-        domain_uri = "class=attribute&key={0}&value={1}".format("domain", domain)
+        domain_uri = uris.node_uri("domain", domain)
         g.add_node(domain_uri, {
             'class': 'attribute',
             'key': "domain",
@@ -146,7 +140,7 @@ class PluginOne(IPlugin):
         })
 
         # Get or create Enrichment node
-        tld_extract_uri = "class=attribute&key={0}&value={1}".format("enrichment", "tld_extract")
+        tld_extract_uri = uris.node_uri("enrichment", "tld_extract")
         g.add_node(tld_extract_uri, {
             'class': 'attribute',
             'key': "enrichment",
@@ -156,7 +150,7 @@ class PluginOne(IPlugin):
         })
 
         # Get or create TLD node
-        tld_uri = "class=attribute&key={0}&value={1}".format("domain", ext.suffix)
+        tld_uri = uris.node_uri("domain", ext.suffix)
         g.add_node(tld_uri, {
             'class': 'attribute',
             'key': "domain",
@@ -172,21 +166,13 @@ class PluginOne(IPlugin):
             "origin": "tld_extract",
             "describedBy":"suffix"
         }
-        source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-        dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, tld_uri)
-        edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-        rel_chain = "relationship"
-        while rel_chain in edge_attr:
-            edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-            rel_chain = edge_attr[rel_chain]
-        if "origin" in edge_attr:
-            edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+        edge_uri = uris.edge_uri(domain_uri, tld_uri, edge_attr)
         edge_attr["uri"] = edge_uri
         g.add_edge(domain_uri, tld_uri, edge_uri, edge_attr)
 
 
         # Get or create mid domain node
-        mid_domain_uri = "class=attribute&key={0}&value={1}".format("domain", ext.domain)
+        mid_domain_uri = uris.node_uri("domain", ext.domain)
         g.add_node(mid_domain_uri, {
             'class': 'attribute',
             'key': "domain",
@@ -202,15 +188,7 @@ class PluginOne(IPlugin):
             "origin": "tld_extract",
             "describedBy":"domain"
         }
-        source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-        dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, mid_domain_uri)
-        edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-        rel_chain = "relationship"
-        while rel_chain in edge_attr:
-            edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-            rel_chain = edge_attr[rel_chain]
-        if "origin" in edge_attr:
-            edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+        edge_uri = uris.edge_uri(domain_uri, mid_domain_uri, edge_attr)
         edge_attr["uri"] = edge_uri
         g.add_edge(domain_uri, mid_domain_uri, edge_uri, edge_attr)
 
@@ -218,7 +196,7 @@ class PluginOne(IPlugin):
         # if including subdomains, create subdomain and node
         if include_subdomain:
             # Get or create mid domain node
-            subdomain_uri = "class=attribute&key={0}&value={1}".format("domain", ext.subdomain)
+            subdomain_uri = uris.node_uri("domain", ext.subdomain)
             g.add_node(subdomain_uri, {
                 'class': 'attribute',
                 'key': "domain",
@@ -234,15 +212,7 @@ class PluginOne(IPlugin):
                 "origin": "tld_extract",
                 "describedBy":"subdomain"
             }
-            source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-            dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, subdomain_uri)
-            edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-            rel_chain = "relationship"
-            while rel_chain in edge_attr:
-                edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-                rel_chain = edge_attr[rel_chain]
-            if "origin" in edge_attr:
-                edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+            edge_uri = uris.edge_uri(domain_uri, subdomain_uri, edge_attr)
             edge_attr["uri"] = edge_uri
             g.add_edge(domain_uri, subdomain_uri, edge_uri, edge_attr)
 
@@ -252,15 +222,7 @@ class PluginOne(IPlugin):
             "start_time": time,
             "origin": "tld_extract"
         }
-        source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
-        dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, tld_extract_uri)
-        edge_uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
-        rel_chain = "relationship"
-        while rel_chain in edge_attr:
-            edge_uri = edge_uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
-            rel_chain = edge_attr[rel_chain]
-        if "origin" in edge_attr:
-            edge_uri += "&{0}={1}".format("origin", edge_attr["origin"])
+        edge_uri = uris.edge_uri(domain_uri, tld_extract_uri, edge_attr)
         edge_attr["uri"] = edge_uri
         g.add_edge(domain_uri, tld_extract_uri, edge_uri, edge_attr)
 
@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of the app's plugin registration and enrichment calls.
+
+"""
+## IMPORTS
+import os
+import sys
+import shutil
+import ConfigParser
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import verum
+from verum import tracing
+from verum import ratelimit
+
+INFO = """[Core]
+Name = {0}
+Module = {0}
+
+[Documentation]
+Description = Test enrichment
+
+[Configuration]
+Type = enrichment
+Cost = 1
+Speed = 1
+Inputs = domain
+"""
+
+MODULE = """from yapsy.IPlugin import IPlugin
+import networkx as nx
+class PluginOne(IPlugin):
+    def configure(self):
+        return ['enrichment', {1}, '{0}', 'Test enrichment', ['domain'], 1, 1]
+    def run(self, domain, start_time=""):
+        g = nx.MultiDiGraph()
+        g.add_edge("domain=" + domain, "enrichment={0}", key="e")
+        return g
+"""
+
+# A stub enrichment.  {1} is inserted at the top of run().  Calls can wait on the plugin's gate, which the tests set.
+STUB = """from yapsy.IPlugin import IPlugin
+import threading
+import networkx as nx
+class PluginOne(IPlugin):
+    def __init__(self):
+        IPlugin.__init__(self)
+        self.gate = threading.Event()
+        self.topics = list()
+    def configure(self):
+        return ['enrichment', True, '{0}', 'Test enrichment', ['domain'], 1, 1]
+    def run(self, domain, start_time=""):
+        self.topics.append(domain)
+{1}
+        g = nx.MultiDiGraph()
+        g.add_node("domain=" + domain, {{'class': 'attribute', 'key': 'domain', 'value': domain}})
+        g.add_node("enrichment={0}", {{'class': 'attribute', 'key': 'enrichment', 'value': '{0}'}})
+        g.add_edge("domain=" + domain, "enrichment={0}", "{0}:" + domain)
+        return g
+"""
+PASS = "        pass"
+HANG = """        if domain.startswith("hang"):
+            self.gate.wait(10)"""
+SLOW = "        self.gate.wait(10)"
+FAIL = "        raise ValueError('broken')"
+
+
+## EXECUTION
+class StubTestCase(unittest.TestCase):
+    """ Runs an app over a directory of stub enrichments.  Set plugins to a dictionary of name -> run() body. """
+    plugins = {"working": PASS}
+    info = ""  # Added to each stub's .yapsy-plugin file
+    inputs = {}  # Stub name -> inputs its configure() returns, if not those of its .yapsy-plugin file
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        for name, body in self.plugins.iteritems():
+            with open(os.path.join(self.dir, name + ".yapsy-plugin"), 'w') as f:
+                f.write(INFO.format(name) + self.info)
+            with open(os.path.join(self.dir, name + ".py"), 'w') as f:
+                f.write(STUB.format(name, body).replace("['domain']", repr(self.inputs.get(name, ['domain']))))
+        self.app = verum.app(self.dir + "/", None)
+
+    def tearDown(self):
+        for plugin in self.app.plugin_index.values():
+            plugin.plugin_object.gate.set()
+        shutil.rmtree(self.dir)
+
+    def plugin(self, name):
+        """ Returns the stub's plugin object, configuring it first. """
+        self.app.get_enrichments("domain")
+        return self.app.plugin_index[name].plugin_object
+
+    def enrichments(self, g):
+        return sorted(d['value'] for _, d in g.nodes(data=True) if d.get('key') == "enrichment")
+
+    def domains(self, g):
+        return sorted(d['value'] for _, d in g.nodes(data=True) if d.get('key') == "domain")
+
+
+class PendingPluginTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        for name, configures in (("working", True), ("broken", False)):
+            with open(os.path.join(self.dir, name + ".yapsy-plugin"), 'w') as f:
+                f.write(INFO.format(name))
+            with open(os.path.join(self.dir, name + ".py"), 'w') as f:
+                f.write(MODULE.format(name, configures))
+        self.app = verum.app(self.dir + "/", None)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_described_plugins_are_pending_until_used(self):
+        self.assertEqual(sorted(self.app.deferred), ["broken", "working"])
+
+    def test_listing_configured_plugins_configures_pending_ones(self):
+        self.assertEqual(self.app.get_enrichments("domain"), [("working", "domain")])
+        self.assertEqual(self.app.get_enrichments("domain", configured=False), [("broken", "domain")])
+        self.assertEqual(self.app.deferred, {})
+
+    def test_plugin_that_fails_to_configure_is_not_routed(self):
+        self.assertEqual(self.app.select_enrichments("domain"), ["working"])
+        g = self.app.run_enrichments("a.com", "domain")
+        self.assertEqual(sorted(g.nodes()), ["domain=a.com", "enrichment=working"])
+
+
+class TwoAppsTest(StubTestCase):
+    """ Apps in one process share plugin configurations but not plugin objects. """
+    other = None
+
+    def tearDown(self):
+        if self.other is not None:
+            for plugin in self.other.plugin_index.values():
+                plugin.plugin_object.gate.set()
+        StubTestCase.tearDown(self)
+
+    def test_app_started_later_gets_its_own_plugin_object(self):
+        self.app.run_enrichment("working", "example.com")
+        self.other = verum.app(self.dir + "/", None)
+        self.assertIn("working", self.other.deferred)  # Registered from the shared configuration
+        self.assertEqual(self.other.get_enrichments("domain"), [("working", "domain")])
+        self.assertIsNot(self.other.plugin_index["working"].plugin_object, self.plugin("working"))
+        self.assertEqual(self.plugin("working").topics, ["example.com"])
+        self.assertEqual(self.other.plugin_index["working"].plugin_object.topics, [])
+
+
+class ParallelEnrichmentTest(StubTestCase):
+    plugins = {"working": PASS, "other": PASS, "failing": FAIL, "slow": SLOW}
+
+    def test_merges_plugins_run_in_parallel(self):
+        g = self.app.run_enrichments("a.com", "domain", names=["working", "other"], parallel=True)
+        self.assertEqual(self.enrichments(g), ["other", "working"])
+        self.assertEqual(g.number_of_edges(), 2)
+
+    def test_failing_plugin_is_left_out(self):
+        g = self.app.run_enrichments("a.com", "domain", names=["working", "failing"], parallel=True)
+        self.assertEqual(self.enrichments(g), ["working"])
+        self.assertEqual(self.plugin("failing").topics, ["a.com"])
+
+    def test_timeout_leaves_slow_plugins_out(self):
+        start = time.time()
+        g = self.app.run_enrichments("a.com", "domain", names=["working", "slow"], parallel=True, timeout=0.2)
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(self.enrichments(g), ["working"])
+        self.assertEqual(self.plugin("slow").topics, ["a.com"])  # Started but not waited for
+
+    def test_sequential_matches_parallel(self):
+        names = ["working", "other", "failing"]
+        sequential = self.app.run_enrichments("a.com", "domain", names=names)
+        parallel = self.app.run_enrichments("a.com", "domain", names=names, parallel=True)
+        self.assertEqual(sorted(sequential.edges(keys=True)), sorted(parallel.edges(keys=True)))
+
+
+class Registration():
+    """ Stands in for the yapsy plugin info register_plugin() is given. """
+    def __init__(self, name):
+        self.name = name
+        self.details = ConfigParser.SafeConfigParser()
+
+
+class RoutesTest(StubTestCase):
+    plugins = {"working": PASS, "late": PASS}
+    inputs = {"late": ['domain', 'ip']}  # Its .yapsy-plugin file only names domain
+
+    def register(self, name, inputs, cost, speed, configured=True):
+        self.app.register_plugin(Registration(name), ['enrichment', configured, name, "", inputs, cost, speed])
+
+    def sql(self, inputs, cost, speed, configured):
+        """ The plugin database query get_enrichments() made before the in-memory index. """
+        return self.app.query("""SELECT DISTINCT e.name, i.input
+                                 FROM enrichments e, inputs i
+                                 WHERE e.name = i.name
+                                   AND e.cost <= ?
+                                   AND e.speed <= ?
+                                   AND configured = ?
+                                   AND i.input IN ({0})""".format(("?," * len(inputs))[:-1]),
+                              [cost, speed, int(configured)] + inputs)
+
+    def test_index_matches_plugin_database(self):
+        self.app.get_enrichments(["domain", "ip"])  # Configure the stubs
+        self.register("cheap", ["ip", "domain"], 1, 5)
+        self.register("costly", ["ip"], 8, 2)
+        self.register("broken", ["domain", "url"], 3, 3, configured=False)
+        for inputs in (["ip"], ["domain"], ["ip", "domain"], ["url"], ["email"]):
+            for cost in (1, 3, 10, 10000):
+                for speed in (1, 3, 10, 10000):
+                    for configured in (True, False):
+                        expected = sorted(tuple(row) for row in self.sql(inputs, cost, speed, configured))
+                        for i in range(2):  # Then from the memo
+                            self.assertEqual(sorted(self.app.get_enrichments(inputs, cost, speed, configured)),
+                                             expected)
+
+    def test_register_invalidates_routes(self):
+        self.assertEqual(self.app.select_enrichments("url"), [])
+        self.register("new", ["url"], 1, 1)
+        self.assertEqual(self.app.select_enrichments("url"), ["new"])
+        self.assertEqual(self.app.get_enrichments("url"), [("new", "url")])
+
+    def test_unregister_invalidates_routes(self):
+        self.assertEqual(sorted(self.app.select_enrichments("domain")), ["late", "working"])
+        self.app.unregister_plugin("working")
+        self.assertEqual(self.app.select_enrichments("domain"), ["late"])
+        self.assertEqual(self.app.get_enrichments("domain"), [("late", "domain")])
+
+    def test_configuring_pending_plugin_invalidates_routes(self):
+        self.assertEqual(self.app.select_enrichments("ip"), [])  # Only known to take domains while pending
+        self.assertIn("late", self.app.deferred)
+        self.app.select_enrichments("domain")  # Configures it
+        self.assertEqual(self.app.select_enrichments("ip"), ["late"])
+        self.assertEqual(self.app.get_enrichments("ip"), [("late", "ip")])
+
+
+class RateLimitTest(StubTestCase):
+    plugins = {"limited": PASS, "working": PASS}
+    info = "\n[RateLimit]\nService = verum-test\nRate = 2\nBurst = 1\n"
+
+    def setUp(self):
+        ratelimit.LIMITS.buckets.pop("verum-test", None)
+        self.time = ratelimit.time
+        self.slept = list()
+        now = [1000.0]
+
+        class Clock():  # Time only passes while sleeping
+            def time(self):
+                return now[0]
+
+            def sleep(clock, seconds):
+                self.slept.append(seconds)
+                now[0] += seconds
+
+        ratelimit.time = Clock()
+        StubTestCase.setUp(self)
+
+    def tearDown(self):
+        ratelimit.time = self.time
+        ratelimit.LIMITS.buckets.pop("verum-test", None)
+        StubTestCase.tearDown(self)
+
+    def test_plugins_naming_a_service_share_its_bucket(self):
+        self.app.get_enrichments("domain")
+        self.assertEqual(self.app.enrichment_services, {"limited": "verum-test", "working": "verum-test"})
+        self.assertEqual(self.app.get_rate_limit_stats()["verum-test"]['rate'], 2)
+
+    def test_calls_wait_for_the_service(self):
+        for topic in ["a.com", "b.com", "c.com"]:
+            self.app.run_enrichment("limited", topic, "domain")
+        self.app.run_enrichment("working", "d.com", "domain")
+        self.assertEqual(self.slept, [0.5, 0.5, 0.5])
+        self.assertEqual(self.plugin("limited").topics, ["a.com", "b.com", "c.com"])
+        stats = self.app.get_rate_limit_stats()["verum-test"]
+        self.assertEqual((stats['calls'], stats['waited']), (4, 3))
+
+
+class ProfilingTest(StubTestCase):
+
+    def setUp(self):
+        StubTestCase.setUp(self)
+        self.profiles = tempfile.mkdtemp()
+
+    def tearDown(self):
+        StubTestCase.tearDown(self)
+        shutil.rmtree(self.profiles)
+
+    def test_profiles_enrichment_calls(self):
+        self.app.enable_profiling(self.profiles, sample=1)
+        self.app.run_enrichment("working", "a.com", "domain")
+        self.assertEqual(len(os.listdir(self.profiles)), 1)
+        self.assertEqual(self.app.get_profiling_stats()['enrichment']['working']['run']['profiled'], 1)
+
+    def test_disabled_profiling_does_no_work(self):
+        self.app.enable_profiling(self.profiles, sample=1)
+        self.app.disable_profiling()
+        self.app.run_enrichment("working", "a.com", "domain")
+        self.assertEqual(os.listdir(self.profiles), [])
+        self.assertIsNone(self.app.get_profiling_stats())
+
+
+class RunEnrichmentsManyTest(StubTestCase):
+    plugins = {"working": PASS, "hanging": HANG}
+
+    def test_reads_ahead_at_most_max_pending(self):
+        read = list()
+
+        def topics():
+            for i in range(20):
+                read.append(i)
+                yield "a{0}.com".format(i)
+
+        finished = list()
+        for i, (topic, g) in enumerate(self.app.run_enrichments_many(topics(), "domain", max_pending=3)):
+            self.assertLessEqual(len(read) - i, 3)
+            finished.append(topic)
+        self.assertEqual(len(finished), 20)
+        self.assertEqual(sorted(finished), sorted("a{0}.com".format(i) for i in range(20)))
+
+    def test_topic_graphs(self):
+        results = dict(self.app.run_enrichments_many(["a.com", " ", "b.com\n"], "domain"))
+        self.assertEqual(sorted(results), ["a.com", "b.com"])  # Stripped and blank lines skipped
+        self.assertEqual(self.domains(results["a.com"]), ["a.com"])
+        self.assertEqual(self.enrichments(results["a.com"]), ["hanging", "working"])
+
+    def test_batches_with_final_partial_batch(self):
+        topics = ["a{0}.com".format(i) for i in range(5)]
+        batches = list(self.app.run_enrichments_many(topics, "domain", batch_size=2))
+        self.assertEqual([len(self.domains(g)) for g in batches], [2, 2, 1])
+        self.assertEqual(sorted(d for g in batches for d in self.domains(g)), topics)
+        self.assertEqual(batches[0].number_of_edges(), 4)  # Each topic's edges are kept
+
+    def test_gives_up_on_hung_topics_after_wait(self):
+        self.plugin("hanging")
+        start = time.time()
+        results = list(self.app.run_enrichments_many(["a.com", "hang.com", "b.com"], "domain",
+                                                     names=["hanging"], wait=0.2))
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(sorted(topic for topic, _ in results), ["a.com", "b.com"])
+
+    def test_repeated_topics_are_yielded_each_time(self):
+        results = [topic for topic, _ in self.app.run_enrichments_many(["a.com", "b.com", "a.com"], "domain",
+                                                                        names=["working"])]
+        self.assertEqual(sorted(results), ["a.com", "a.com", "b.com"])
+        self.assertEqual(sorted(self.plugin("working").topics), ["a.com", "a.com", "b.com"])
+
+
+class PluginTracerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        with open(os.path.join(self.dir, "traced.yapsy-plugin"), 'w') as f:
+            f.write(INFO.format("traced"))
+        with open(os.path.join(self.dir, "traced.py"), 'w') as f:
+            # A plugin which traces its internals has a tracer attribute
+            f.write(MODULE.format("traced", True).replace("class PluginOne(IPlugin):\n",
+                                                           "class PluginOne(IPlugin):\n    tracer = None\n"))
+        self.app = verum.app(self.dir + "/", None)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_configured_plugin_gets_the_app_tracer(self):
+        self.assertEqual(self.app.get_enrichments("domain"), [("traced", "domain")])
+        self.assertIs(self.app.plugin_index["traced"].plugin_object.tracer, tracing.TRACER)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of the circuit breakers and call_with_timeout().
+
+"""
+## IMPORTS
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from verum import breaker
+from verum.breaker import CircuitBreaker, CallTimeout, CallRefused, call_with_timeout
+from verum.profiling import StackSampler
+
+
+## EXECUTION
+class CircuitBreakerTest(unittest.TestCase):
+
+    def test_needs_one_failure(self):
+        self.assertRaises(ValueError, CircuitBreaker, 0)
+
+    def test_opens_after_failures_in_a_row(self):
+        b = CircuitBreaker(failures=3, cooldown=60)
+        for i in range(2):
+            self.assertTrue(b.allow())
+            b.failure()
+        self.assertTrue(b.allow())
+        b.success()  # Resets the run of failures
+        for i in range(2):
+            b.failure()
+        self.assertEqual(b.state, breaker.CLOSED)
+        b.failure(timeout=True)
+        self.assertEqual(b.state, breaker.OPEN)
+        self.assertTrue(b.is_open())
+
+    def test_open_breaker_skips_calls(self):
+        b = CircuitBreaker(failures=1, cooldown=60)
+        b.failure()
+        self.assertFalse(b.allow())
+        self.assertFalse(b.allow())
+        stats = b.stats()
+        self.assertEqual(stats['state'], breaker.OPEN)
+        self.assertEqual(stats['open'], 1)
+        self.assertEqual(stats['opened'], 1)
+        self.assertEqual(stats['skipped'], 2)
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['timeouts'], 0)
+
+    def test_half_open_allows_one_trial(self):
+        b = CircuitBreaker(failures=1, cooldown=0)
+        b.failure()
+        self.assertFalse(b.is_open())
+        self.assertTrue(b.allow())
+        self.assertEqual(b.state, breaker.HALF_OPEN)
+        self.assertFalse(b.allow())  # The trial call is still running
+        self.assertEqual(b.stats()['skipped'], 1)
+
+    def test_trial_success_closes(self):
+        b = CircuitBreaker(failures=1, cooldown=0)
+        b.failure()
+        self.assertTrue(b.allow())
+        b.success()
+        self.assertEqual(b.state, breaker.CLOSED)
+        self.assertTrue(b.allow())
+        self.assertTrue(b.allow())
+
+    def test_trial_failure_reopens(self):
+        b = CircuitBreaker(failures=3, cooldown=0)
+        for i in range(3):
+            b.failure()
+        self.assertTrue(b.allow())
+        b.failure(timeout=True)  # One failure is enough while half open
+        self.assertEqual(b.state, breaker.OPEN)
+        self.assertEqual(b.stats()['opened'], 2)
+        self.assertEqual(b.stats()['timeouts'], 1)
+
+    def test_cancel_frees_the_trial(self):
+        b = CircuitBreaker(failures=1, cooldown=0)
+        b.failure()
+        self.assertTrue(b.allow())
+        self.assertFalse(b.allow())
+        b.cancel()
+        self.assertTrue(b.allow())
+        self.assertEqual(b.state, breaker.HALF_OPEN)
+
+
+def wait_abandoned(count):
+    """ Waits for the abandoned calls still running to drop to count. """
+    for i in range(500):
+        if breaker.abandoned_calls() <= count:
+            break
+        threading.Event().wait(0.01)
+    return breaker.abandoned_calls()
+
+
+class CallWithTimeoutTest(unittest.TestCase):
+
+    def setUp(self):
+        self.max_abandoned = breaker.MAX_ABANDONED
+        self.abandoned = breaker.abandoned_calls()
+        self.gates = list()
+
+    def tearDown(self):
+        breaker.MAX_ABANDONED = self.max_abandoned
+        for gate in self.gates:
+            gate.set()
+        wait_abandoned(self.abandoned)
+
+    def hang(self):
+        """ Returns a function which blocks until the test ends. """
+        gate = threading.Event()
+        self.gates.append(gate)
+        return lambda: gate.wait(5)
+
+    def test_returns_value(self):
+        released = list()
+        self.assertEqual(call_with_timeout(1, lambda a, b=0: a + b, (1,), {'b': 2}, release=lambda: released.append(1)), 3)
+        self.assertEqual(released, [1])
+        self.assertNotIn(threading.current_thread().ident, breaker.delegates)
+
+    def test_reraises(self):
+        released = list()
+
+        def fail():
+            raise KeyError("boom")
+
+        self.assertRaises(KeyError, call_with_timeout, 1, fail, release=lambda: released.append(1))
+        self.assertEqual(released, [1])
+
+    def test_timeout_releases_when_call_returns(self):
+        gate = threading.Event()
+        released = threading.Event()
+        before = breaker.abandoned_calls()
+        self.assertRaises(CallTimeout, call_with_timeout, 0.05, gate.wait, (5,), release=released.set)
+        self.assertFalse(released.is_set())
+        self.assertEqual(breaker.abandoned_calls(), before + 1)
+        self.assertNotIn(threading.current_thread().ident, breaker.delegates)
+
+        gate.set()
+        self.assertTrue(released.wait(5))
+        self.assertEqual(wait_abandoned(before), before)
+
+    def test_refuses_when_too_many_abandoned(self):
+        breaker.MAX_ABANDONED = breaker.abandoned_calls() + 1
+        self.assertRaises(CallTimeout, call_with_timeout, 0.05, self.hang())
+        released = list()
+        called = list()
+        self.assertRaises(CallRefused, call_with_timeout, 1, lambda: called.append(1),
+                          release=lambda: released.append(1))
+        self.assertEqual(called, [])
+        self.assertEqual(released, [1])
+
+
+class DelegatedSampleTest(unittest.TestCase):
+
+    def test_sample_follows_the_call_thread(self):
+        started = threading.Event()
+        gate = threading.Event()
+
+        def slow_plugin():
+            started.set()
+            gate.wait(5)
+
+        def caller():
+            call_with_timeout(5, slow_plugin)
+
+        t = threading.Thread(target=caller)
+        t.start()
+        try:
+            self.assertTrue(started.wait(5))
+            sampler = StackSampler()
+            sampler.attach("minion", t)
+            sampler.sample()
+        finally:
+            gate.set()
+            t.join(5)
+        stacks = sampler.get_samples()["minion"].keys()
+        self.assertEqual(len(stacks), 1)
+        self.assertIn("test_breaker:caller;breaker:call_with_timeout;test_breaker:slow_plugin;", stacks[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
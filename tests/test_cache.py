@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of the enrichment cache.
+
+"""
+## IMPORTS
+import os
+import sys
+import time
+import tempfile
+import unittest
+import networkx as nx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from verum.cache import EnrichmentCache, CachedFailure
+
+
+## EXECUTION
+def edge_graph(value):
+    g = nx.MultiDiGraph()
+    g.add_edge("domain=" + value, "enrichment=dns", key="e")
+    return g
+
+
+class EnrichmentCacheTest(unittest.TestCase):
+
+    def test_get_returns_put_graph(self):
+        cache = EnrichmentCache(size=10)
+        cache.put("DNS", "a.com", "domain", edge_graph("a.com"))
+        g = cache.get("DNS", "a.com", "domain")
+        self.assertEqual(sorted(g.nodes()), ["domain=a.com", "enrichment=dns"])
+        self.assertIsNone(cache.get("DNS", "b.com", "domain"))
+        self.assertIsNone(cache.get("TLD", "a.com", "domain"))
+        self.assertEqual((cache.stats()['hits'], cache.stats()['misses']), (1, 2))
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = EnrichmentCache(size=2)
+        cache.put("DNS", "a.com", "domain", edge_graph("a.com"))
+        cache.put("DNS", "b.com", "domain", edge_graph("b.com"))
+        cache.get("DNS", "a.com", "domain")  # b.com is now the least recently used
+        cache.put("DNS", "c.com", "domain", edge_graph("c.com"))
+        self.assertIsNotNone(cache.get("DNS", "a.com", "domain"))
+        self.assertIsNone(cache.get("DNS", "b.com", "domain"))
+        self.assertIsNotNone(cache.get("DNS", "c.com", "domain"))
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(cache.stats()['memory_entries'], 2)
+
+    def test_entries_expire_after_ttl(self):
+        cache = EnrichmentCache(ttl=0.05)
+        cache.put("DNS", "a.com", "domain", edge_graph("a.com"))
+        self.assertIsNotNone(cache.get("DNS", "a.com", "domain"))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("DNS", "a.com", "domain"))
+
+    def test_plugin_ttl_of_zero_disables_caching(self):
+        cache = EnrichmentCache()
+        cache.ttls["DNS"] = 0
+        cache.put("DNS", "a.com", "domain", edge_graph("a.com"))
+        self.assertIsNone(cache.get("DNS", "a.com", "domain"))
+
+    def test_unhashable_topics_are_not_cached(self):
+        cache = EnrichmentCache()
+        cache.put("DNS", {"a": object()}, "domain", edge_graph("a.com"))
+        self.assertIsNone(cache.get("DNS", {"a": object()}, "domain"))
+
+    def test_disk_tier_outlives_memory_tier(self):
+        fd, path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        try:
+            cache = EnrichmentCache(size=1, path=path)
+            cache.put("DNS", "a.com", "domain", edge_graph("a.com"))
+            cache.put("DNS", "b.com", "domain", edge_graph("b.com"))  # Evicts a.com from memory
+            self.assertIsNotNone(cache.get("DNS", "a.com", "domain"))
+            self.assertEqual(cache.stats()['disk_hits'], 1)
+
+            reopened = EnrichmentCache(path=path)
+            self.assertIsNotNone(reopened.get("DNS", "b.com", "domain"))
+        finally:
+            os.remove(path)
+
+
+    def test_graph_without_edges_is_cached_as_miss(self):
+        cache = EnrichmentCache(ttl=60, miss_ttl=0.05)
+        g = nx.MultiDiGraph()
+        g.add_node("domain=a.com")
+        cache.put("DNS", "a.com", "domain", g)
+        self.assertEqual(cache.get("DNS", "a.com", "domain").nodes(), ["domain=a.com"])
+        self.assertEqual(cache.stats()['plugins']['DNS']['negative_hits'], 1)
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("DNS", "a.com", "domain"))  # Misses expire on the shorter miss TTL
+
+    def test_failure_raises_cached_failure_until_failure_ttl(self):
+        cache = EnrichmentCache(ttl=60, failure_ttl=0.05)
+        cache.put_failure("DNS", "a.com", "domain", ValueError("timed out"))
+        self.assertRaises(CachedFailure, cache.get, "DNS", "a.com", "domain")
+        counts = cache.stats()['plugins']['DNS']
+        self.assertEqual((counts['failures'], counts['failure_hits']), (1, 1))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("DNS", "a.com", "domain"))
+
+    def test_plugin_miss_and_failure_ttls_override_defaults(self):
+        cache = EnrichmentCache(miss_ttl=60, failure_ttl=60)
+        cache.miss_ttls["DNS"] = 0
+        cache.failure_ttls["DNS"] = 5
+        self.assertEqual(cache.get_ttl("DNS", "miss"), 0)
+        self.assertEqual(cache.get_ttl("DNS", "failure"), 5)
+        self.assertEqual(cache.get_ttl("TLD", "failure"), 60)
+        cache.put("DNS", "a.com", "domain", nx.MultiDiGraph())
+        self.assertIsNone(cache.get("DNS", "a.com", "domain"))
+
+    def test_success_replaces_cached_failure(self):
+        cache = EnrichmentCache()
+        cache.put_failure("DNS", "a.com", "domain", ValueError("boom"))
+        cache.put("DNS", "a.com", "domain", edge_graph("a.com"))
+        self.assertIsNotNone(cache.get("DNS", "a.com", "domain"))
+
+
+if __name__ == "__main__":
+    unittest.main()
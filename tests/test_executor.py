@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of the enrichment worker pool.
+
+"""
+## IMPORTS
+import os
+import sys
+import threading
+import Queue
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from verum.executor import WorkerPool
+
+
+## EXECUTION
+class WorkerPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = WorkerPool(4)
+        self.gate = threading.Event()
+
+    def tearDown(self):
+        self.gate.set()
+
+    def test_results_and_errors_are_reported(self):
+        results = Queue.Queue()
+
+        def fail():
+            raise KeyError("boom")
+
+        self.pool.submit(results, "add", lambda a, b=0: a + b, 1, b=2)
+        self.pool.submit(results, "fail", fail)
+        items = dict((tag, (result, error)) for tag, result, error in self.pool.as_completed(results, 2))
+        self.assertEqual(items["add"], (3, None))
+        self.assertIsNone(items["fail"][0])
+        self.assertIsInstance(items["fail"][1], KeyError)
+
+    def test_workers_start_on_first_submit(self):
+        self.assertEqual(self.pool.workers, [])
+        results = Queue.Queue()
+        self.pool.submit(results, "a", lambda: 1)
+        list(self.pool.as_completed(results, 1))
+        self.assertEqual(len(self.pool.workers), 4)
+
+    def test_results_come_in_the_order_jobs_finish(self):
+        results = Queue.Queue()
+        self.pool.submit(results, "slow", self.gate.wait, 5)
+        self.pool.submit(results, "fast", lambda: None)
+        completed = self.pool.as_completed(results, ["slow", "fast"])
+        self.assertEqual(next(completed)[0], "fast")
+        self.gate.set()
+        self.assertEqual(next(completed)[0], "slow")
+
+    def test_timeout_reports_pending_tags(self):
+        results = Queue.Queue()
+        tags = ["slow1", "fast", "slow2"]
+        self.pool.submit(results, "slow1", self.gate.wait, 5)
+        self.pool.submit(results, "fast", lambda: None)
+        self.pool.submit(results, "slow2", self.gate.wait, 5)
+        unfinished = list()
+        finished = [tag for tag, _, _ in self.pool.as_completed(results, tags, 0.2, unfinished)]
+        self.assertEqual(finished, ["fast"])
+        self.assertEqual(sorted(unfinished), ["slow1", "slow2"])
+        self.assertEqual(tags, ["slow1", "fast", "slow2"])  # The caller's list isn't changed
+
+    def test_timeout_with_a_count_stops_early(self):
+        results = Queue.Queue()
+        self.pool.submit(results, "slow", self.gate.wait, 5)
+        unfinished = list()
+        self.assertEqual(list(self.pool.as_completed(results, 1, 0.1, unfinished)), [])
+        self.assertEqual(unfinished, [])  # No tags to report
+
+    def test_no_unfinished_tags_when_all_finish(self):
+        results = Queue.Queue()
+        self.pool.submit(results, "a", lambda: 1)
+        unfinished = list()
+        self.assertEqual([tag for tag, _, _ in self.pool.as_completed(results, ["a"], 5, unfinished)], ["a"])
+        self.assertEqual(unfinished, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of the graph merging helpers.
+
+"""
+## IMPORTS
+import os
+import sys
+import unittest
+import networkx as nx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from verum.helper import GraphAccumulator, merge_graphs, merge_graph_into, fold_time
+
+
+## EXECUTION
+def fragment(src, dst, key, **props):
+    g = nx.MultiDiGraph()
+    g.add_node(src, {'value': src})
+    g.add_node(dst, {'value': dst})
+    props.setdefault('uri', key)
+    g.add_edge(src, dst, key, props)
+    return g
+
+
+class GraphAccumulatorTest(unittest.TestCase):
+
+    def test_add_merges_fragments(self):
+        acc = GraphAccumulator()
+        acc.add(fragment("a", "b", "ab")).add(fragment("b", "c", "bc"))
+        g = acc.build()
+        self.assertEqual(sorted(g.nodes()), ["a", "b", "c"])
+        self.assertEqual(sorted(k for _, _, k in g.edges(keys=True)), ["ab", "bc"])
+
+    def test_build_empties_the_accumulator(self):
+        acc = GraphAccumulator(fragment("a", "b", "ab"))
+        g = acc.build()
+        self.assertEqual(g.number_of_nodes(), 2)
+        self.assertEqual(acc.graph.number_of_nodes(), 0)
+        self.assertEqual(acc.build().number_of_nodes(), 0)
+
+    def test_add_accepts_accumulators_and_none(self):
+        inner = GraphAccumulator(fragment("a", "b", "ab"))
+        acc = GraphAccumulator().add(inner).add(None)
+        self.assertEqual(acc.graph.number_of_edges(), 1)
+
+    def test_node_properties_are_replaced_by_later_fragments(self):
+        g1 = nx.MultiDiGraph()
+        g1.add_node("a", {'value': "a", 'score': 1})
+        g2 = nx.MultiDiGraph()
+        g2.add_node("a", {'score': 2})
+        g = GraphAccumulator(g1).add(g2).build()
+        self.assertEqual(g.node["a"], {'value': "a", 'score': 2})
+
+    def test_simple_graphs_are_merged(self):
+        g = nx.DiGraph()
+        g.add_edge("a", "b", {'origin': "dns"})
+        merged = GraphAccumulator(g).build()
+        self.assertTrue(merged.is_multigraph())
+        self.assertEqual(merged.number_of_edges(), 1)
+
+    def test_merge_graphs_leaves_inputs_unchanged(self):
+        g1 = fragment("a", "b", "ab")
+        g2 = fragment("b", "c", "bc")
+        g = merge_graphs(g1, g2)
+        self.assertEqual(g.number_of_edges(), 2)
+        self.assertEqual(g1.number_of_edges(), 1)
+
+    def test_merge_graphs_into_simple_graph(self):
+        g1 = nx.DiGraph()  # As create_topic() returns
+        g1.add_node("a", {'value': "a"})
+        g = merge_graphs(g1, fragment("a", "b", "ab", origin="dns"))
+        self.assertFalse(g.is_multigraph())
+        self.assertEqual(sorted(g.nodes()), ["a", "b"])
+        self.assertEqual(g.edge["a"]["b"]['origin'], "dns")
+
+
+class EdgeFoldTest(unittest.TestCase):
+
+    def test_same_edge_enriched_twice_stays_one_edge(self):
+        acc = GraphAccumulator()
+        acc.add(fragment("a", "b", "ab", start_time="2015-01-02T00:00:00Z", finish_time="2015-01-02T00:00:00Z"))
+        acc.add(fragment("a", "b", "ab", start_time="2015-01-01T00:00:00Z", finish_time="2015-01-03T00:00:00Z"))
+        g = acc.build()
+        self.assertEqual(g.number_of_edges(), 1)
+        self.assertEqual(g.edge["a"]["b"]["ab"]['start_time'], "2015-01-01T00:00:00Z")
+        self.assertEqual(g.edge["a"]["b"]["ab"]['finish_time'], "2015-01-03T00:00:00Z")
+
+    def test_fold_keeps_earliest_start_and_latest_finish(self):
+        acc = GraphAccumulator()
+        acc.add(fragment("a", "b", "ab", start_time="2015-01-01T00:00:00Z", finish_time="2015-01-05T00:00:00Z"))
+        acc.add(fragment("a", "b", "ab", start_time="2015-01-03T00:00:00Z", finish_time="2015-01-04T00:00:00Z",
+                         origin="dns"))
+        props = acc.build().edge["a"]["b"]["ab"]
+        self.assertEqual((props['start_time'], props['finish_time']), ("2015-01-01T00:00:00Z", "2015-01-05T00:00:00Z"))
+        self.assertEqual(props['origin'], "dns")  # Other properties are replaced
+
+    def test_without_folding_later_times_win(self):
+        acc = GraphAccumulator(fold_times=False)
+        acc.add(fragment("a", "b", "ab", start_time="2015-01-01T00:00:00Z"))
+        acc.add(fragment("a", "b", "ab", start_time="2015-01-03T00:00:00Z"))
+        g = acc.build()
+        self.assertEqual(g.number_of_edges(), 1)
+        self.assertEqual(g.edge["a"]["b"]["ab"]['start_time'], "2015-01-03T00:00:00Z")
+
+    def test_edges_with_different_uris_are_kept(self):
+        acc = GraphAccumulator().add(fragment("a", "b", "ab1")).add(fragment("a", "b", "ab2"))
+        self.assertEqual(acc.build().number_of_edges(), 2)
+
+    def test_edge_uri_property_is_the_key(self):
+        g = nx.MultiDiGraph()
+        g.add_edge("a", "b", 0, {'uri': "ab"})  # Added without a string key
+        merged = GraphAccumulator(g).add(fragment("a", "b", "ab")).build()
+        self.assertEqual(list(merged.edge["a"]["b"]), ["ab"])
+
+    def test_fold_into_simple_graph(self):
+        g = nx.DiGraph()
+        g.add_edge("a", "b", {'start_time': "2015-01-02T00:00:00Z", 'finish_time': "2015-01-02T00:00:00Z"})
+        merge_graph_into(g, fragment("a", "b", "ab", start_time="2015-01-01T00:00:00Z",
+                                     finish_time="2015-01-03T00:00:00Z", origin="dns"))
+        merge_graph_into(g, fragment("a", "b", "ab2", start_time="2015-01-02T00:00:00Z"))
+        self.assertEqual(g.number_of_edges(), 1)
+        props = g.edge["a"]["b"]
+        self.assertEqual((props['start_time'], props['finish_time']), ("2015-01-01T00:00:00Z", "2015-01-03T00:00:00Z"))
+        self.assertEqual((props['origin'], props['uri']), ("dns", "ab2"))
+
+    def test_simple_graph_without_folding_later_times_win(self):
+        g = nx.DiGraph()
+        g.add_edge("a", "b", {'start_time': "2015-01-01T00:00:00Z"})
+        merge_graph_into(g, fragment("a", "b", "ab", start_time="2015-01-03T00:00:00Z"), fold_times=False)
+        self.assertEqual(g.edge["a"]["b"]['start_time'], "2015-01-03T00:00:00Z")
+
+    def test_fold_into_multigraph_keeps_unkeyed_edges(self):
+        g = nx.MultiDiGraph()
+        merge_graph_into(g, fragment("a", "b", "ab", start_time="2015-01-02T00:00:00Z"))
+        unkeyed = nx.DiGraph()
+        unkeyed.add_edge("a", "b", {'origin': "dns"})  # No URI, so it's a new edge
+        merge_graph_into(g, unkeyed)
+        merge_graph_into(g, fragment("a", "b", "ab", start_time="2015-01-01T00:00:00Z"))
+        self.assertEqual(g.number_of_edges(), 2)
+        self.assertEqual(g.edge["a"]["b"]["ab"]['start_time'], "2015-01-01T00:00:00Z")
+
+
+class FoldTimeTest(unittest.TestCase):
+
+    def test_missing_times_yield_the_other(self):
+        self.assertEqual(fold_time(None, "2015-01-01T00:00:00Z"), "2015-01-01T00:00:00Z")
+        self.assertEqual(fold_time("2015-01-01T00:00:00Z", ""), "2015-01-01T00:00:00Z")
+        self.assertIsNone(fold_time(None, None))
+
+    def test_times_compare_as_times_not_strings(self):
+        earlier, later = "2015-01-01T23:00:00-05:00", "2015-01-02T01:00:00Z"  # 04:00Z and 01:00Z on the 2nd
+        self.assertEqual(fold_time(earlier, later, min), later)
+        self.assertEqual(fold_time(earlier, later, max), earlier)
+
+    def test_value_is_kept_as_given(self):
+        self.assertEqual(fold_time("2015-01-01T00:00:00.000000Z", "2015-01-02T00:00:00Z", min),
+                         "2015-01-01T00:00:00.000000Z")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of the plugin metrics.
+
+"""
+## IMPORTS
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from verum.metrics import Histogram, Metrics
+
+
+## EXECUTION
+class HistogramTest(unittest.TestCase):
+
+    def test_empty_histogram_has_no_quantiles(self):
+        h = Histogram([1, 2, 5])
+        self.assertIsNone(h.quantile(0.5))
+        snapshot = h.snapshot()
+        self.assertEqual(snapshot['count'], 0)
+        self.assertIsNone(snapshot['mean'])
+        self.assertIsNone(snapshot['p99'])
+
+    def test_quantile_is_bucket_upper_bound(self):
+        h = Histogram([1, 2, 5])
+        for value in [0.5, 0.5, 0.5, 0.5, 4]:
+            h.observe(value)
+        self.assertEqual(h.quantile(0.5), 1)
+        self.assertEqual(h.quantile(0.8), 1)
+        self.assertEqual(h.quantile(0.95), 4)  # Bucket bound 5, but nothing larger than 4 was seen
+
+    def test_quantile_never_exceeds_max(self):
+        h = Histogram([1, 2, 5])
+        h.observe(0.2)
+        self.assertEqual(h.quantile(0.5), 0.2)
+
+    def test_bound_is_inclusive(self):
+        h = Histogram([1, 2, 5])
+        h.observe(1)
+        h.observe(3)
+        self.assertEqual(h.counts, [1, 0, 1, 0])
+        self.assertEqual(h.quantile(0.5), 1)
+
+    def test_overflow_bucket_returns_max(self):
+        h = Histogram([1, 2, 5])
+        h.observe(0.5)
+        h.observe(10)
+        h.observe(30)
+        self.assertEqual(h.quantile(0.99), 30)
+        self.assertEqual(h.quantile(0.5), 30)
+
+    def test_empty_buckets_are_skipped(self):
+        h = Histogram([1, 2, 5])
+        h.observe(4)
+        self.assertEqual(h.quantile(0.0), 4)
+
+    def test_snapshot(self):
+        h = Histogram([2, 1, 5])  # Bounds are sorted
+        for value in [0.5, 1.5, 1.5, 6]:
+            h.observe(value)
+        snapshot = h.snapshot()
+        self.assertEqual(snapshot['count'], 4)
+        self.assertEqual(snapshot['sum'], 9.5)
+        self.assertEqual(snapshot['mean'], 9.5 / 4)
+        self.assertEqual(snapshot['max'], 6)
+        self.assertEqual(snapshot['p50'], 2)
+        self.assertEqual(snapshot['p95'], 6)
+        self.assertEqual(snapshot['buckets'], [(1, 1), (2, 3), (5, 3), (float("inf"), 4)])
+
+
+class MetricsTest(unittest.TestCase):
+
+    def test_record_and_snapshot(self):
+        m = Metrics()
+        m.record("enrichment", "dns", "run", 0.01)
+        m.record("enrichment", "dns", "run", 0.02, error=True)
+        m.record_cached("enrichment", "dns", "run")
+        series = m.snapshot()['enrichment']['dns']['run']
+        self.assertEqual(series['calls'], 2)
+        self.assertEqual(series['errors'], 1)
+        self.assertEqual(series['cached'], 1)
+        self.assertEqual(series['seconds']['count'], 2)
+
+        m.reset()
+        self.assertEqual(m.snapshot(), {})
+
+    def test_prometheus(self):
+        m = Metrics()
+        m.record("enrichment", "dns", "run", 0.01)
+        text = m.prometheus()
+        self.assertIn('verum_plugin_calls_total{kind="enrichment",operation="run",plugin="dns"} 1', text)
+        self.assertIn('verum_plugin_seconds_bucket{kind="enrichment",le="+Inf",operation="run",plugin="dns"} 1', text)
+        self.assertIn('verum_plugin_seconds_count{kind="enrichment",operation="run",plugin="dns"} 1', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of the networkx storage plugin.
+
+"""
+## IMPORTS
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import networkx as nx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import verum
+
+PLUGINS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plugins")
+
+
+## EXECUTION
+class EnrichTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        for f in ("networkx.py", "networkx.yapsy-plugin"):
+            shutil.copy(os.path.join(PLUGINS, f), self.dir)
+        self.app = verum.app(self.dir + "/", None)
+        name = self.app.get_interfaces(configured=True)[0]
+        self.plugin = self.app.plugin_index[name].plugin_object
+        self.plugin.context_graph = nx.MultiDiGraph()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_edges_with_a_uri_are_updated(self):
+        g = nx.MultiDiGraph()
+        g.add_edge("a", "b", "ab", {'origin': "dns"})
+        self.plugin.enrich(g)
+        g.edge["a"]["b"]["ab"]['origin'] = "whois"
+        self.plugin.enrich(g)
+        self.assertEqual(self.plugin.context_graph.number_of_edges(), 1)
+        self.assertEqual(self.plugin.context_graph.edge["a"]["b"]["ab"]['origin'], "whois")
+
+    def test_edges_without_a_uri_are_added(self):
+        g = nx.MultiDiGraph()
+        g.add_edge("a", "b", attr_dict={'origin': "dns"})  # Keyed 0 by networkx
+        self.plugin.enrich(g)
+        h = nx.MultiDiGraph()
+        h.add_edge("a", "b", attr_dict={'origin': "whois"})  # Also keyed 0 but a different edge
+        self.plugin.enrich(h)
+        self.assertEqual(sorted(d['origin'] for _, _, d in self.plugin.context_graph.edges(data=True)),
+                         ["dns", "whois"])
+
+    def test_simple_graphs_are_stored(self):
+        g = nx.DiGraph()
+        g.add_node("a", {'value': "a"})
+        g.add_edge("a", "b", {'uri': "ab", 'origin': "dns"})
+        g.add_edge("b", "c", {'origin': "dns"})
+        self.plugin.enrich(g)
+        self.plugin.enrich(g)
+        self.assertEqual(self.plugin.context_graph.node["a"], {'value': "a"})
+        self.assertEqual(self.plugin.context_graph.number_of_edges("a", "b"), 1)
+        self.assertEqual(self.plugin.context_graph.number_of_edges("b", "c"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of the enrichment planner.
+
+"""
+## IMPORTS
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from verum.planner import LatencyStats, Planner
+
+
+## EXECUTION
+# (name, cost, speed).  With 1 second per point of speed, a takes 1s, b 3s and c 2s until observed.
+CANDIDATES = [("a", 1, 1), ("b", 2, 3), ("c", 5, 2)]
+
+
+class LatencyStatsTest(unittest.TestCase):
+
+    def test_empty(self):
+        self.assertIsNone(LatencyStats().percentile(50))
+
+    def test_nearest_rank(self):
+        stats = LatencyStats()
+        for i in range(10, 0, -1):
+            stats.observe(i)
+        self.assertEqual(stats.percentile(0), 1)
+        self.assertEqual(stats.percentile(50), 5)
+        self.assertEqual(stats.percentile(90), 9)
+        self.assertEqual(stats.percentile(95), 10)
+        self.assertEqual(stats.percentile(100), 10)
+
+    def test_window(self):
+        stats = LatencyStats(size=3)
+        for seconds in [100, 1, 2, 3]:
+            stats.observe(seconds)
+        self.assertEqual(stats.count, 4)
+        self.assertEqual(stats.percentile(100), 3)
+
+
+class PlannerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.planner = Planner(percentile=50, min_samples=3, speed_seconds=1)
+
+    def test_estimate_falls_back_to_speed(self):
+        self.assertEqual(self.planner.estimate("b", 3), 3)
+        self.planner.observe("b", 0.1)
+        self.planner.observe("b", 0.1)
+        self.assertEqual(self.planner.estimate("b", 3), 3)
+        self.planner.observe("b", 0.3)
+        self.assertEqual(self.planner.estimate("b", 3), 0.1)
+
+    def test_no_budget_runs_everything(self):
+        self.assertEqual(self.planner.plan(CANDIDATES), [("b", 3), ("c", 2), ("a", 1)])
+        self.assertEqual(self.planner.plan(CANDIDATES, parallel=False), [("a", 1), ("c", 2), ("b", 3)])
+
+    def test_parallel_latency_bounds_each(self):
+        self.assertEqual(self.planner.plan(CANDIDATES, latency=2.5), [("c", 2), ("a", 1)])
+
+    def test_parallel_cost_takes_cheapest(self):
+        self.assertEqual(self.planner.plan(CANDIDATES, cost=4), [("b", 3), ("a", 1)])
+        self.assertEqual(self.planner.plan(CANDIDATES, latency=2.5, cost=4), [("a", 1)])
+
+    def test_sequential_latency_bounds_sum(self):
+        self.assertEqual(self.planner.plan(CANDIDATES, latency=3, parallel=False), [("a", 1), ("c", 2)])
+        self.assertEqual(self.planner.plan(CANDIDATES, latency=2.5, parallel=False), [("a", 1)])
+
+    def test_sequential_skips_what_doesnt_fit(self):
+        self.assertEqual(self.planner.plan(CANDIDATES, latency=4.5, cost=3, parallel=False), [("a", 1), ("b", 3)])
+
+    def test_plans_with_observed_latency(self):
+        for seconds in [0.1, 0.2, 5]:
+            self.planner.observe("b", seconds)
+        self.assertEqual(self.planner.plan(CANDIDATES, latency=1.5, parallel=False), [("b", 0.2), ("a", 1)])
+
+    def test_nothing_fits(self):
+        self.assertEqual(self.planner.plan(CANDIDATES, latency=0.5), [])
+        self.assertEqual(self.planner.plan([]), [])
+
+    def test_get_stats(self):
+        for seconds in [1, 2, 3, 4]:
+            self.planner.observe("a", seconds)
+        self.assertEqual(self.planner.get_stats(), {"a": {'calls': 4, 'planned_seconds': 2, 'median_seconds': 2}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of the plugin call profiler and the stack sampler.
+
+"""
+## IMPORTS
+import os
+import sys
+import random
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from verum.profiling import Profiler, StackSampler
+
+
+## EXECUTION
+def work(n):
+    return sum(range(n))
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def profiles(self, prefix=""):
+        return sorted(f for f in os.listdir(self.dir) if f.startswith(prefix))
+
+    def test_settings_are_checked(self):
+        self.assertRaises(ValueError, Profiler, self.dir, sample=1.5)
+        self.assertRaises(ValueError, Profiler, self.dir, keep=0)
+
+    def test_samples_the_configured_fraction(self):
+        random.seed(7)
+        expected = sum(1 for i in range(1000) if random.random() < 0.25)
+        profiler = Profiler(self.dir, sample=0.25)
+        random.seed(7)
+        sampled = sum(1 for i in range(1000) if profiler.wrap("enrichment", "dns", "run", work) is not work)
+        self.assertEqual(sampled, expected)
+        self.assertTrue(200 < sampled < 300)
+        self.assertEqual(profiler.stats()['enrichment']['dns']['run']['calls'], 1000)
+        self.assertEqual(profiler.stats()['enrichment']['dns']['run']['profiled'], 0)  # None were called
+        self.assertEqual(self.profiles(), [])
+
+    def test_sample_of_zero_or_one(self):
+        never = Profiler(self.dir, sample=0)
+        always = Profiler(self.dir, sample=1)
+        self.assertTrue(all(never.wrap("score", "pagerank", "score", work) is work for i in range(100)))
+        self.assertTrue(all(always.wrap("score", "pagerank", "score", work) is not work for i in range(100)))
+
+    def test_profiled_call_returns_and_is_saved(self):
+        profiler = Profiler(self.dir, sample=1)
+        self.assertEqual(profiler.wrap("storage", "Networkx Interface", "store", work)(10), 45)
+        self.assertEqual(len(self.profiles("storage.Networkx_Interface.store.")), 1)
+        stats = profiler.stats()['storage']['Networkx Interface']['store']
+        self.assertEqual((stats['calls'], stats['profiled']), (1, 1))
+
+    def test_only_listed_plugins_are_profiled(self):
+        profiler = Profiler(self.dir, plugins=["dns"], sample=1)
+        self.assertIs(profiler.wrap("enrichment", "whois", "run", work), work)
+        self.assertEqual(profiler.stats(), {})
+
+    def test_nested_calls_are_part_of_the_outer_profile(self):
+        profiler = Profiler(self.dir, sample=1)
+        inner = list()
+
+        def outer():
+            inner.append(profiler.wrap("storage", "nx", "query", work))
+            return inner[0](5)
+
+        self.assertEqual(profiler.wrap("score", "pagerank", "score", outer)(), 10)
+        self.assertIs(inner[0], work)
+        self.assertEqual(len(self.profiles()), 1)
+
+    def test_keeps_newest_profiles_per_operation(self):
+        profiler = Profiler(self.dir, sample=1, keep=3)
+        written = list()
+        for i in range(5):
+            before = set(self.profiles("storage.nx.store."))
+            profiler.wrap("storage", "nx", "store", work)(10)
+            written.extend(set(self.profiles("storage.nx.store.")) - before)
+            time.sleep(0.002)  # Profiles are named by time
+        profiler.wrap("storage", "nx", "query", work)(10)
+        profiler.wrap("storage", "nx2", "store", work)(10)
+        self.assertEqual(len(written), 5)
+        self.assertEqual(self.profiles("storage.nx.store."), sorted(written[-3:]))
+        self.assertEqual(len(self.profiles("storage.nx.query.")), 1)
+        self.assertEqual(len(self.profiles("storage.nx2.store.")), 1)
+
+
+def parked(started, gate):
+    started.set()
+    gate.wait(10)
+
+
+def outer():
+    return inner()
+
+
+def inner():
+    return sys._getframe()
+
+
+class StackSamplerTest(unittest.TestCase):
+
+    def setUp(self):
+        started = threading.Event()
+        self.gate = threading.Event()
+        self.thread = threading.Thread(target=parked, args=(started, self.gate))
+        self.thread.start()
+        started.wait(5)
+        for i in range(500):  # Until it's waiting on the gate
+            frame = sys._current_frames().get(self.thread.ident)
+            if frame is not None and frame.f_code.co_name == "wait" and frame.f_back.f_code.co_name == "wait":
+                break
+            time.sleep(0.001)
+
+    def tearDown(self):
+        self.gate.set()
+        self.thread.join(5)
+
+    def test_interval_must_be_positive(self):
+        self.assertRaises(ValueError, StackSampler, 0)
+
+    def test_collapse_runs_outermost_frame_first(self):
+        frame = outer()
+        self.assertTrue(StackSampler().collapse(frame).endswith(";test_profiling:outer;test_profiling:inner"))
+        stack = StackSampler(lines=True).collapse(frame)
+        self.assertTrue(stack.endswith(";test_profiling:inner:{0}".format(frame.f_lineno)))
+        self.assertEqual(len(stack.split(";")), len(StackSampler().frames(frame)))
+
+    def test_collapsed_format(self):
+        sampler = StackSampler()
+        sampler.attach("alexa;1M", self.thread)
+        sampler.sample()
+        sampler.sample()
+        lines = sampler.collapsed().splitlines()
+        self.assertEqual(len(lines), 1)
+        stack, count = lines[0].rsplit(" ", 1)
+        self.assertEqual(count, "2")
+        frames = stack.split(";")
+        self.assertEqual(frames[0], "alexa:1M")  # The label leads, with ';' replaced
+        self.assertIn("test_profiling:parked", frames)
+        self.assertEqual(frames[-1], "threading:wait")  # Sampled at the Python frame waiting in C
+        self.assertEqual(sampler.ticks, 2)
+
+    def test_samples_by_label(self):
+        sampler = StackSampler()
+        sampler.attach("a", self.thread)
+        sampler.attach("b", self.thread)
+        sampler.sample()
+        self.assertEqual(sorted(sampler.get_samples()), ["a", "b"])
+        self.assertEqual(sorted(sampler.get_samples(["b"])), ["b"])
+        self.assertEqual(sampler.collapsed(["nothing"]), "")
+
+        sampler.detach("b")
+        sampler.sample()
+        samples = sampler.get_samples()
+        self.assertEqual(sum(samples["a"].values()), 2)
+        self.assertEqual(sum(samples["b"].values()), 1)  # Kept after detaching
+
+        sampler.reset()
+        self.assertEqual((sampler.get_samples(), sampler.ticks), ({}, 0))
+
+    def test_finished_threads_are_not_sampled(self):
+        done = threading.Thread(target=lambda: None)
+        done.start()
+        done.join()
+        sampler = StackSampler()
+        sampler.attach("done", done)
+        sampler.sample()
+        self.assertEqual(sampler.get_samples(), {})
+
+    def test_start_and_stop_sample_a_live_thread(self):
+        sampler = StackSampler(interval=0.005)
+        sampler.attach("minion", self.thread)
+        self.assertIs(sampler.start(), sampler)
+        thread = sampler.thread
+        self.assertIs(sampler.start().thread, thread)  # Already running
+        for i in range(500):
+            if sampler.ticks >= 3:
+                break
+            time.sleep(0.01)
+        sampler.stop()
+        self.assertIsNone(sampler.thread)
+        self.assertFalse(thread.isAlive())
+        ticks = sampler.ticks
+        self.assertGreaterEqual(ticks, 3)
+        self.assertEqual(sum(sampler.get_samples()["minion"].values()), ticks)
+        time.sleep(0.05)
+        self.assertEqual(sampler.ticks, ticks)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of the storage query cache.
+
+"""
+## IMPORTS
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import networkx as nx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import verum
+from verum import uri
+from verum.cache import QueryCache
+
+PLUGINS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plugins")
+
+
+## EXECUTION
+def topic_graph(domain):
+    g = nx.MultiDiGraph()
+    node = uri.node_uri("domain", domain)
+    g.add_node(node, {'class': "attribute", 'key': "domain", 'value': domain, 'uri': node})
+    return g
+
+
+def resolution(domain, ip):
+    g = topic_graph(domain)
+    d, i = uri.node_uri("domain", domain), uri.node_uri("ip", ip)
+    g.add_node(i, {'class': "attribute", 'key': "ip", 'value': ip, 'uri': i})
+    attr = {'relationship': "describedBy", 'origin': "dns", 'start_time': "2015-01-01T00:00:00Z"}
+    key = uri.edge_uri(d, i, attr)
+    g.add_edge(d, i, key, dict(attr, uri=key))
+    return g
+
+
+class QueryCacheTest(unittest.TestCase):
+
+    def test_put_then_get_returns_a_copy(self):
+        cache = QueryCache()
+        key = cache.key(topic_graph("a.com"), 4, ["enrichment"], "Networkx")
+        cache.put(key, resolution("a.com", "1.1.1.1"), cache.generation("Networkx"))
+        g = cache.get(key)
+        self.assertEqual(g.number_of_edges(), 1)
+        g.add_node("x")
+        self.assertEqual(cache.get(key).number_of_nodes(), 2)
+
+    def test_keys_ignore_order_of_topics_and_dont_follow(self):
+        cache = QueryCache()
+        t1 = nx.MultiDiGraph([("a", "b")])
+        t2 = nx.MultiDiGraph([("b", "a")])
+        self.assertEqual(cache.key(t1, 4, ["x", "y"], "S"), cache.key(t2, 4, ["y", "x"], "S"))
+        self.assertNotEqual(cache.key(t1, 4, None, "S"), cache.key(t1, 3, None, "S"))
+        self.assertIsNone(cache.key(5, 4, None, "S"))
+
+    def test_bump_invalidates_only_that_storage(self):
+        cache = QueryCache()
+        a = cache.key("t", 4, None, "A")
+        b = cache.key("t", 4, None, "B")
+        cache.put(a, nx.MultiDiGraph(), cache.generation("A"))
+        cache.put(b, nx.MultiDiGraph(), cache.generation("B"))
+        cache.bump("A")
+        self.assertIsNone(cache.get(a))
+        self.assertIsNotNone(cache.get(b))
+        self.assertEqual(cache.stats()['stale'], 1)
+
+    def test_result_of_query_overlapping_a_write_is_not_cached(self):
+        cache = QueryCache()
+        key = cache.key("t", 4, None, "A")
+        generation = cache.generation("A")
+        cache.bump("A")  # Written while the query ran
+        cache.put(key, nx.MultiDiGraph(), generation)
+        self.assertIsNone(cache.get(key))
+
+    def test_lru_evicts_to_byte_budget(self):
+        size = len(__import__("cPickle").dumps(resolution("a.com", "1.1.1.1"), -1))
+        cache = QueryCache(max_bytes=2 * size + size // 2)
+        keys = [cache.key(str(i), 4, None, "A") for i in range(3)]
+        for key in keys:
+            cache.put(key, resolution("a.com", "1.1.1.1"), 0)
+        self.assertIsNone(cache.get(keys[0]))
+        self.assertIsNotNone(cache.get(keys[2]))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+
+class RunQueryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        for f in ("networkx.py", "networkx.yapsy-plugin"):
+            shutil.copy(os.path.join(PLUGINS, f), self.dir)
+        self.app = verum.app(self.dir + "/", None)
+        self.storage = self.app.get_interfaces(configured=True)[0]
+        self.app.enable_query_cache()
+
+    def tearDown(self):
+        self.app.disable_write_behind()
+        shutil.rmtree(self.dir)
+
+    def ips(self, g):
+        return sorted(d['value'] for _, d in g.nodes(data=True) if d.get('key') == "ip")
+
+    def test_write_invalidates_cached_query(self):
+        self.app.store_graph(resolution("a.com", "1.1.1.1"), self.storage)
+        self.assertEqual(self.ips(self.app.run_query(topic_graph("a.com"), storage=self.storage)), ["1.1.1.1"])
+        self.app.store_graph(resolution("a.com", "2.2.2.2"), self.storage)
+        self.assertEqual(self.ips(self.app.run_query(topic_graph("a.com"), storage=self.storage)),
+                         ["1.1.1.1", "2.2.2.2"])
+
+    def test_query_sees_graphs_still_in_write_behind(self):
+        self.app.store_graph(resolution("a.com", "1.1.1.1"), self.storage)
+        self.app.run_query(topic_graph("a.com"), storage=self.storage)
+        self.app.enable_write_behind(batch_seconds=60)
+        self.app.store_graph(resolution("a.com", "2.2.2.2"), self.storage)
+        self.assertEqual(self.ips(self.app.run_query(topic_graph("a.com"), storage=self.storage)),
+                         ["1.1.1.1", "2.2.2.2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of the service rate limits.
+
+"""
+## IMPORTS
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from verum import ratelimit
+from verum.ratelimit import TokenBucket, RateLimits
+
+
+## EXECUTION
+class FakeClock():
+    """ Stands in for the time module.  Time only passes when a caller sleeps (or the test advances it). """
+    now = 1000.0
+    slept = None  # Seconds of each sleep() call
+
+    def __init__(self):
+        self.slept = list()
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class ClockTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.time = ratelimit.time
+        self.clock = FakeClock()
+        ratelimit.time = self.clock
+
+    def tearDown(self):
+        ratelimit.time = self.time
+
+
+class TokenBucketTest(ClockTestCase):
+
+    def test_rate_and_burst_must_be_positive(self):
+        self.assertRaises(ValueError, TokenBucket, 0)
+        self.assertRaises(ValueError, TokenBucket, 1, 0)
+
+    def test_burst_then_waits_grow_as_tokens_go_negative(self):
+        bucket = TokenBucket(2, 2)
+        self.assertEqual([bucket.reserve() for i in range(4)], [0.0, 0.0, 0.5, 1.0])
+        self.assertEqual(bucket.tokens, -2)
+
+    def test_refills_at_rate_up_to_burst(self):
+        bucket = TokenBucket(2, 2)
+        bucket.reserve()
+        bucket.reserve()
+        self.clock.now += 0.5
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.5)
+        self.clock.now += 60  # Long idle periods don't bank more than the burst
+        self.assertEqual([bucket.reserve() for i in range(3)], [0.0, 0.0, 0.5])
+
+    def test_acquire_sleeps_for_its_token(self):
+        bucket = TokenBucket(1, 1)
+        self.assertEqual([bucket.acquire() for i in range(3)], [0.0, 1.0, 1.0])
+        self.assertEqual(self.clock.slept, [1.0, 1.0])
+        stats = bucket.stats()
+        self.assertEqual((stats['calls'], stats['waited'], stats['wait_seconds'], stats['max_wait']), (3, 2, 2.0, 1.0))
+
+    def test_waiting_callers_are_served_in_arrival_order(self):
+        bucket = TokenBucket(1, 1)
+        release = threading.Event()
+        waits = dict()
+        lock = threading.Lock()
+
+        def sleep(seconds):  # Hold every caller asleep so they all wait at once
+            release.wait(5)
+
+        self.clock.sleep = sleep
+
+        def caller(i):
+            w = bucket.acquire()
+            with lock:
+                waits[i] = w
+
+        threads = list()
+        for i in range(5):
+            t = threading.Thread(target=caller, args=(i,))
+            t.start()
+            threads.append(t)
+            for j in range(500):  # Let each caller reserve before the next arrives
+                if bucket.calls > i:
+                    break
+                threading.Event().wait(0.01)
+        self.assertEqual(bucket.calls, 5)  # Callers asleep don't hold up reservations
+        release.set()
+        for t in threads:
+            t.join(5)
+        self.assertEqual([waits[i] for i in range(5)], [0.0, 1.0, 2.0, 3.0, 4.0])
+
+    def test_configure_trims_tokens_to_burst(self):
+        bucket = TokenBucket(1, 5)
+        bucket.configure(2, 2)
+        self.assertEqual((bucket.rate, bucket.burst, bucket.tokens), (2, 2, 2))
+
+
+class RateLimitsTest(ClockTestCase):
+
+    def test_shared_service_keeps_slowest_rate_and_smallest_burst(self):
+        limits = RateLimits()
+        bucket = limits.configure("whois", 5, 10)
+        self.assertIs(limits.configure("whois", 2, 20), bucket)
+        self.assertEqual((bucket.rate, bucket.burst), (2, 10))
+        limits.configure("whois", 10, 3)
+        self.assertEqual((bucket.rate, bucket.burst), (2, 3))
+        self.assertEqual(limits.get("whois").tokens, 3)
+
+    def test_acquire_of_unlimited_service_doesnt_wait(self):
+        limits = RateLimits()
+        self.assertEqual(limits.acquire("dns"), 0.0)
+        self.assertIsNone(limits.get("dns"))
+
+    def test_acquire_and_stats(self):
+        limits = RateLimits()
+        limits.configure("whois", 1)
+        self.assertEqual([limits.acquire("whois") for i in range(2)], [0.0, 1.0])
+        self.assertEqual(limits.stats()["whois"]['calls'], 2)
+        self.assertEqual(limits.stats()["whois"]['burst'], ratelimit.BURST)
+
+
+if __name__ == "__main__":
+    unittest.main()
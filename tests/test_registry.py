@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of the plugin registry.
+
+"""
+## IMPORTS
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from verum import registry
+from verum.registry import PluginRegistry, describe
+from yapsy.PluginInfo import PluginInfo
+
+
+## EXECUTION
+class PluginRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.infofile = os.path.join(self.dir, "dns.yapsy-plugin")
+        self.module = os.path.join(self.dir, "dns.py")
+        self.write(self.infofile, "[Core]\nName = DNS\nModule = dns\n")
+        self.write(self.module, "x = 1\n")
+        self.candidate = (self.infofile, self.module[:-3], None)
+        self.manifest = os.path.join(self.dir, "manifest.json")
+        self.config = ['enrichment', True, 'DNS', 'desc', ['domain'], 1, 1]
+
+    def tearDown(self):
+        with registry.LOCK:
+            registry.LOADED.pop(self.infofile, None)
+        shutil.rmtree(self.dir)
+
+    def write(self, path, text):
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def test_new_plugin_has_no_config(self):
+        signature, config = PluginRegistry(self.manifest).lookup(self.candidate)
+        self.assertEqual(sorted(signature), sorted([self.infofile, self.module]))
+        self.assertIsNone(config)
+
+    def test_recorded_config_survives_in_manifest(self):
+        reg = PluginRegistry(self.manifest)
+        signature, _ = reg.lookup(self.candidate)
+        reg.record(self.candidate, signature, self.config)
+        reg.save()
+        with open(self.manifest) as f:
+            self.assertIn(self.infofile, json.load(f))
+
+        with registry.LOCK:
+            registry.LOADED.pop(self.infofile, None)  # As in another process
+        signature, config = PluginRegistry(self.manifest).lookup(self.candidate)
+        self.assertEqual(config, self.config)
+
+    def test_changed_module_invalidates_config(self):
+        reg = PluginRegistry(self.manifest)
+        signature, _ = reg.lookup(self.candidate)
+        reg.record(self.candidate, signature, self.config)
+        reg.save()
+        self.write(self.module, "x = 2  # changed\n")
+        self.assertIsNone(PluginRegistry(self.manifest).lookup(self.candidate)[1])
+
+    def test_touched_but_unchanged_module_keeps_config(self):
+        reg = PluginRegistry(self.manifest)
+        signature, _ = reg.lookup(self.candidate)
+        reg.record(self.candidate, signature, self.config)
+        reg.save()
+        later = time.time() + 10
+        os.utime(self.module, (later, later))
+
+        with registry.LOCK:
+            registry.LOADED.pop(self.infofile, None)  # As in another process
+        reg = PluginRegistry(self.manifest)
+        signature, config = reg.lookup(self.candidate)
+        self.assertEqual(config, self.config)
+        self.assertEqual(signature[self.module][0], os.stat(self.module).st_mtime)
+        self.assertTrue(reg.changed)  # The new mtime is saved
+
+    def test_config_is_shared_in_process_until_changed(self):
+        reg = PluginRegistry(None)
+        signature, _ = reg.lookup(self.candidate)
+        reg.record(self.candidate, signature, self.config)
+        self.assertEqual(PluginRegistry(None).lookup(self.candidate)[1], self.config)
+        self.write(self.module, "x = 3  # changed\n")
+        self.assertIsNone(PluginRegistry(None).lookup(self.candidate)[1])
+
+    def test_in_memory_registry_writes_nothing(self):
+        reg = PluginRegistry(None)
+        signature, _ = reg.lookup(self.candidate)
+        reg.record(self.candidate, signature, self.config)
+        reg.save()
+        self.assertFalse(os.path.exists(self.manifest))
+
+    def test_unreadable_manifest_is_ignored(self):
+        self.write(self.manifest, "{not json")
+        self.assertIsNone(PluginRegistry(self.manifest).lookup(self.candidate)[1])
+
+
+
+class DescribeTest(unittest.TestCase):
+
+    def info(self, **options):
+        plugin_info = PluginInfo("DNS", "/tmp/dns")
+        plugin_info.description = "Resolves domains"
+        if options:
+            plugin_info.details.add_section("Configuration")
+            for k, v in options.iteritems():
+                plugin_info.details.set("Configuration", k, v)
+        return plugin_info
+
+    def test_enrichment_is_described_from_its_config(self):
+        config = describe(self.info(type="Enrichment", inputs="IP, domain", cost="3", speed="2"))
+        self.assertEqual(config, ['enrichment', True, 'DNS', 'Resolves domains', ['ip', 'domain'], '3', '2'])
+
+    def test_other_types_are_described(self):
+        self.assertEqual(describe(self.info(type="interface")), ['interface', True, 'DNS'])
+        self.assertEqual(describe(self.info(type="score", cost="2", speed="4"))[0], 'score')
+        self.assertEqual(describe(self.info(type="minion"))[0], 'minion')
+
+    def test_plugin_without_type_is_not_described(self):
+        self.assertIsNone(describe(self.info()))
+        self.assertIsNone(describe(self.info(cost="1")))
+        self.assertIsNone(describe(self.info(type="unknown")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of graph sanitization before storage.
+
+"""
+## IMPORTS
+import os
+import sys
+import unittest
+import networkx as nx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from verum import sanitize, uri
+
+
+## EXECUTION
+def domain_node(g, value):
+    node = uri.node_uri("domain", value)
+    g.add_node(node, {'class': "attribute", 'key': "domain", 'value': value, 'uri': node})
+    return node
+
+
+class AsciiOnlyTest(unittest.TestCase):
+
+    def test_strips_non_ascii(self):
+        self.assertEqual(sanitize.ascii_only("caf\xc3\xa9"), "caf")
+        self.assertEqual(sanitize.ascii_only(u"caf\xe9"), "caf")
+        self.assertIsInstance(sanitize.ascii_only(u"cafe"), str)
+
+    def test_other_values_are_unchanged(self):
+        self.assertEqual(sanitize.ascii_only(5), 5)
+        self.assertIsNone(sanitize.ascii_only(None))
+
+
+class DomainTest(unittest.TestCase):
+
+    def test_lower_cased_without_trailing_dot(self):
+        self.assertEqual(sanitize.domain(" WDC-News-post.com. "), "wdc-news-post.com")
+
+    def test_internationalized_domains_become_punycode(self):
+        self.assertEqual(sanitize.domain(u"b\xfccher.de"), "xn--bcher-kva.de")
+        self.assertEqual(sanitize.domain(u"b\xfccher.de".encode("utf-8")), "xn--bcher-kva.de")
+
+    def test_non_strings_are_unchanged(self):
+        self.assertEqual(sanitize.domain(["a.com"]), ["a.com"])
+        self.assertIsNone(sanitize.domain(None))
+
+
+class SanitizeGraphTest(unittest.TestCase):
+
+    def test_attributes_are_made_ascii(self):
+        g = nx.MultiDiGraph()
+        g.add_node("n", {'key': "asn", 'value': "1", 'description': u"Soci\xe9t\xe9"})
+        g.add_edge("n", "n", "e", {'origin': "caf\xc3\xa9"})
+        g = sanitize.sanitize_graph(g)
+        self.assertEqual(g.node["n"]['description'], "Socit")
+        self.assertEqual(g.edge["n"]["n"]["e"]['origin'], "caf")
+
+    def test_domain_nodes_are_renamed_and_edges_rebuilt(self):
+        g = nx.MultiDiGraph()
+        upper = domain_node(g, "A.COM")
+        ip = uri.node_uri("ip", "1.1.1.1")
+        g.add_node(ip, {'class': "attribute", 'key': "ip", 'value': "1.1.1.1", 'uri': ip})
+        attr = {'relationship': "describedBy", 'origin': "dns"}
+        g.add_edge(upper, ip, uri.edge_uri(upper, ip, attr), dict(attr, uri=uri.edge_uri(upper, ip, attr)))
+
+        h = sanitize.sanitize_graph(g)
+        lower = uri.node_uri("domain", "a.com")
+        self.assertEqual(sorted(h.nodes()), sorted([lower, ip]))
+        self.assertEqual(h.node[lower]['value'], "a.com")
+        key = uri.edge_uri(lower, ip, attr)
+        self.assertEqual(h.edge[lower][ip].keys(), [key])
+        self.assertEqual(h.edge[lower][ip][key]['uri'], key)
+
+    def test_nodes_differing_by_case_are_merged(self):
+        g = nx.MultiDiGraph()
+        domain_node(g, "A.com")
+        domain_node(g, "a.com.")
+        h = sanitize.sanitize_graph(g)
+        self.assertEqual(h.nodes(), [uri.node_uri("domain", "a.com")])
+
+    def test_domains_can_be_left_alone(self):
+        g = nx.MultiDiGraph()
+        node = domain_node(g, "A.COM")
+        self.assertEqual(sanitize.sanitize_graph(g, domains=False).nodes(), [node])
+
+
+if __name__ == "__main__":
+    unittest.main()
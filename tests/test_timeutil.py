@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of start_time parsing and normalization.
+
+"""
+## IMPORTS
+import os
+import sys
+import time
+import unittest
+from datetime import datetime, timedelta, tzinfo
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from verum import timeutil
+
+
+## EXECUTION
+class EST(tzinfo):
+    def utcoffset(self, dt):
+        return timedelta(hours=-5)
+
+    def dst(self, dt):
+        return timedelta(0)
+
+
+class ParseTest(unittest.TestCase):
+
+    def test_canonical_strings_parse_without_dateutil(self):
+        self.assertEqual(timeutil.parse_canonical("2014-11-01T10:34:05Z"), 1414838045)
+        self.assertIsNone(timeutil.parse_canonical("2014-11-01T10:34Z"))
+        self.assertIsNone(timeutil.parse_canonical("2014-13-01T10:34:05Z"))
+        self.assertIsNone(timeutil.parse_canonical("2014-11-01TAA:34:05Z"))
+
+    def test_other_iso_forms_are_canonicalized(self):
+        self.assertEqual(timeutil.parse("2014-11-01T10:34Z"), "2014-11-01T10:34:00Z")
+        self.assertEqual(timeutil.parse("2014-11-01T05:34:05-05:00"), "2014-11-01T10:34:05Z")
+        self.assertEqual(timeutil.parse("2014-11-01T10:34:05.250000Z"), "2014-11-01T10:34:05Z")
+
+    def test_canonical_string_is_returned_as_is(self):
+        t = "2014-11-01T10:34:05Z"
+        self.assertEqual(timeutil.parse(t), t)
+
+    def test_datetimes_and_epochs(self):
+        self.assertEqual(timeutil.parse(datetime(2014, 11, 1, 10, 34, 5)), "2014-11-01T10:34:05Z")
+        self.assertEqual(timeutil.parse(datetime(2014, 11, 1, 5, 34, 5, tzinfo=EST())), "2014-11-01T10:34:05Z")
+        self.assertEqual(timeutil.parse(1414838045), "2014-11-01T10:34:05Z")
+        self.assertEqual(timeutil.parse(1414838045.9), "2014-11-01T10:34:05Z")
+
+    def test_unparseable_times_raise(self):
+        self.assertRaises(ValueError, timeutil.parse, "")
+        self.assertRaises(ValueError, timeutil.parse, "not a time")
+        self.assertRaises(ValueError, timeutil.parse, None)
+
+    def test_failed_parses_are_cached(self):
+        timeutil.to_epoch("not a time either")
+        self.assertIn("not a time either", timeutil.EPOCHS)
+        self.assertIsNone(timeutil.to_epoch("not a time either"))
+
+
+class NormalizeTest(unittest.TestCase):
+
+    def test_empty_or_bad_times_are_now(self):
+        before = int(time.time())
+        for t in ("", None, "garbage"):
+            epoch = timeutil.to_epoch(timeutil.normalize(t))
+            self.assertTrue(before <= epoch <= int(time.time()))
+
+    def test_valid_times_are_parsed(self):
+        self.assertEqual(timeutil.normalize("2014-11-01T10:34Z"), "2014-11-01T10:34:00Z")
+
+    def test_earlier(self):
+        self.assertTrue(timeutil.earlier("2014-11-01T10:34:05Z", "2014-11-01T05:35:00-05:00"))
+        self.assertFalse(timeutil.earlier("2014-11-01T10:34:05Z", "2014-11-01T10:34:05Z"))
+        self.assertFalse(timeutil.earlier("", "2014-11-01T10:34:05Z"))
+
+
+if __name__ == "__main__":
+    unittest.main()
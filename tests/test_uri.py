@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of the memoized URI builders.
+
+"""
+## IMPORTS
+import os
+import sys
+import imp
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from verum import uri
+from verum.uri import Memo
+from verum.helper import load_shared
+
+PLUGINS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plugins")
+
+
+## EXECUTION
+class MemoTest(unittest.TestCase):
+
+    def test_get_returns_put_value(self):
+        memo = Memo(4)
+        memo.put("a", 1)
+        self.assertEqual(memo.get("a"), 1)
+        self.assertIsNone(memo.get("b"))
+
+    def test_full_generation_becomes_previous(self):
+        memo = Memo(2)
+        memo.put("a", 1)
+        memo.put("b", 2)
+        memo.put("c", 3)  # current is full: a and b become the previous generation
+        self.assertEqual(memo.current, {"c": 3})
+        self.assertEqual(memo.previous, {"a": 1, "b": 2})
+        self.assertEqual((memo.get("a"), memo.get("b"), memo.get("c")), (1, 2, 3))
+
+    def test_oldest_generation_is_dropped(self):
+        memo = Memo(1)
+        memo.put("a", 1)
+        memo.put("b", 2)
+        memo.put("c", 3)
+        self.assertIsNone(memo.get("a"))
+        self.assertEqual(memo.get("b"), 2)
+
+    def test_previous_hits_are_kept(self):
+        memo = Memo(2)
+        memo.put("a", 1)
+        memo.put("b", 2)
+        memo.put("c", 3)
+        memo.get("a")  # Moved back to the current generation
+        memo.put("d", 4)
+        memo.put("e", 5)
+        self.assertEqual(memo.get("a"), 1)
+        self.assertIsNone(memo.get("b"))
+
+    def test_clear(self):
+        memo = Memo(2)
+        memo.put("a", 1)
+        memo.clear()
+        self.assertIsNone(memo.get("a"))
+
+
+class BuilderTest(unittest.TestCase):
+
+    def setUp(self):
+        uri.clear()
+
+    def test_node_uri(self):
+        self.assertEqual(uri.node_uri("domain", "a.com"), "class=attribute&key=domain&value=a.com")
+        self.assertIs(uri.node_uri("domain", "a.com"), uri.node_uri("domain", "a.com"))
+        self.assertEqual(uri.node_uri("ip", u"1.1.1.1", "classification"), u"class=classification&key=ip&value=1.1.1.1")
+
+    def test_edge_uri_matches_the_plugins_format(self):
+        self.assertEqual(uri.memoized("a.com", "1.1.1.1"), uri.by_hand("a.com", "1.1.1.1"))
+        self.assertEqual(uri.memoized("a.com", "1.1.1.1"), uri.by_hand("a.com", "1.1.1.1"))  # From the memo
+
+    def test_edge_uri_depends_on_origin(self):
+        a, b = uri.node_uri("domain", "a.com"), uri.node_uri("ip", "1.1.1.1")
+        dns = uri.edge_uri(a, b, {"relationship": "describedBy", "origin": "dns"})
+        whois = uri.edge_uri(a, b, {"relationship": "describedBy", "origin": "whois"})
+        self.assertNotEqual(dns, whois)
+        self.assertTrue(dns.endswith("&relationship=describedBy&origin=dns"))
+
+    def test_non_ascii_values_do_not_raise(self):
+        node = uri.node_uri("domain", u"b\xfccher.de")
+        self.assertEqual(len(uri.uri_hash(node)), 36)
+
+
+
+class LoadSharedTest(unittest.TestCase):
+
+    def test_plugins_share_the_apps_module(self):
+        self.assertIs(load_shared("uri"), uri)
+        self.assertIs(load_shared("uri").NODE_URIS, uri.NODE_URIS)
+
+    def test_plugins_shared_loader(self):
+        shared = imp.load_source("verum_plugins_shared_test", os.path.join(PLUGINS, "_shared.py"))
+        self.assertIs(shared.uri, uri)
+        self.assertIs(shared.timeutil, sys.modules["verum.timeutil"])
+        self.assertIs(shared.tracing, sys.modules["verum.tracing"])
+
+
+if __name__ == "__main__":
+    unittest.main()
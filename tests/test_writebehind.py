@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Unit tests of the write-behind buffer.
+
+"""
+## IMPORTS
+import os
+import sys
+import time
+import unittest
+import networkx as nx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from verum import writebehind
+from verum.writebehind import WriteBehind
+
+
+## EXECUTION
+def node_graph(node, **props):
+    g = nx.MultiDiGraph()
+    g.add_node(node, props)
+    return g
+
+
+class Storage():
+    """ Records the graphs written and fails the first fail writes. """
+
+    def __init__(self, fail=0):
+        self.fail = fail
+        self.written = list()
+
+    def write(self, g):
+        if self.fail > 0:
+            self.fail -= 1
+            raise IOError("storage unavailable")
+        self.written.append(g)
+
+
+class WriteBehindTest(unittest.TestCase):
+
+    def buffer(self, storage, **kwargs):
+        kwargs.setdefault('batch_seconds', 60)  # Only write on flush() unless a test says otherwise
+        buf = WriteBehind(storage.write, "test", **kwargs)
+        self.addCleanup(self.stop, buf)
+        return buf
+
+    def stop(self, buf):
+        """ Stops the background writer without flushing. """
+        with buf.lock:
+            buf.closed = True
+            buf.lock.notify_all()
+        if buf.thread is not None:
+            buf.thread.join(5)
+
+    def test_flush_writes_one_merged_batch(self):
+        storage = Storage()
+        buf = self.buffer(storage)
+        buf.put(node_graph("a"))
+        buf.put(node_graph("b"))
+        self.assertEqual(storage.written, [])
+        buf.flush()
+        self.assertEqual(len(storage.written), 1)
+        self.assertEqual(sorted(storage.written[0].nodes()), ["a", "b"])
+        self.assertEqual(buf.stats()['nodes_pending'], 0)
+
+    def test_later_graphs_win_within_a_batch(self):
+        storage = Storage()
+        buf = self.buffer(storage)
+        buf.put(node_graph("a", score=1))
+        buf.put(node_graph("a", score=2))
+        buf.flush()
+        self.assertEqual(storage.written[0].node["a"]['score'], 2)
+
+    def test_failed_batch_is_retried_ahead_of_newer_graphs(self):
+        storage = Storage(fail=1)
+        buf = self.buffer(storage)
+        buf.put(node_graph("a", score=1))
+        self.assertRaises(IOError, buf.flush)
+        buf.put(node_graph("a", score=2))
+        buf.flush()
+        self.assertEqual(len(storage.written), 1)
+        self.assertEqual(storage.written[0].node["a"]['score'], 2)  # The newer graph is applied after the retry
+        self.assertEqual(buf.stats()['errors'], 1)
+
+    def test_batch_is_dropped_after_max_retries(self):
+        storage = Storage(fail=writebehind.MAX_RETRIES + 1)
+        buf = self.buffer(storage)
+        buf.put(node_graph("a"))
+        for _ in range(writebehind.MAX_RETRIES + 1):
+            self.assertRaises(IOError, buf.flush)
+        self.assertEqual(buf.stats()['dropped'], 1)
+        buf.flush()
+        self.assertEqual(storage.written, [])
+
+    def test_batches_are_written_in_order(self):
+        storage = Storage()
+        buf = self.buffer(storage)
+        for node in ("a", "b", "c"):
+            buf.put(node_graph(node))
+            buf.flush()
+        self.assertEqual([g.nodes() for g in storage.written], [["a"], ["b"], ["c"]])
+
+    def test_full_batch_is_written_in_the_background(self):
+        storage = Storage()
+        buf = self.buffer(storage, batch_nodes=2)
+        buf.put(node_graph("a"))
+        buf.put(node_graph("b"))
+        deadline = time.time() + 5
+        while not storage.written and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(sorted(storage.written[0].nodes()), ["a", "b"])
+
+    def test_close_flushes_and_refuses_more_graphs(self):
+        storage = Storage()
+        buf = self.buffer(storage)
+        buf.put(node_graph("a"))
+        buf.close()
+        self.assertEqual(len(storage.written), 1)
+        self.assertRaises(ValueError, buf.put, node_graph("b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
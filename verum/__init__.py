@@ -24,8 +24,16 @@ under the License.
 
 
 __all__ = [ 'app',
-            'helper'
+            'helper',
+            'uri',
+            'timeutil',
+            'sanitize',
+            'tracing'
           ]
 # Import the packages
 from app import app
+import uri
+import timeutil
+import sanitize
+import tracing
 from helper import *
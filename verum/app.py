@@ -38,6 +38,33 @@ import logging
 CONFIG_FILE = "/tmp/verum.cfg"
 LOGLEVEL = logging.INFO
 LOG = None
+ENRICHMENT_WORKERS = 8  # Threads used when running enrichments in parallel
+ENRICHMENT_WAIT = 600  # Seconds run_enrichments_many() waits for the next topic to finish before giving up on those in flight
+PLUGIN_SLOTS = 10  # Concurrent calls allowed to a cost 1 enrichment.  Costlier enrichments get proportionally fewer.
+ENRICHMENT_TIMEOUT = None  # Seconds an enrichment call may block before it's abandoned.  None to call plugins inline with no limit.  Plugins may set 'timeout'.
+BREAKER_FAILURES = 5  # Failed enrichment calls in a row which open the plugin's circuit breaker.  Plugins may set 'breaker_failures'.
+BREAKER_COOLDOWN = 60  # Seconds an enrichment is skipped once its breaker opens.  Plugins may set 'breaker_cooldown'.
+CACHE = False  # Cache enrichment results
+CACHE_SIZE = 10000  # Enrichment results held in memory
+CACHE_TTL = 86400  # Default seconds an enrichment result is reused.  Plugins may set 'cache_ttl' in their config.
+CACHE_FILE = None  # sqlite file for the on-disk cache tier.  None keeps the cache in memory only.  Must be writable only by Verum's user as it's unpickled.
+CACHE_MISS_TTL = 3600  # Default seconds an enrichment which found nothing is skipped.  Plugins may set 'cache_miss_ttl'.
+CACHE_FAILURE_TTL = 600  # Default seconds an enrichment which errored is skipped.  Plugins may set 'cache_failure_ttl'.
+REGISTRY_FILE = None  # Manifest of configured plugins so unchanged plugins load lazily across runs.  Keep it out of world-writable directories.  None to disable.
+TRACE_FILE = None  # JSONL file spans of the enrich, store, query, and score calls are written to.  None to not trace.
+METRICS = True  # Record timing and throughput of the enrichment, storage, and scoring plugins
+PROFILE = False  # Profile a sample of the enrichment, storage, and scoring plugin calls with cProfile
+PROFILE_DIR = "/tmp/verum_profiles"  # Directory the .pstats files of profiled calls are written to
+PROFILE_PLUGINS = None  # List of plugin names to profile.  None to profile all plugins.
+PROFILE_SAMPLE = 0.1  # Fraction of plugin calls profiled
+PROFILE_KEEP = 10  # Profiles kept per plugin operation.  Older ones are deleted.
+STACK_INTERVAL = 0.02  # Seconds between stack samples of minion threads while sampling
+QUERY_CACHE = False  # Cache run_query() results until the storage is written to
+QUERY_CACHE_BYTES = 64 * 1024 * 1024  # Memory budget of cached query results (measured as pickled bytes)
+WRITE_BEHIND = False  # Buffer store_graph() calls and write them to storage in batches
+WRITE_BATCH_NODES = 5000  # Nodes in a write-behind batch before it is written
+WRITE_BATCH_SECONDS = 5  # Seconds a graph may wait in the write-behind buffer
+WRITE_MAX_PENDING_NODES = 50000  # Nodes buffered per storage before store_graph() blocks
 
 
 
@@ -50,6 +77,7 @@ import argparse
 from datetime import datetime # timedelta imported above
 try:
     from yapsy.PluginManager import PluginManager
+    from registry import PluginRegistry, load_candidate, describe
     plugin_import = True
 except:
     plugin_import = False
@@ -59,6 +87,22 @@ import networkx as nx
 import os
 import urlparse  # For validate_url helper
 import inspect
+import threading  # For limiting concurrent enrichment calls
+import Queue  # For collecting parallel enrichment results
+import time  # For enrichment deadlines
+from executor import WorkerPool
+from cache import EnrichmentCache, QueryCache, CachedFailure
+from breaker import CircuitBreaker, BreakerOpen, CallTimeout, CallRefused, call_with_timeout
+from planner import Planner
+import uri  # Shared node and edge URI builders used by the plugins
+import timeutil  # Shared time normalization used by the plugins and helper
+import sanitize  # Shared sanitization used by the helper and storage plugins
+from helper import GraphAccumulator, merge_graph_into
+from writebehind import WriteBehind
+from metrics import Metrics
+from profiling import Profiler, StackSampler
+import tracing  # Span tracing shared with the storage plugins
+import ratelimit  # Rate limits of the external services, shared by the apps in the process
 
 ## SETUP
 __author__ = "Gabriel Bassett"
@@ -109,6 +153,78 @@ if config_file:
             log = config.get('LOGGING', 'log')
         else:
             log = None
+    if config.has_section('Enrichment'):
+        if 'workers' in config.options('Enrichment'):
+            ENRICHMENT_WORKERS = config.getint('Enrichment', 'workers')
+        if 'wait' in config.options('Enrichment'):
+            ENRICHMENT_WAIT = config.getfloat('Enrichment', 'wait')
+        if 'slots' in config.options('Enrichment'):
+            PLUGIN_SLOTS = config.getint('Enrichment', 'slots')
+        if 'timeout' in config.options('Enrichment'):
+            ENRICHMENT_TIMEOUT = config.get('Enrichment', 'timeout')
+            if ENRICHMENT_TIMEOUT.lower() in ("", "none"):
+                ENRICHMENT_TIMEOUT = None
+            else:
+                ENRICHMENT_TIMEOUT = float(ENRICHMENT_TIMEOUT)
+        if 'breaker_failures' in config.options('Enrichment'):
+            BREAKER_FAILURES = config.getint('Enrichment', 'breaker_failures')
+        if 'breaker_cooldown' in config.options('Enrichment'):
+            BREAKER_COOLDOWN = config.getfloat('Enrichment', 'breaker_cooldown')
+    if config.has_section('Cache'):
+        if 'enabled' in config.options('Cache'):
+            CACHE = config.getboolean('Cache', 'enabled')
+        if 'size' in config.options('Cache'):
+            CACHE_SIZE = config.getint('Cache', 'size')
+        if 'ttl' in config.options('Cache'):
+            CACHE_TTL = config.getfloat('Cache', 'ttl')
+        if 'file' in config.options('Cache'):
+            CACHE_FILE = config.get('Cache', 'file')
+        if 'miss_ttl' in config.options('Cache'):
+            CACHE_MISS_TTL = config.getfloat('Cache', 'miss_ttl')
+        if 'failure_ttl' in config.options('Cache'):
+            CACHE_FAILURE_TTL = config.getfloat('Cache', 'failure_ttl')
+    if config.has_section('Registry'):
+        if 'file' in config.options('Registry'):
+            REGISTRY_FILE = config.get('Registry', 'file')
+            if REGISTRY_FILE.lower() in ('', 'none'):
+                REGISTRY_FILE = None
+    if config.has_section('Tracing'):
+        if 'file' in config.options('Tracing'):
+            TRACE_FILE = config.get('Tracing', 'file')
+            if TRACE_FILE.lower() in ("", "none"):
+                TRACE_FILE = None
+    if config.has_section('Metrics'):
+        if 'enabled' in config.options('Metrics'):
+            METRICS = config.getboolean('Metrics', 'enabled')
+    if config.has_section('Profiling'):
+        if 'enabled' in config.options('Profiling'):
+            PROFILE = config.getboolean('Profiling', 'enabled')
+        if 'directory' in config.options('Profiling'):
+            PROFILE_DIR = config.get('Profiling', 'directory')
+        if 'plugins' in config.options('Profiling'):
+            PROFILE_PLUGINS = [p.strip() for p in config.get('Profiling', 'plugins').split(",") if p.strip()]
+            if not PROFILE_PLUGINS:
+                PROFILE_PLUGINS = None
+        if 'sample' in config.options('Profiling'):
+            PROFILE_SAMPLE = config.getfloat('Profiling', 'sample')
+        if 'keep' in config.options('Profiling'):
+            PROFILE_KEEP = config.getint('Profiling', 'keep')
+        if 'stack_interval' in config.options('Profiling'):
+            STACK_INTERVAL = config.getfloat('Profiling', 'stack_interval')
+    if config.has_section('QueryCache'):
+        if 'enabled' in config.options('QueryCache'):
+            QUERY_CACHE = config.getboolean('QueryCache', 'enabled')
+        if 'max_bytes' in config.options('QueryCache'):
+            QUERY_CACHE_BYTES = config.getint('QueryCache', 'max_bytes')
+    if config.has_section('WriteBehind'):
+        if 'enabled' in config.options('WriteBehind'):
+            WRITE_BEHIND = config.getboolean('WriteBehind', 'enabled')
+        if 'batch_nodes' in config.options('WriteBehind'):
+            WRITE_BATCH_NODES = config.getint('WriteBehind', 'batch_nodes')
+        if 'batch_seconds' in config.options('WriteBehind'):
+            WRITE_BATCH_SECONDS = config.getfloat('WriteBehind', 'batch_seconds')
+        if 'max_pending_nodes' in config.options('WriteBehind'):
+            WRITE_MAX_PENDING_NODES = config.getint('WriteBehind', 'max_pending_nodes')
 ## Set up Logging
 if __name__ == "__main__":
     args = parser.parse_args()
@@ -134,14 +250,37 @@ loc = loc[:ind+1]
 ## EXECUTION
 class app():
     db = None  # the sqlite database of plugins
+    lock = None  # Serializes access to the plugin database so the app can be shared by threads (e.g. minions)
+    storage_locks = None  # Locks serializing writes to each storage plugin, keyed by name
     plugins = None  # Configured plugins
     storage = None  # The plugin to use for storage
     PluginFolder = None  # Folder where the plugins are
     MinionFolder = None  # Folder where the minions are
     score = None  # the plugin to use for scoring
-    classify = None  # the clasification plugin
     helper = None  # The verum helper functions
     loc = None  # The verum lcoation
+    pool = None  # Worker threads for running enrichments in parallel
+    enrichment_slots = None  # Semaphores limiting concurrent calls per enrichment, keyed by name
+    enrichment_services = None  # Rate limited service each enrichment queries, keyed by name
+    enrichment_timeouts = None  # Seconds a call may block set by each enrichment, keyed by name
+    breakers = None  # Circuit breakers of the enrichments, keyed by name
+    planner = None  # Observed enrichment latencies and the plans fitting enrichments to a budget
+    enrichment_speed = None  # Speed of each enrichment, keyed by name
+    cache = None  # Cache of enrichment results (None if not caching)
+    cache_ttls = None  # Cache time to live configured by each enrichment, keyed by name
+    cache_miss_ttls = None  # Cache time to live of misses configured by each enrichment, keyed by name
+    cache_failure_ttls = None  # Cache time to live of failures configured by each enrichment, keyed by name
+    registry = None  # Registry of previously configured plugins
+    deferred = None  # Pending plugins, registered from the manifest or their .yapsy-plugin but not yet imported or configured, keyed by name
+    plugin_index = None  # Imported plugins' yapsy plugin info, keyed by name
+    enrichment_index = None  # Input type -> list of (name, cost, speed, configured) of enrichments.  Built from the plugin database.
+    routes = None  # Memo of enrichments selected for a set of inputs, cost, speed, and configured.  Cleared when the index is rebuilt.
+    query_cache = None  # Cache of storage query results (None if not caching)
+    metrics = None  # Timing and throughput of the plugins (None if not recording)
+    profiler = None  # Samples plugin calls with cProfile (None if not profiling)
+    sampler = None  # Samples the stacks of minion threads (None until sampling is started)
+    write_behind = None  # Write-behind buffers keyed by storage name (None if store_graph() writes directly)
+    write_behind_config = None  # (batch nodes, batch seconds, max pending nodes) of new write-behind buffers
 
     def __init__(self, PluginFolder=PluginFolder, MinionFolder=MinionFolder):
         #global PluginFolder
@@ -152,14 +291,42 @@ class app():
 
         # Load enrichments database
         self.db = self.set_db()
+        self.storage_locks = dict()
 
         # LOAD HELPER FROM SAME DIRECTORY
         fp, pathname, description = imp.find_module("helper", [loc])
         self.helper = imp.load_module("helper", fp, pathname, description)
 
+        # Learn enrichment latencies to plan budgeted enrichments with
+        self.planner = Planner()
+
         # Save the verum location
         self.loc = loc[:-6]  # -6 removed the trailing "verum/" from the location.
 
+        # Cache enrichment results if configured to
+        if CACHE:
+            self.enable_cache()
+
+        # Trace calls if configured to
+        if TRACE_FILE is not None:
+            self.enable_tracing(TRACE_FILE)
+
+        # Record plugin metrics if configured to
+        if METRICS:
+            self.metrics = Metrics()
+
+        # Profile plugin calls if configured to
+        if PROFILE:
+            self.enable_profiling()
+
+        # Cache storage queries if configured to
+        if QUERY_CACHE:
+            self.enable_query_cache()
+
+        # Batch writes to storage if configured to
+        if WRITE_BEHIND:
+            self.enable_write_behind()
+
         # Load the plugins Directory
         if self.PluginFolder:
             self.load_plugins()
@@ -185,21 +352,62 @@ class app():
             self.plugins.setPluginPlaces([self.PluginFolder, self.MinionFolder])
         #self.plugins.collectPlugins()
         self.plugins.locatePlugins()
-        self.plugins.loadPlugins()
+        candidates = self.plugins.getPluginCandidates()
         print "Plugin manager configured."
-
-        # Loop round the plugins and print their names.
-        cur = self.db.cursor()
+        self.registry = PluginRegistry(REGISTRY_FILE)
+        self.deferred = dict()
+        self.plugin_index = dict()
+
+        self.enrichment_slots = dict()
+        self.enrichment_services = dict()
+        self.enrichment_timeouts = dict()
+        self.breakers = dict()
+        self.enrichment_speed = dict()
+        self.cache_ttls = dict()
+        self.cache_miss_ttls = dict()
+        self.cache_failure_ttls = dict()
 
         # Clear tables
-        cur.execute("""DELETE FROM enrichments""")
-        cur.execute("""DELETE FROM inputs""")
-        cur.execute("""DELETE FROM storage""")
-        cur.execute("""DELETE FROM score""")
-        cur.execute("""DELETE FROM minion""")
-
-        for plugin in self.plugins.getAllPlugins():
-            plugin_config = plugin.plugin_object.configure()
+        with self.lock:
+            cur = self.db.cursor()
+            cur.execute("""DELETE FROM enrichments""")
+            cur.execute("""DELETE FROM inputs""")
+            cur.execute("""DELETE FROM storage""")
+            cur.execute("""DELETE FROM score""")
+            cur.execute("""DELETE FROM minion""")
+            self.db.commit()
+
+        for candidate in candidates:
+            signature, plugin_config = self.registry.lookup(candidate)
+            if plugin_config is None:
+                # Not configured before.  Describe it from its .yapsy-plugin file.
+                plugin_config = describe(candidate[2])
+            if plugin_config is not None:
+                # Import and configure it when it's first used
+                plugin = candidate[2]
+                self.deferred[plugin.name] = (candidate, signature)
+            else:
+                plugin, plugin_config = self.configure_plugin(candidate, signature)
+                if plugin is None:
+                    continue
+            self.register_plugin(plugin, plugin_config)
+
+        self.registry.save()
+        self.index_enrichments()
+
+        if self.cache is not None:
+            self.set_cache_ttls()
+
+
+    def register_plugin(self, plugin, plugin_config):
+        """
+
+        :param plugin: yapsy plugin info of the plugin
+        :param plugin_config: list returned by the plugin's configure()
+        Adds the plugin to the plugin database.
+        """
+        with self.lock:
+            cur = self.db.cursor()
             # Insert enrichment
             if plugin_config[0] == 'enrichment': # type
                 cur.execute('''INSERT INTO enrichments VALUES (?, ?, ?, ?, ?)''', (plugin_config[2], # Name
@@ -211,7 +419,29 @@ class app():
                 for inp in plugin_config[4]: # inputs
                     # Insert into inputs table
                     cur.execute('''INSERT INTO inputs VALUES (?,?)''', (plugin_config[2], inp))
-                self.db.commit()
+                # Costly enrichments get fewer concurrent calls
+                self.enrichment_slots[plugin_config[2]] = threading.BoundedSemaphore(max(1, PLUGIN_SLOTS // max(1, int(plugin_config[5]))))
+                self.enrichment_speed[plugin_config[2]] = int(plugin_config[6])
+                # Plugins may set how long their results can be cached
+                if plugin.details.has_option('Configuration', 'cache_ttl'):
+                    self.cache_ttls[plugin_config[2]] = float(plugin.details.get('Configuration', 'cache_ttl'))
+                if plugin.details.has_option('Configuration', 'cache_miss_ttl'):
+                    self.cache_miss_ttls[plugin_config[2]] = float(plugin.details.get('Configuration', 'cache_miss_ttl'))
+                if plugin.details.has_option('Configuration', 'cache_failure_ttl'):
+                    self.cache_failure_ttls[plugin_config[2]] = float(plugin.details.get('Configuration', 'cache_failure_ttl'))
+                # Plugins may bound how long a call blocks and how many failures open their breaker
+                if plugin.details.has_option('Configuration', 'timeout'):
+                    timeout = plugin.details.get('Configuration', 'timeout')
+                    self.enrichment_timeouts[plugin_config[2]] = None if timeout.lower() == "none" else float(timeout)
+                failures, cooldown = BREAKER_FAILURES, BREAKER_COOLDOWN
+                if plugin.details.has_option('Configuration', 'breaker_failures'):
+                    failures = int(plugin.details.get('Configuration', 'breaker_failures'))
+                if plugin.details.has_option('Configuration', 'breaker_cooldown'):
+                    cooldown = float(plugin.details.get('Configuration', 'breaker_cooldown'))
+                self.breakers[plugin_config[2]] = CircuitBreaker(failures, cooldown)
+                # Plugins may limit the rate they query their service at
+                if plugin.details.has_section('RateLimit'):
+                    self.set_rate_limit(plugin_config[2], plugin.details)
             elif plugin_config[0] == 'interface': # type
                 cur.execute('''INSERT INTO storage VALUES (?, ?)''', (plugin_config[2], int(plugin_config[1])))
             elif plugin_config[0] == 'score':
@@ -221,18 +451,143 @@ class app():
                                                                                plugin_config[4], # Cost
                                                                                plugin_config[5]) # Speed 
                 )
-            if plugin_config[0] == 'minion':
-                plugin_config = plugin.plugin_object.configure(self)
+            elif plugin_config[0] == 'minion':
                 cur.execute('''INSERT INTO minion VALUES (?, ?, ?, ?)''', (plugin_config[2], # Name
                                                                            int(plugin_config[1]), # Enabled
                                                                            plugin_config[3], # Descripton
                                                                            plugin_config[4]) # Speed 
                 )
 
-            if plugin.name == "classify":  # Classify is a unique name.  TODO: figure out if handling multiple 'classify' plugins is necessary
-                self.classify = plugin.plugin_object
+            print "Registered {2} plugin {0}.  Success: {1}".format(plugin.name, plugin_config[1], plugin_config[0])
+            self.db.commit()
+            if plugin_config[0] == 'enrichment':
+                self.index_enrichments()
+
+
+    def unregister_plugin(self, name):
+        """
+
+        :param name: the name of the plugin
+        Removes the plugin from the plugin database.
+        """
+        with self.lock:
+            cur = self.db.cursor()
+            for table in ['inputs', 'enrichments', 'storage', 'score', 'minion']:
+                cur.execute('''DELETE FROM {0} WHERE name = ?;'''.format(table), (name,))
+            self.db.commit()
+            self.index_enrichments()
 
-            print "Configured {2} plugin {0}.  Success: {1}".format(plugin.name, plugin_config[1], plugin_config[0])
+
+    def configure_plugin(self, candidate, signature):
+        """
+
+        :param candidate: a (info file, module path, plugin info) tuple from yapsy's getPluginCandidates()
+        :param signature: the plugin's signature from the registry
+        :return: tuple of the imported plugin info and its configure() result or (None, None) if the plugin failed to import
+        """
+        try:
+            plugin = load_candidate(self.plugins, candidate)
+        except Exception as e:
+            logging.error("Unable to import plugin {0} due to {1}.".format(candidate[1], e))
+            return None, None
+
+        # Plugins which trace their internals (e.g. neo4j) record their spans with the app's tracer
+        if hasattr(plugin.plugin_object, "tracer"):
+            plugin.plugin_object.tracer = tracing.TRACER
+        plugin_config = plugin.plugin_object.configure()
+        if plugin_config[0] == 'minion':
+            plugin_config = plugin.plugin_object.configure(self)
+        # Only offer the plugin once it's configured
+        self.plugins.appendPluginToCategory(plugin, "Default")
+        self.plugin_index[plugin.name] = plugin
+
+        # Only remember successful configurations so failures are retried
+        if plugin_config[1]:
+            self.registry.record(candidate, signature, plugin_config)
+        return plugin, plugin_config
+
+
+    def get_plugin(self, name):
+        """
+
+        :param name: the name of the plugin
+        :return: the yapsy plugin info of the plugin or None if no plugin has the name
+
+        NOTE: Plugins are imported and configured the first time they're requested.  Their registration is then
+               updated with what configure() returned.
+        """
+        plugin = self.plugin_index.get(name)
+        if plugin is not None:
+            return plugin
+
+        with self.registry.lock:
+            plugin = self.plugin_index.get(name)  # It may have been loaded while waiting for the lock
+            if plugin is not None or name not in self.deferred:
+                return plugin
+            candidate, signature = self.deferred.pop(name)
+            plugin, plugin_config = self.configure_plugin(candidate, signature)
+            self.registry.save()
+
+            self.unregister_plugin(name)
+            if plugin is None:
+                logging.warning("Plugin {0} failed to import on first use.".format(name))
+            else:
+                if not plugin_config[1]:
+                    logging.warning("Plugin {0} failed to configure on first use.".format(name))
+                self.register_plugin(plugin, plugin_config)
+        return plugin
+
+
+    def configure_deferred(self, names):
+        """
+
+        :param names: names of plugins
+        Imports and configures the deferred plugins among names so their registration says whether they configured.
+        """
+        deferred = self.deferred
+        if deferred:
+            for name in set(names).intersection(deferred):
+                self.get_plugin(name)
+
+
+    def index_enrichments(self):
+        """
+
+        Builds the in-memory index get_enrichments() routes topics with from the plugin database and clears the
+         routes memo.  Rerun by register_plugin() and unregister_plugin() whenever enrichments change.
+        """
+        index = dict()
+        for row in self.query('''SELECT e.name, i.input, e.cost, e.speed, e.configured
+                                  FROM enrichments e, inputs i
+                                  WHERE e.name = i.name;'''):
+            index.setdefault(row[1], list()).append((row[0], int(row[2]), int(row[3]), bool(row[4])))
+        # Replace rather than modify so threads reading the old index aren't affected
+        self.enrichment_index = index
+        self.routes = dict()
+
+
+    def get_classify(self):
+        """
+
+        :return: the classification plugin object or None if there isn't one
+        """
+        plugin = self.get_plugin("classify")  # Classify is a unique name.  TODO: figure out if handling multiple 'classify' plugins is necessary
+        if plugin is None:
+            return None
+        return plugin.plugin_object
+
+    classify = property(get_classify)  # the clasification plugin.  Imported when first used.
+
+
+    def query(self, sql, parameters=()):
+        """
+
+        :param sql: a sql statement to run against the plugin database
+        :param parameters: parameters of the statement
+        :return: list of rows returned
+        """
+        with self.lock:
+            return self.db.execute(sql, parameters).fetchall()
 
 
     def set_db(self):
@@ -240,7 +595,8 @@ class app():
 
         Sets up the enrichment sqlite in memory database
         """
-        conn = sqlite3.connect(":memory:")
+        self.lock = threading.RLock()
+        conn = sqlite3.connect(":memory:", check_same_thread=False)  # Shared by threads.  Access is serialized by self.lock.
         cur = conn.cursor()
         # Create enrichments table
         cur.execute('''CREATE TABLE enrichments (name text NOT NULL PRIMARY KEY,
@@ -282,8 +638,7 @@ class app():
         :return: A list of the potential enrichment inputs (ip, domain, etc)
         """
         inputs = list()
-        cur = self.db.cursor()
-        for row in cur.execute('''SELECT DISTINCT input FROM inputs;'''):
+        for row in self.query('''SELECT DISTINCT input FROM inputs;'''):
             inputs.append(row[0])
         return inputs
 
@@ -296,32 +651,31 @@ class app():
         :param speed: integer 1-10 speed of enrichment. (1 = fastest)
         :param enabled: Plugin is correctly configured.  If false, plugin may not run correctly.
         :return: list of tuples of (names, type) of enrichments matching the criteria
-        """
-        cur = self.db.cursor()
 
-        if type(inputs) == str:
+        NOTE: Answered from the in-memory index built by index_enrichments() rather than the plugin database.
+        NOTE: Matching plugins which are pending (registered but not yet imported) are configured first so they're
+               listed by whether configure() succeeded.
+        """
+        if isinstance(inputs, basestring):
             inputs = [inputs]
 
-        plugins = list()
-        names = list()
-        for row in cur.execute("""  SELECT DISTINCT e.name, i.input
-                                    FROM enrichments e, inputs i
-                                    WHERE e.name = i.name
-                                      AND e.cost <= ?
-                                      AND e.speed <= ?
-                                      AND configured = ?
-                                      AND i.input IN ({0})""".format(("?," * len(inputs))[:-1]),
-                                [cost,
-                                 speed,
-                                 int(configured)] +
-                                 inputs
-                               ):
-            plugins.append(tuple(row))
+        key = ("inputs", tuple(inputs), cost, speed, bool(configured))
+        plugins = self.routes.get(key)
+        if plugins is None:
+            if self.deferred:
+                self.configure_deferred([name for inp in set(inputs) for name, c, s, _ in self.enrichment_index.get(inp, [])
+                                         if c <= cost and s <= speed])
+            plugins = list()
+            for inp in set(inputs):
+                for name, c, s, conf in self.enrichment_index.get(inp, []):
+                    if c <= cost and s <= speed and conf == bool(configured):
+                        plugins.append((name, inp))
+            self.routes[key] = plugins
 
-        return plugins
+        return list(plugins)
 
 
-    def run_enrichments(self, topic, topic_type, names=None, cost=10, speed=10, start_time=""):
+    def run_enrichments(self, topic, topic_type, names=None, cost=10, speed=10, start_time="", parallel=False, timeout=None):
         """
 
         :param topic: topic to enrich (e.g. "1.1.1.1", "www.google.com")
@@ -329,46 +683,785 @@ class app():
         :param cost: integer 1-10 of resource cost of running the enrichment.  (1 = cheapest)
         :param speed: integer 1-10 speed of enrichment. (1 = fastest)
         :param names: a name (as string) or a list of names of enrichments to use
+        :param parallel: If true, run the enrichments concurrently on the app's worker pool.
+        :param timeout: wall-clock seconds the call may take.  Enrichments not finished by then are not merged.
         :return: None if storage configured (networkx graph representing the enrichment of the topic
+        NOTE: Enrichments which error are logged and left out of the returned graph rather than raising.
+        """
+        with tracing.span("run_enrichments", topic=topic, topic_type=topic_type, parallel=parallel) as span:
+            enrichments = self.select_enrichments(topic_type, names, cost, speed)
+            #print enrichments  # DEBUG
+            g = nx.MultiDiGraph()
+            start_time = timeutil.normalize(start_time)  # Parse once rather than in every enrichment
+
+            span.set(enrichments=len(enrichments))
+
+            if parallel:
+                g = self.run_enrichments_parallel(g, enrichments, topic, topic_type, start_time, timeout)
+                span.set(nodes=g.number_of_nodes(), edges=g.number_of_edges())
+                return g
+
+            deadline = None
+            if timeout is not None:
+                deadline = time.time() + timeout
+            for enrichment in enrichments:
+                # A plugin can't be interrupted, but don't start new ones once out of time
+                if deadline is not None and time.time() >= deadline:
+                    logging.info("Enrichment of {0} ran out of time before {1}.".format(topic, enrichment))
+                    break
+                # run the plugin and merge the graphs
+                try:
+                    self.merge_enrichment(g, self.run_enrichment(enrichment, topic, topic_type, start_time))
+                except (BreakerOpen, CachedFailure) as e:
+                    logging.info("Enrichment {0} of {1} skipped: {2}".format(enrichment, topic, e))
+                except Exception as e:
+                    logging.warning("Enrichment {0} of {1} failed due to {2}.".format(enrichment, topic, e))
+
+            span.set(nodes=g.number_of_nodes(), edges=g.number_of_edges())
+            return g
+
+
+    def run_enrichments_many(self, topics, topic_type, names=None, cost=10, speed=10, start_time="", batch_size=None, max_pending=None, timeout=None, wait=None):
+        """
+
+        :param topics: an iterable of topics to enrich.  (e.g. a list, generator, or open file with one topic per line)
+        :param topic_type: type of the topics (e.g. "ip", "domain")
+        :param names: a name (as string) or a list of names of enrichments to use
+        :param cost: integer 1-10 of resource cost of running the enrichment.  (1 = cheapest)
+        :param speed: integer 1-10 speed of enrichment. (1 = fastest)
+        :param start_time: start time passed to the enrichments.  Parsed once for all topics.  If empty, the time the
+                            call was made.
+        :param batch_size: If set, merge this many topics' graphs together before yielding them
+        :param max_pending: maximum number of topics being enriched at once.  Topics are read from the iterable only
+                             as slots free up so memory stays bounded.  Defaults to twice the worker pool size.
+        :param timeout: wall-clock seconds allowed per topic
+        :param wait: seconds to wait for the next topic to finish.  Defaults to ENRICHMENT_WAIT.
+        :return: generator of (topic, networkx graph) tuples in the order they finish, or of networkx graphs of
+                  batch_size merged topics if batch_size is set
+
+        NOTE: Enrichments which error are logged and left out of the topic's graph.
+        NOTE: If no topic finishes within the wait (e.g. a plugin without a timeout hangs), the topics still in
+               flight are logged as unfinished and no more topics are read.  Their workers stay busy until the hung
+               calls return.
+        """
+        enrichments = self.select_enrichments(topic_type, names, cost, speed)
+        start_time = timeutil.normalize(start_time)
+
+        if self.pool is None:
+            self.pool = WorkerPool(ENRICHMENT_WORKERS)
+        if max_pending is None:
+            max_pending = 2 * self.pool.size
+        if wait is None:
+            wait = ENRICHMENT_WAIT
+
+        results = Queue.Queue()
+        enrich_topic = tracing.wrap(self.enrich_topic)  # Topics' spans are children of the caller's span, if any
+        topics = iter(topics)
+        exhausted = False
+        pending = 0
+        in_flight = dict()  # topic -> times submitted and not finished
+        batch = None
+        batched = 0
+
+        while True:
+            # Top up the work in flight from the iterable
+            while not exhausted and pending < max_pending:
+                try:
+                    topic = next(topics)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if isinstance(topic, basestring):
+                    topic = topic.strip()
+                    if not topic:
+                        continue
+                self.pool.submit(results, topic, enrich_topic, enrichments, topic, topic_type, start_time, timeout)
+                pending += 1
+                in_flight[topic] = in_flight.get(topic, 0) + 1
+
+            if pending == 0:
+                break
+
+            try:
+                topic, g, error = results.get(timeout=wait)
+            except Queue.Empty:
+                logging.warning("No topic finished enrichment within {0} seconds.  Giving up on unfinished topics {1}."
+                                .format(wait, sorted(in_flight)))
+                break
+            pending -= 1
+            in_flight[topic] -= 1
+            if not in_flight[topic]:
+                del in_flight[topic]
+            if error is not None:
+                logging.warning("Enrichment of {0} failed due to {1}.".format(topic, error))
+                continue
+
+            if batch_size is None:
+                yield topic, g
+            else:
+                if batch is None:
+                    batch = nx.MultiDiGraph()
+                self.merge_enrichment(batch, g)
+                batched += 1
+                if batched >= batch_size:
+                    yield batch
+                    batch = None
+                    batched = 0
+
+        # Return the last partial batch
+        if batch is not None:
+            yield batch
+
+
+    def select_enrichments(self, topic_type, names=None, cost=10, speed=10):
         """
+
+        :param topic_type: type of topic (e.g. "ip", "domain")
+        :param names: a name (as string) or a list of names of enrichments to use
+        :param cost: integer 1-10 of resource cost of running the enrichment.  (1 = cheapest)
+        :param speed: integer 1-10 speed of enrichment. (1 = fastest)
+        :return: list of names of configured enrichments to run on the topic type
+        """
+        if isinstance(names, basestring):
+            names = [names]
+        key = ("select", topic_type, tuple(names) if names else None, cost, speed)
+        enrichments = self.routes.get(key)
+        if enrichments is not None:
+            return list(enrichments)
+
         enrichments = self.get_enrichments([topic_type], cost, speed, configured=True)
         enrichments = [e[0] for e in enrichments]
-        #print enrichments  # DEBUG
-        g = nx.MultiDiGraph()
 
         # IF a name(s) are given, subset to them
         if names:
-            enrichments = set(enrichments).intersection(set(names))
+            enrichments = list(set(enrichments).intersection(set(names)))
+
+        self.routes[key] = enrichments
+        return list(enrichments)
+
+
+    def plan_enrichments(self, topic_type, latency=None, cost=None, names=None, parallel=True):
+        """
+
+        :param topic_type: type of topic (e.g. "ip", "domain")
+        :param latency: seconds the enrichments may take.  None for no limit.
+        :param cost: total cost (summing each enrichment's 1-10 cost) of the enrichments run.  None for no limit.
+        :param names: a name (as string) or a list of names of enrichments to choose from.  None for all.
+        :param parallel: If true, plan for running the enrichments concurrently.  Otherwise one after another.
+        :return: list of (name, estimated seconds) of the enrichments to run, in the order to start them.  Enrichments
+                  whose circuit breaker is open are left out.
+
+        NOTE: Estimates are the observed latency of each enrichment (see planner.py) or, until it has been run a few
+               times, a guess from its configured speed.
+        """
+        enrichments = set(self.select_enrichments(topic_type, names))
+        candidates = list()
+        for name, c, s, configured in self.enrichment_index.get(topic_type, []):
+            if name not in enrichments:
+                continue
+            breaker = self.breakers.get(name) if self.breakers else None
+            if breaker is not None and breaker.is_open():
+                continue
+            candidates.append((name, c, s))
+        return self.planner.plan(candidates, latency, cost, parallel)
+
+
+    def run_enrichments_within(self, topic, topic_type, latency=None, cost=None, names=None, parallel=True,
+                               start_time="", report=False):
+        """ Runs the enrichments planned by plan_enrichments() to fit the budget and returns what finished in time.
+
+        :param topic: topic to enrich (e.g. "1.1.1.1", "www.google.com")
+        :param topic_type: type of topic (e.g. "ip", "domain")
+        :param latency: seconds the call may take.  Enrichments still running then are cancelled.  None for no limit.
+        :param cost: total cost of the enrichments run.  None for no limit.
+        :param names: a name (as string) or a list of names of enrichments to choose from.  None for all.
+        :param parallel: If true, run the enrichments concurrently on the app's worker pool
+        :param start_time: start time passed to the enrichments
+        :param report: If true, also return a dictionary of the enrichments 'planned' (name, estimated seconds),
+                        'finished', 'cancelled' (out of time), 'failed', and the 'seconds' taken
+        :return: networkx graph of the enrichments which finished in time (and the report if requested)
+
+        NOTE: A cancelled plugin call can't be interrupted.  It's abandoned on its own thread and its result is
+               thrown away.
+        """
+        with tracing.span("run_enrichments_within", topic=topic, topic_type=topic_type, latency=latency, cost=cost,
+                          parallel=parallel) as span:
+            begin = time.time()
+            deadline = begin + latency if latency is not None else None
+            plan = self.plan_enrichments(topic_type, latency, cost, names, parallel)
+            start_time = timeutil.normalize(start_time)
+            g = nx.MultiDiGraph()
+            finished, cancelled, failed = list(), list(), list()
+
+            if parallel:
+                if self.pool is None:
+                    self.pool = WorkerPool(ENRICHMENT_WORKERS)
+                results = Queue.Queue()
+                run_enrichment = tracing.wrap(self.run_enrichment)
+                for name, _ in plan:
+                    self.pool.submit(results, name, run_enrichment, name, topic, topic_type, start_time, deadline)
+                for name, g2, error in self.pool.as_completed(results, [name for name, _ in plan], latency, cancelled):
+                    if error is None:
+                        self.merge_enrichment(g, g2)
+                        finished.append(name)
+                    elif isinstance(error, CallTimeout):
+                        cancelled.append(name)
+                    else:
+                        logging.warning("Enrichment {0} of {1} failed due to {2}.".format(name, topic, error))
+                        failed.append(name)
+            else:
+                for name, _ in plan:
+                    if deadline is not None and time.time() >= deadline:
+                        cancelled.append(name)
+                        continue
+                    try:
+                        self.merge_enrichment(g, self.run_enrichment(name, topic, topic_type, start_time, deadline))
+                        finished.append(name)
+                    except CallTimeout:
+                        cancelled.append(name)
+                    except Exception as e:
+                        logging.warning("Enrichment {0} of {1} failed due to {2}.".format(name, topic, e))
+                        failed.append(name)
+
+            if cancelled:
+                logging.info("Enrichments {0} of {1} cancelled after the {2} second budget.".format(cancelled, topic,
+                                                                                                 latency))
+            span.set(planned=len(plan), finished=len(finished), cancelled=len(cancelled), failed=len(failed),
+                     nodes=g.number_of_nodes(), edges=g.number_of_edges())
+            if report:
+                return g, {'planned': plan, 'finished': finished, 'cancelled': cancelled, 'failed': failed,
+                           'seconds': time.time() - begin}
+            return g
+
+
+    def get_latency_stats(self):
+        """
+
+        :return: dictionary of enrichment name -> calls observed and the latencies the planner plans with
+        """
+        return self.planner.get_stats()
 
+
+    def enrich_topic(self, enrichments, topic, topic_type=None, start_time="", timeout=None):
+        """
+
+        :param enrichments: list of names of enrichments to run
+        :param topic: topic to enrich
+        :param topic_type: type of topic (e.g. "ip", "domain")
+        :param start_time: start time passed to the enrichments
+        :param timeout: wall-clock seconds allowed for the topic
+        :return: networkx graph of the enrichments of the topic.  Enrichments which error are logged and skipped.
+        """
+        with tracing.span("enrich_topic", topic=topic, topic_type=topic_type, enrichments=len(enrichments)) as span:
+            g = nx.MultiDiGraph()
+            deadline = None
+            if timeout is not None:
+                deadline = time.time() + timeout
+            for enrichment in enrichments:
+                if deadline is not None and time.time() >= deadline:
+                    logging.info("Enrichment of {0} ran out of time before {1}.".format(topic, enrichment))
+                    break
+                try:
+                    self.merge_enrichment(g, self.run_enrichment(enrichment, topic, topic_type, start_time))
+                except Exception as e:
+                    logging.warning("Enrichment {0} of {1} failed due to {2}.".format(enrichment, topic, e))
+            span.set(nodes=g.number_of_nodes(), edges=g.number_of_edges())
+            return g
+
+
+    def run_enrichments_parallel(self, g, enrichments, topic, topic_type=None, start_time="", timeout=None):
+        """
+
+        :param g: networkx graph to merge the enrichments into
+        :param enrichments: list of names of enrichments to run
+        :param topic: topic to enrich
+        :param topic_type: type of topic (e.g. "ip", "domain")
+        :param start_time: start time passed to the enrichments
+        :param timeout: wall-clock seconds to wait for the enrichments
+        :return: g with the enrichments that finished in time merged in
+        """
+        if self.pool is None:
+            self.pool = WorkerPool(ENRICHMENT_WORKERS)
+
+        # Start the slowest enrichments first so they overlap the most with the others
+        enrichments = sorted(enrichments, key=lambda e: self.enrichment_speed.get(e, 0), reverse=True)
+
+        results = Queue.Queue()
+        run_enrichment = tracing.wrap(self.run_enrichment)  # Enrichments' spans are children of the caller's span
         for enrichment in enrichments:
-            # get the plugin
-            plugin = self.plugins.getPluginByName(enrichment)
-            # run the plugin
-            g2 = plugin.plugin_object.run(topic, start_time)
-            # merge the graphs
-            for node, props in g2.nodes(data=True):
-                g.add_node(node, props)
-            for edge in g2.edges(data=True):
-                g.add_edge(edge[0], edge[1], attr_dict=edge[2])
+            self.pool.submit(results, enrichment, run_enrichment, enrichment, topic, topic_type, start_time)
+
+        # Merge each enrichment as it finishes
+        unfinished = list()
+        for enrichment, g2, error in self.pool.as_completed(results, enrichments, timeout, unfinished):
+            if error is not None:
+                logging.warning("Enrichment {0} of {1} failed due to {2}.".format(enrichment, topic, error))
+            else:
+                self.merge_enrichment(g, g2)
+
+        if unfinished:
+            logging.info("Enrichments {0} of {1} did not finish within {2} seconds.".format(unfinished, topic, timeout))
 
         return g
 
 
+    def run_enrichment(self, name, topic, topic_type=None, start_time="", deadline=None):
+        """
+
+        :param name: the name of the enrichment plugin to run
+        :param topic: topic to enrich
+        :param topic_type: type of topic (e.g. "ip", "domain").  Used as part of the cache key.
+        :param start_time: start time passed to the enrichment
+        :param deadline: time.time() by which the call must return.  A call still running then raises CallTimeout
+                          (without counting against the plugin's breaker or being cached as a failure).
+        :return: networkx graph returned by the enrichment
+
+        NOTE: A cached result keeps the start_time of the enrichment that produced it.
+        NOTE: While caching, an enrichment which recently errored on the topic raises CachedFailure instead of
+               running again.
+        NOTE: An enrichment which has failed repeatedly raises BreakerOpen instead of running until its breaker's
+               cool-down passes.  A call which blocks longer than the enrichment's timeout raises CallTimeout.
+        """
+        with tracing.span("enrichment", plugin=name, topic=topic, topic_type=topic_type) as span:
+            if topic_type == "domain" and isinstance(topic, basestring):
+                topic = sanitize.domain(topic)  # e.g. "WDC-News-post.com" and "wdc-news-post.com" are one topic
+            cache = self.cache
+            if cache is not None:
+                try:
+                    g = cache.get(name, topic, topic_type)
+                except CachedFailure:
+                    if self.metrics is not None:
+                        self.metrics.record_cached("enrichment", name, "run")
+                    raise
+                if g is not None:
+                    if self.metrics is not None:
+                        self.metrics.record_cached("enrichment", name, "run")
+                    span.set(cached=True, nodes=g.number_of_nodes(), edges=g.number_of_edges())
+                    return g
+
+            # get the plugin
+            plugin = self.get_plugin(name)
+            if plugin is None:
+                raise ValueError("Enrichment {0} is not available.  It is not registered or failed to load.".format(name))
+            slots = self.enrichment_slots.get(name)
+            metrics = self.metrics
+            run = plugin.plugin_object.run
+            if self.profiler is not None:
+                run = self.profiler.wrap("enrichment", name, "run", run)
+            timeouts = self.enrichment_timeouts
+            timeout = timeouts.get(name, ENRICHMENT_TIMEOUT) if timeouts is not None else ENRICHMENT_TIMEOUT
+
+            # Skip a plugin that keeps failing until its cool-down passes
+            breaker = self.breakers.get(name) if self.breakers else None
+            if breaker is not None and not breaker.allow():
+                span.set(skipped=True)
+                raise BreakerOpen("Enrichment {0} failed repeatedly.  Its circuit breaker is open.".format(name))
+            release = None
+            if slots is not None:
+                slots.acquire()  # Wait for a free slot so costly enrichments aren't flooded
+                release = slots.release
+            start = time.time()
+            try:
+                self.rate_limit(name, span)
+                start = time.time()  # Time the plugin, not the wait for a slot or token
+                limit = timeout
+                if deadline is not None:
+                    remaining = deadline - start
+                    if remaining <= 0:
+                        raise CallTimeout("No time left before the deadline.")
+                    limit = min(remaining, timeout) if timeout else remaining
+                if limit:
+                    # The call's thread releases the slot, so a hung call keeps its slot until it returns
+                    held, release = release, None
+                    g = call_with_timeout(limit, tracing.wrap(run), (topic, start_time), release=held)
+                else:
+                    g = run(topic, start_time)
+            except CallRefused:
+                if breaker is not None:
+                    breaker.cancel()  # Other calls are hung.  Not necessarily this plugin's failure.
+                raise
+            except Exception as e:
+                timed_out = isinstance(e, CallTimeout)
+                if metrics is not None:
+                    metrics.record("enrichment", name, "run", time.time() - start, error=True)
+                # The caller's deadline rather than the plugin's timeout bounded the call
+                budgeted = deadline is not None and (not timeout or deadline - start < timeout)
+                if timed_out and not budgeted and self.planner is not None:
+                    self.planner.observe(name, time.time() - start)  # At least this long
+                if timed_out and budgeted:
+                    # Out of the caller's budget.  Not the plugin's failure, and the time it was given says nothing
+                    #  of how long it takes, so it isn't recorded with the planner.
+                    span.set(cancelled=True)
+                    if breaker is not None:
+                        breaker.cancel()
+                    raise
+                if breaker is not None:
+                    breaker.failure(timeout=timed_out)
+                # Remember the failure so the topic isn't immediately retried
+                if cache is not None:
+                    cache.put_failure(name, topic, topic_type, e)
+                raise
+            finally:
+                if release is not None:
+                    release()
+            if breaker is not None:
+                breaker.success()
+            if self.planner is not None:
+                self.planner.observe(name, time.time() - start)
+            if metrics is not None:
+                metrics.record("enrichment", name, "run", time.time() - start, g)
+
+            if cache is not None:
+                cache.put(name, topic, topic_type, g)
+            span.set(nodes=g.number_of_nodes(), edges=g.number_of_edges())
+            return g
+
+
+    def set_rate_limit(self, name, details):
+        """
+
+        :param name: the name of the enrichment plugin
+        :param details: the ConfigParser of the plugin's .yapsy-plugin file, with a RateLimit section naming the
+                         Service and its Rate (requests per second) and optionally Burst (requests at once)
+        """
+        try:
+            service = details.get('RateLimit', 'service')
+            rate = details.getfloat('RateLimit', 'rate')
+            if details.has_option('RateLimit', 'burst'):
+                burst = details.getfloat('RateLimit', 'burst')
+            else:
+                burst = ratelimit.BURST
+            ratelimit.LIMITS.configure(service, rate, burst)
+        except (ConfigParser.Error, ValueError) as e:
+            logging.warning("Rate limit of enrichment {0} not set due to {1}.".format(name, e))
+            return
+        self.enrichment_services[name] = service
+
+
+    def rate_limit(self, name, span=tracing.NULL_SPAN):
+        """ Waits for a token from the enrichment's service.  Calls queue while the service's bucket is empty.
+
+        :param name: the name of the enrichment plugin about to be called
+        :param span: the span of the call, given the seconds waited
+        :return: seconds waited
+        """
+        services = self.enrichment_services
+        service = services.get(name) if services else None
+        if service is None:
+            return 0.0
+        wait = ratelimit.LIMITS.acquire(service)
+        if wait:
+            span.set(rate_limit_service=service, rate_limit_wait=wait)
+        return wait
+
+
+    def get_breaker_stats(self):
+        """
+
+        :return: dictionary of enrichment name -> breaker state ('closed', 'open', or 'half_open'), whether it's open,
+                  and counts of the failures, timeouts, and calls skipped
+        """
+        if not self.breakers:
+            return dict()
+        return {name: breaker.stats() for name, breaker in self.breakers.items()}
+
+
+    def reset_breaker(self, name=None):
+        """ Closes an enrichment's circuit breaker (e.g. once its service is known to be back).
+
+        :param name: the name of the enrichment.  None to close all breakers.
+        """
+        if not self.breakers:
+            return
+        for n, breaker in self.breakers.items():
+            if name is None or n == name:
+                breaker.success()
+
+
+    def get_rate_limit_stats(self):
+        """
+
+        :return: dictionary of service -> rate, burst, and counts of the calls made and calls which waited for a token
+        """
+        return ratelimit.LIMITS.stats()
+
+
+    def merge_enrichment(self, g, g2):
+        """
+
+        :param g: networkx graph to merge into.  (Modified in place.)
+        :param g2: networkx graph returned by an enrichment
+        """
+        merge_graph_into(g, g2)
+
+
+    ## CACHE FUNCTIONS
+
+    def enable_cache(self, size=None, ttl=None, path=None, miss_ttl=None, failure_ttl=None):
+        """
+
+        :param size: number of enrichment results to hold in memory
+        :param ttl: default seconds to reuse an enrichment result.  Plugins may override with 'cache_ttl' in their config.
+        :param path: sqlite file to also keep results in across runs.  None keeps results in memory only.
+        :param miss_ttl: default seconds to reuse an enrichment which found nothing (returned no edges)
+        :param failure_ttl: default seconds to skip an enrichment which errored
+        """
+        if size is None:
+            size = CACHE_SIZE
+        if ttl is None:
+            ttl = CACHE_TTL
+        if path is None:
+            path = CACHE_FILE
+        if miss_ttl is None:
+            miss_ttl = CACHE_MISS_TTL
+        if failure_ttl is None:
+            failure_ttl = CACHE_FAILURE_TTL
+        self.cache = EnrichmentCache(size, ttl, path, miss_ttl, failure_ttl)
+        if self.cache_ttls is not None:
+            self.set_cache_ttls()
+
+    def set_cache_ttls(self):
+        """
+
+        Passes the TTLs configured by the enrichment plugins to the cache.
+        """
+        self.cache.ttls = self.cache_ttls
+        self.cache.miss_ttls = self.cache_miss_ttls
+        self.cache.failure_ttls = self.cache_failure_ttls
+
+    def disable_cache(self):
+        self.cache = None
+
+    def get_cache_stats(self):
+        """
+
+        :return: dictionary of cache hit/miss counters (including per plugin counts of cached misses and failures)
+                  or None if not caching
+        """
+        if self.cache is None:
+            return None
+        return self.cache.stats()
+
+
+    def enable_query_cache(self, max_bytes=None):
+        """
+
+        :param max_bytes: memory budget of cached query results, measured as pickled bytes
+        """
+        if max_bytes is None:
+            max_bytes = QUERY_CACHE_BYTES
+        self.query_cache = QueryCache(max_bytes)
+
+    def disable_query_cache(self):
+        self.query_cache = None
+
+    def get_query_cache_stats(self):
+        """
+
+        :return: dictionary of query cache counters or None if not caching
+        """
+        if self.query_cache is None:
+            return None
+        return self.query_cache.stats()
+
+
+    ## METRICS FUNCTIONS
+
+    def timed(self, kind, name, operation, fn, *args, **kwargs):
+        """ Calls fn(*args, **kwargs), recording its latency in the plugin metrics (and profiling it if sampled).
+
+        :param kind: the kind of plugin (e.g. "storage", "score")
+        :param name: the plugin name
+        :param operation: what the plugin does (e.g. "query")
+        :param size: (keyword) the graph to count the nodes and edges of.  Defaults to the graph returned.
+        :return: what fn returns
+        """
+        size = kwargs.pop("size", None)
+        if self.profiler is not None:
+            fn = self.profiler.wrap(kind, name, operation, fn)
+        metrics = self.metrics
+        if metrics is None:
+            return fn(*args, **kwargs)
+        start = time.time()
+        try:
+            ret = fn(*args, **kwargs)
+        except Exception:
+            metrics.record(kind, name, operation, time.time() - start, size, error=True)
+            raise
+        metrics.record(kind, name, operation, time.time() - start, ret if size is None else size)
+        return ret
+
+
+    def enable_metrics(self):
+        if self.metrics is None:
+            self.metrics = Metrics()
+
+    def disable_metrics(self):
+        self.metrics = None
+
+    def reset_metrics(self):
+        if self.metrics is not None:
+            self.metrics.reset()
+
+    def get_metrics(self):
+        """
+
+        :return: dictionary of the plugin metrics ('plugins': kind -> plugin -> operation -> counters and latency
+                  summary) along with the cache, query cache, write-behind, rate limit, and circuit breaker counters.
+                  None if not recording.
+        """
+        if self.metrics is None:
+            return None
+        return {
+            'plugins': self.metrics.snapshot(),
+            'cache': self.get_cache_stats(),
+            'query_cache': self.get_query_cache_stats(),
+            'write_behind': self.get_write_behind_stats(),
+            'rate_limits': self.get_rate_limit_stats(),
+            'breakers': self.get_breaker_stats()
+        }
+
+    def get_metrics_prometheus(self):
+        """
+
+        :return: the metrics in the Prometheus text exposition format (e.g. to serve to a scraper).  None if not
+                  recording.
+        """
+        if self.metrics is None:
+            return None
+        query_cache = self.get_query_cache_stats()
+        storage = dict()
+        if query_cache is not None:
+            query_cache = dict(query_cache)
+            for name, generation in query_cache.pop('generations').iteritems():
+                storage[name] = {'generation': generation}  # Exported as verum_storage_generation{name="..."}
+        return self.metrics.prometheus(extra={
+            'cache': self.get_cache_stats(),
+            'query_cache': query_cache,
+            'storage': storage,
+            'write_behind': self.get_write_behind_stats(),
+            'rate_limits': self.get_rate_limit_stats(),
+            'breakers': self.get_breaker_stats()  # Exported as verum_breakers_open{name="..."} etc.
+        })
+
+
+    ## PROFILING FUNCTIONS
+
+    def enable_profiling(self, directory=None, plugins=None, sample=None, keep=None):
+        """
+
+        :param directory: directory to write .pstats files to.  Defaults to 'directory' in the Profiling config section.
+        :param plugins: list of plugin names to profile.  Defaults to the config's 'plugins' (or all plugins).
+        :param sample: fraction (0 to 1) of plugin calls to profile
+        :param keep: profiles kept per plugin operation.  Older ones are deleted.
+
+        NOTE: Calling again replaces the profiler (and its counts) with one of the new settings.
+        """
+        self.profiler = Profiler(directory if directory is not None else PROFILE_DIR,
+                                 plugins if plugins is not None else PROFILE_PLUGINS,
+                                 sample if sample is not None else PROFILE_SAMPLE,
+                                 keep if keep is not None else PROFILE_KEEP)
+
+    def disable_profiling(self):
+        self.profiler = None
+
+    def start_sampling(self, names=None, interval=None, lines=False):
+        """ Samples the stacks of running minions without restarting them.  Minions started while sampling are
+             sampled too.
+
+        :param names: list of names of minions to sample.  None for all running minions.
+        :param interval: seconds between samples.  Defaults to 'stack_interval' in the Profiling config section.
+        :param lines: If true, frames include line numbers
+        :return: set of names of the minions being sampled
+        """
+        if self.sampler is None:
+            self.sampler = StackSampler(interval if interval is not None else STACK_INTERVAL, lines)
+        minions = self.get_running_minions()
+        if names is not None:
+            minions = minions.intersection(set(names))
+        for minion in minions:
+            self.sampler.attach(minion, self.get_plugin(minion).plugin_object.thread)
+        self.sampler.start()
+        return set(self.sampler.threads.keys())
+
+    def stop_sampling(self):
+        """ Stops sampling.  The samples are kept until reset_sampling(). """
+        if self.sampler is not None:
+            self.sampler.stop()
+
+    def reset_sampling(self):
+        if self.sampler is not None:
+            self.sampler.reset()
+
+    def get_stack_samples(self, names=None):
+        """
+
+        :param names: list of names of minions.  None for all sampled minions.
+        :return: dictionary of minion -> collapsed stack -> samples.  None if sampling was never started.
+        """
+        if self.sampler is None:
+            return None
+        return self.sampler.get_samples(names)
+
+    def get_collapsed_stacks(self, names=None, path=None):
+        """
+
+        :param names: list of names of minions.  None for all sampled minions.
+        :param path: file to also write the stacks to (e.g. for flamegraph.pl stacks.txt > minions.svg)
+        :return: the samples in the collapsed stack format.  None if sampling was never started.
+        """
+        if self.sampler is None:
+            return None
+        stacks = self.sampler.collapsed(names)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(stacks)
+        return stacks
+
+    def get_profiling_stats(self):
+        """
+
+        :return: dictionary of kind -> plugin -> operation -> calls seen, calls profiled, and seconds profiled.  None
+                  if not profiling.
+        """
+        if self.profiler is None:
+            return None
+        return self.profiler.stats()
+
+
+    ## TRACING FUNCTIONS
+
+    def enable_tracing(self, path=None):
+        """
+
+        :param path: JSONL file to append spans to.  Spans of all apps in the process share this file.
+        """
+        if path is None:
+            path = TRACE_FILE
+        if path is None:
+            raise ValueError("No trace file set.  Provide one directly or set 'file' in the Tracing config section.")
+        tracing.configure(path)
+
+    def disable_tracing(self):
+        tracing.configure(None)
+
+
     ## INTERFACE FUNCTIONS
 
     def get_interfaces(self, configured=None):
         """
 
+        :param configured: True, False, or None (for both).  Pending plugins are configured first unless None.
         :return: list of strings of names of interface plugins
         """
-        cur = self.db.cursor()
         interfaces = list()
 
         if configured is None:
-            for row in cur.execute('''SELECT DISTINCT name FROM storage;'''):
+            for row in self.query('''SELECT DISTINCT name FROM storage;'''):
                 interfaces.append(row[0])
         else:
-             for row in cur.execute('''SELECT DISTINCT name from storage WHERE configured=?;''', (int(configured),)):
+            self.configure_deferred([row[0] for row in self.query('''SELECT DISTINCT name FROM storage;''')])
+            for row in self.query('''SELECT DISTINCT name from storage WHERE configured=?;''', (int(configured),)):
                 interfaces.append(row[0])           
         return interfaces
 
@@ -381,10 +1474,7 @@ class app():
         :param interface: The name of the plugin to use for storage.
         Sets the storage backend to use.  It must have been configured through a plugin prior to setting.
         """
-        cur = self.db.cursor()
-        configured_storage = list()
-        for row in cur.execute('''SELECT DISTINCT name FROM storage WHERE configured=1;'''):
-            configured_storage.append(row[0])
+        configured_storage = self.get_interfaces(configured=True)
         if interface in configured_storage:
             self.storage = interface
         else:
@@ -394,17 +1484,17 @@ class app():
         """
 
         :param cost: a maximum cost of running the minion
-        :param configured: True, False, or None (for both).  
+        :param configured: True, False, or None (for both).  Pending plugins are configured first unless None.
         :return: list of strings of tuples of (name, description) of minion plugins
         """
-        cur = self.db.cursor()
         minions = list()
 
         if configured is None:
-            for row in cur.execute('''SELECT DISTINCT name, description FROM minion WHERE cost <= ?;''', [int(cost)]):
+            for row in self.query('''SELECT DISTINCT name, description FROM minion WHERE cost <= ?;''', [int(cost)]):
                 minions.append(tuple(row[0:2]))
         else:
-             for row in cur.execute('''SELECT DISTINCT name, description FROM minion WHERE cost <= ? AND configured=?;''', [int(cost), int(configured)]):
+            self.configure_deferred([row[0] for row in self.query('''SELECT DISTINCT name FROM minion;''')])
+            for row in self.query('''SELECT DISTINCT name, description FROM minion WHERE cost <= ? AND configured=?;''', [int(cost), int(configured)]):
                 minions.append(tuple(row[0:2]))    
         return minions
 
@@ -423,9 +1513,12 @@ class app():
 
         for minion in minions:
             # get the plugin
-            plugin = self.plugins.getPluginByName(minion)
+            plugin = self.get_plugin(minion)
             # start the plugin
             plugin.plugin_object.start()
+            # Keep sampling a restarted minion
+            if self.sampler is not None and self.sampler.running:
+                self.sampler.attach(minion, plugin.plugin_object.thread)
 
     def get_running_minions(self):
         """
@@ -433,14 +1526,16 @@ class app():
         :return: A set of names of minions which are running
         """
 
-        minions = self.get_minions(cost=10000, configured=True)
+        minions = self.get_minions(cost=10000)  # Not configured=True, which would import pending minions
         minions = [m[0] for m in minions]
 
         running_minions = set()
         # Iterate Through the minions
         for minion in minions:
-            plugin = self.plugins.getPluginByName(minion)
-            if plugin.plugin_object.isAlive():
+            if minion in self.deferred:  # Not yet imported so can't be running
+                continue
+            plugin = self.get_plugin(minion)
+            if plugin is not None and plugin.plugin_object.isAlive():
                 running_minions.add(minion)
 
         return running_minions
@@ -452,15 +1547,23 @@ class app():
 
         for minion in minions:
             # get the plugin
-            plugin = self.plugins.getPluginByName(minion)
+            plugin = self.get_plugin(minion)
             # start the plugin
             plugin.plugin_object.stop()        
 
     def run_query(self, topic, max_depth=4, dont_follow=['enrichment', 'classification'], storage=None):
         """
 
+        :param topic: a networkx graph of the topic to return the context of
+        :param max_depth: the maximum distance from the topic to search
+        :param dont_follow: a list of attribute keys to not follow
         :param storage: the storage plugin to use
         :return: a networkx subgraph surrounded around the topic 
+
+        NOTE: With the query cache enabled, a repeated query returns a copy of the previous result until the storage
+               is written to through store_graph().
+        NOTE: With write-behind enabled, graphs buffered for the storage are written before it is queried so the
+               query sees them.
         """
         if not storage:
             storage = self.storage
@@ -468,25 +1571,179 @@ class app():
             raise ValueError("No storage set.  run set_storage() to set or provide directly.  Storage must be a configured plugin.")
         else:
             # get the plugin
-            plugin = self.plugins.getPluginByName(self.storage)
-
-        return plugin.plugin_object.query(topic, max_depth=max_depth, dont_follow=dont_follow)
+            plugin = self.get_plugin(storage)
+
+        with tracing.span("run_query", storage=storage, topics=topic.number_of_nodes(), max_depth=max_depth) as span:
+            # Write pending graphs first.  Writing bumps the storage's generation, invalidating its cached queries.
+            buffers = self.write_behind
+            buffer = buffers.get(storage) if buffers else None
+            if buffer is not None:
+                try:
+                    buffer.flush()
+                except Exception as e:
+                    logging.warning("Flushing writes to {0} before querying it failed due to {1}.".format(storage, e))
+            cache = self.query_cache
+            if cache is not None:
+                key = cache.key(topic, max_depth, dont_follow, storage)
+                generation = cache.generation(storage)  # Taken first so a write during the query leaves it uncached
+                g = cache.get(key)
+                if g is not None:
+                    if self.metrics is not None:
+                        self.metrics.record_cached("storage", storage, "query")
+                    span.set(cached=True, nodes=g.number_of_nodes(), edges=g.number_of_edges())
+                    return g
+
+            g = self.timed("storage", storage, "query", plugin.plugin_object.query, topic, max_depth=max_depth,
+                           dont_follow=dont_follow)
+
+            if cache is not None:
+                cache.put(key, g, generation)
+            span.set(nodes=g.number_of_nodes(), edges=g.number_of_edges())
+            return g
 
 
     def store_graph(self, g, storage=None):
         """
 
-        :param g: a networkx graph to merge with the set storage
+        :param g: a networkx graph (or helper GraphAccumulator) to merge with the set storage
+        :param storage: the storage plugin to use.  Threads sharing the app (e.g. minions) should pass their storage
+                         rather than calling set_interface().
+
+        NOTE: With write-behind enabled, the graph is buffered and written in a later batch.  Call flush() to write
+               buffered graphs (e.g. before exiting).  If the storage falls behind, this blocks until it catches up.
         """
         if not storage:
             storage = self.storage
         if not storage:
             raise ValueError("No storage set.  run set_storage() to set or provide directly.  Storage must be a configured plugin.")
-        else:
+        buffer = self.get_write_behind(storage)
+        with tracing.span("store_graph", storage=storage, buffered=buffer is not None) as span:
+            if tracing.enabled() and hasattr(g, "number_of_nodes"):
+                span.set(nodes=g.number_of_nodes(), edges=g.number_of_edges())
+            if buffer is not None:
+                buffer.put(g)  # Written later by the buffer's thread under its own write_graph span
+            else:
+                self.write_graph(g, storage)
+
+
+    def write_graph(self, g, storage):
+        """
+
+        :param g: a networkx graph (or helper GraphAccumulator) to merge with the storage
+        :param storage: the name of the storage plugin
+        """
+        with tracing.span("write_graph", storage=storage) as span:
+            if isinstance(g, GraphAccumulator):
+                g = g.build()
+            span.set(nodes=g.number_of_nodes(), edges=g.number_of_edges())
             # get the plugin
-            plugin = self.plugins.getPluginByName(self.storage)
-            # merge the graph
-            plugin.plugin_object.enrich(g)
+            plugin = self.get_plugin(storage)
+            if plugin is None:
+                raise ValueError("Storage {0} is not a configured plugin.".format(storage))
+            # merge the graph.  Storage plugins aren't assumed to be thread safe so writes to each are serialized.
+            with self.get_storage_lock(storage):
+                try:
+                    self.timed("storage", storage, "store", plugin.plugin_object.enrich, g, size=g)
+                finally:
+                    # Invalidate cached queries of the storage.  Also on error as the write may be partially applied.
+                    if self.query_cache is not None:
+                        self.query_cache.bump(storage)
+
+
+    def get_storage_lock(self, storage):
+        """
+
+        :param storage: the name of a storage plugin
+        :return: the lock serializing writes to the storage plugin
+        """
+        with self.lock:
+            if storage not in self.storage_locks:
+                self.storage_locks[storage] = threading.Lock()
+            return self.storage_locks[storage]
+
+
+    ## WRITE-BEHIND FUNCTIONS
+
+    def enable_write_behind(self, batch_nodes=None, batch_seconds=None, max_pending=None):
+        """
+
+        :param batch_nodes: nodes in a batch before it is written
+        :param batch_seconds: seconds a graph may wait before its batch is written
+        :param max_pending: nodes buffered per storage before store_graph() blocks
+        """
+        if batch_nodes is None:
+            batch_nodes = WRITE_BATCH_NODES
+        if batch_seconds is None:
+            batch_seconds = WRITE_BATCH_SECONDS
+        if max_pending is None:
+            max_pending = WRITE_MAX_PENDING_NODES
+        with self.lock:
+            self.write_behind_config = (batch_nodes, batch_seconds, max_pending)
+            if self.write_behind is None:
+                self.write_behind = dict()
+
+
+    def disable_write_behind(self):
+        """
+
+        Flushes and closes the write-behind buffers.  store_graph() writes directly afterwards.
+        """
+        with self.lock:
+            buffers = self.write_behind
+            self.write_behind = None
+        if buffers:
+            for buffer in buffers.values():
+                buffer.close()
+
+
+    def get_write_behind(self, storage):
+        """
+
+        :param storage: the name of a storage plugin
+        :return: the write-behind buffer of the storage or None if write-behind is disabled
+        """
+        buffers = self.write_behind
+        if buffers is None:
+            return None
+        buffer = buffers.get(storage)
+        if buffer is None:
+            with self.lock:
+                buffer = buffers.get(storage)
+                if buffer is None:
+                    batch_nodes, batch_seconds, max_pending = self.write_behind_config
+                    write = lambda g: self.write_graph(g, storage)
+                    buffer = WriteBehind(write, storage, batch_nodes, batch_seconds, max_pending)
+                    buffers[storage] = buffer
+        return buffer
+
+
+    def flush(self, storage=None):
+        """ Writes graphs buffered by write-behind now.
+
+        :param storage: the storage to flush.  If None, all storages are flushed.
+        """
+        buffers = self.write_behind
+        if not buffers:
+            return
+        if storage is not None:
+            names = [storage]
+        else:
+            names = list(buffers.keys())
+        for name in names:
+            buffer = buffers.get(name)
+            if buffer is not None:
+                buffer.flush()
+
+
+    def get_write_behind_stats(self):
+        """
+
+        :return: dictionary of write-behind buffer counters keyed by storage name
+        """
+        buffers = self.write_behind
+        if not buffers:
+            return dict()
+        return {name: buffer.stats() for name, buffer in buffers.items()}
 
 
     ## SCORE FUNCTIONS
@@ -498,13 +1755,15 @@ class app():
         :param speed: integer 1-10 speed of enrichment. (1 = fastest)
         :param enabled: Plugin is correctly configured.  If false, plugin may not run correctly.
         :return: list of names of scoring plugins matching the criteria
+
+        NOTE: Matching plugins which are pending (registered but not yet imported) are configured first.
         """
-        cur = self.db.cursor()
 
         plugins = list()
 
+        self.configure_deferred(names if names is not None else [row[0] for row in self.query('''SELECT DISTINCT name FROM score;''')])
         if names is None:
-            for row in cur.execute('''SELECT DISTINCT name
+            for row in self.query('''SELECT DISTINCT name
                                       FROM score
                                       WHERE cost <= ?
                                         AND speed <= ?
@@ -515,7 +1774,7 @@ class app():
                                    ):
                 plugins.append(row[0])
         else:
-            for row in cur.execute('''SELECT DISTINCT name
+            for row in self.query('''SELECT DISTINCT name
                                       FROM score
                                       WHERE cost <= ?
                                         AND speed <= ?
@@ -535,8 +1794,9 @@ class app():
         if plugin_name is None:
             plugin_name=self.score
 
-        score_plugin = self.plugins.getPluginByName(plugin_name)
-        return score_plugin.plugin_object.score(sg, topic)
+        score_plugin = self.get_plugin(plugin_name)
+        with tracing.span("score_subgraph", plugin=plugin_name, nodes=sg.number_of_nodes(), edges=sg.number_of_edges()):
+            return self.timed("score", plugin_name, "score", score_plugin.plugin_object.score, sg, topic, size=sg)
 
 
     def set_scoring_plugin(self, plugin):
@@ -545,9 +1805,8 @@ class app():
         :param interface: The name of the plugin to use for storage.
         Sets the storage backend to use.  It must have been configured through a plugin prior to setting.
         """
-        cur = self.db.cursor()
         configured_scoring_plugins = list()
-        for row in cur.execute('''SELECT DISTINCT name FROM score WHERE configured=1;'''):
+        for row in self.query('''SELECT DISTINCT name FROM score WHERE configured=1;'''):
             configured_scoring_plugins.append(row[0])
         if plugin in configured_scoring_plugins:
             self.score = plugin
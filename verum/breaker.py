@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Per-call timeouts and circuit breakers for the enrichment plugins.
+
+ NOTES:
+ A breaker is closed (calls run) until FAILURES calls in a row fail or time out.  Then it opens and calls are
+  skipped, raising BreakerOpen straight away, for COOLDOWN seconds.  After the cool-down it's half open: one trial
+  call runs.  If it succeeds the breaker closes; if it fails the breaker opens for another cool-down.
+ call_with_timeout() runs the call on its own thread and stops waiting for it after the timeout.  Python can't
+  interrupt a thread, so a hung call keeps its thread (and whatever it was passed to release, e.g. its plugin slot)
+  until it returns and its result is thrown away.  The breaker keeps hung calls from piling up, as once it opens no
+  new calls are started, and no more than MAX_ABANDONED timed out calls are left running at once.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+FAILURES = 5  # Failed calls in a row which open a breaker
+COOLDOWN = 60  # Seconds an open breaker skips calls before a trial call
+MAX_ABANDONED = 32  # Timed out calls which may be left running at once.  Further calls with a timeout are refused.
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import threading
+import Queue
+import sys
+import time
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+abandoned = 0  # Timed out calls still running
+abandoned_lock = threading.Lock()
+delegates = dict()  # Thread running a call_with_timeout() call, keyed by the ident of the thread waiting on it
+
+
+## EXECUTION
+class BreakerOpen(ValueError):
+    """ Raised in place of calling a plugin whose circuit breaker is open """
+    pass
+
+
+class CallTimeout(ValueError):
+    """ Raised when a plugin call doesn't return within its timeout """
+    pass
+
+
+class CallRefused(ValueError):
+    """ Raised in place of starting a call with a timeout while too many timed out calls are still running """
+    pass
+
+
+class CircuitBreaker():
+    failures = FAILURES  # Failed calls in a row which open the breaker
+    cooldown = COOLDOWN  # Seconds the breaker stays open
+    state = CLOSED
+    consecutive = 0  # Failed calls in a row
+    opened_at = None  # time.time() the breaker last opened
+    trial = False  # A half open trial call is running
+    lock = None
+    opened = 0  # Times the breaker opened
+    skipped = 0  # Calls skipped while open
+    failed = 0  # Calls which failed (including timeouts)
+    timeouts = 0  # Calls which timed out
+
+    def __init__(self, failures=FAILURES, cooldown=COOLDOWN):
+        """
+
+        :param failures: failed calls in a row which open the breaker
+        :param cooldown: seconds the breaker skips calls once open
+        """
+        if failures < 1:
+            raise ValueError("A breaker must allow at least 1 failure, not {0}.".format(failures))
+        self.failures = failures
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+
+
+    def allow(self):
+        """
+
+        :return: True if a call may run.  False (and the call is counted as skipped) if the breaker is open or its
+                  half open trial call is still running.
+        """
+        with self.lock:
+            if self.state == OPEN and time.time() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self.trial = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self.trial:
+                self.trial = True
+                return True
+            self.skipped += 1
+            return False
+
+
+    def is_open(self):
+        """
+
+        :return: True if calls would be skipped now (without counting a skip or starting a trial call)
+        """
+        with self.lock:
+            return self.state == OPEN and time.time() - self.opened_at < self.cooldown
+
+
+    def success(self):
+        with self.lock:
+            self.consecutive = 0
+            self.state = CLOSED
+            self.trial = False
+
+
+    def cancel(self):
+        """ Ends a call which neither succeeded nor failed (e.g. the caller ran out of time) so a half open breaker
+             can try another call.
+        """
+        with self.lock:
+            self.trial = False
+
+
+    def failure(self, timeout=False):
+        """
+
+        :param timeout: True if the call timed out rather than raised
+        """
+        with self.lock:
+            self.failed += 1
+            if timeout:
+                self.timeouts += 1
+            self.consecutive += 1
+            if self.state == HALF_OPEN or self.consecutive >= self.failures:
+                if self.state != OPEN:
+                    self.opened += 1
+                self.state = OPEN
+                self.opened_at = time.time()
+                self.trial = False
+
+
+    def stats(self):
+        with self.lock:
+            return {
+                'state': self.state,
+                'open': int(self.state == OPEN),
+                'consecutive_failures': self.consecutive,
+                'opened': self.opened,
+                'skipped': self.skipped,
+                'failed': self.failed,
+                'timeouts': self.timeouts
+            }
+
+
+def call_with_timeout(timeout, fn, args=(), kwargs=None, release=None):
+    """
+
+    :param timeout: seconds to wait for fn to return
+    :param fn: the function to call
+    :param args: positional arguments to fn
+    :param kwargs: keyword arguments to fn
+    :param release: called once fn is done with whatever it holds (e.g. a plugin slot).  Straight away if fn returns
+                     in time or the call is refused; otherwise on fn's thread when the abandoned call finally returns.
+    :return: what fn returns.  Exceptions fn raises are re-raised.
+    :raises CallTimeout: if fn doesn't return within the timeout.  It's left running on its own thread.
+    :raises CallRefused: if MAX_ABANDONED timed out calls are still running.  fn isn't called.
+    """
+    global abandoned
+    if kwargs is None:
+        kwargs = {}
+    with abandoned_lock:
+        refused = abandoned >= MAX_ABANDONED
+    if refused:
+        if release is not None:
+            release()
+        raise CallRefused("{0} timed out calls are still running.".format(MAX_ABANDONED))
+    result = Queue.Queue(1)
+    state = {'abandoned': False}
+    state_lock = threading.Lock()
+
+    def target():
+        try:
+            result.put((True, run_delegated(fn, args, kwargs)))
+        except Exception:
+            result.put((False, sys.exc_info()))
+        with state_lock:
+            state['done'] = True
+            was_abandoned = state['abandoned']
+        if was_abandoned:
+            global abandoned
+            with abandoned_lock:
+                abandoned -= 1
+            if release is not None:
+                release()
+
+    caller = threading.current_thread().ident
+    thread = threading.Thread(target=target, name="verum-call-{0}".format(getattr(fn, "__name__", "plugin")))
+    thread.daemon = True
+    thread.start()
+    delegates[caller] = thread
+    try:
+        ok, value = result.get(timeout=timeout)
+    except Queue.Empty:
+        with state_lock:
+            finished = state.get('done', False)
+            if not finished:
+                state['abandoned'] = True
+                with abandoned_lock:
+                    abandoned += 1
+        if finished:  # Returned just as the wait ran out
+            ok, value = result.get()
+        else:
+            raise CallTimeout("Call did not return within {0} seconds.".format(timeout))
+    finally:
+        delegates.pop(caller, None)
+    if release is not None:
+        release()
+    if ok:
+        return value
+    raise value[0], value[1], value[2]
+
+
+def run_delegated(fn, args, kwargs):
+    """ The bottom of a call_with_timeout() thread's stack.  StackSampler splices what's above it into the waiting
+         thread's stack.
+    """
+    return fn(*args, **kwargs)
+
+
+def abandoned_calls():
+    """
+
+    :return: the number of timed out calls still running
+    """
+    with abandoned_lock:
+        return abandoned
@@ -0,0 +1,424 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: networkx
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Caches of enrichment results so repeated topics don't have to be re-enriched, and of storage query results so
+  repeated queries don't have to go to the storage.
+
+ NOTES:
+ Graphs are stored pickled so that callers modifying a returned graph (e.g. remove_non_ascii_from_graph())
+  can't change the cached copy.
+ Unpickling runs code named in the data, so the sqlite file of the disk tier must be writable only by the user
+  Verum runs as.  Anyone able to write it can run code in Verum's process.
+ Misses (enrichments which return a graph with no edges, such as a DNS name that doesn't resolve) and failures
+  (enrichments which raise) are cached as well, but with shorter TTLs, so known-bad inputs aren't retried
+  at full cost every time they're seen.
+ Query results are invalidated by generation rather than by TTL.  Each storage has a generation counter which is
+  bumped whenever a graph is written to it.  Results cached under an older generation are stale and dropped when
+  next looked up.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+CACHE_SIZE = 10000  # Maximum enrichment results held in memory
+CACHE_TTL = 86400  # Default seconds an enrichment result stays valid
+MISS_TTL = 3600  # Default seconds an enrichment miss (no edges returned) stays valid
+FAILURE_TTL = 600  # Default seconds an enrichment failure (exception raised) stays valid
+QUERY_CACHE_BYTES = 64 * 1024 * 1024  # Memory budget of cached query results (measured as pickled bytes)
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import logging
+import threading
+import sqlite3
+import cPickle as pickle
+import json
+import time
+from collections import OrderedDict
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+
+## EXECUTION
+class CachedFailure(ValueError):
+    """ Raised in place of running an enrichment which recently failed on the same topic """
+    pass
+
+
+class EnrichmentCache():
+    size = None  # Maximum entries in the memory tier
+    ttl = None  # Default time to live in seconds
+    ttls = None  # Time to live per plugin name.  A TTL of 0 disables caching for the plugin.
+    miss_ttl = None  # Default time to live of misses
+    miss_ttls = None  # Time to live of misses per plugin name
+    failure_ttl = None  # Default time to live of failures
+    failure_ttls = None  # Time to live of failures per plugin name
+    memory = None  # LRU ordered dictionary of key -> (expiration, pickled (kind, graph or error))
+    db = None  # sqlite connection of the disk tier (None if no disk tier)
+    lock = None  # Guards the tiers and counters
+    hits = 0
+    misses = 0
+    memory_hits = 0
+    disk_hits = 0
+    evictions = 0
+    plugin_counts = None  # Per plugin counters of hits, misses, negative hits and failures
+
+    def __init__(self, size=CACHE_SIZE, ttl=CACHE_TTL, path=None, miss_ttl=MISS_TTL, failure_ttl=FAILURE_TTL):
+        """
+
+        :param size: maximum number of enrichment results held in memory
+        :param ttl: default seconds an enrichment result stays valid
+        :param path: file for the sqlite disk tier.  If None, only the memory tier is used.
+        :param miss_ttl: default seconds an enrichment miss stays valid
+        :param failure_ttl: default seconds an enrichment failure stays valid
+        """
+        self.size = int(size)
+        self.ttl = float(ttl)
+        self.ttls = dict()
+        self.miss_ttl = float(miss_ttl)
+        self.miss_ttls = dict()
+        self.failure_ttl = float(failure_ttl)
+        self.failure_ttls = dict()
+        self.plugin_counts = dict()
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        if path:
+            self.db = sqlite3.connect(path, check_same_thread=False)  # access is serialized by self.lock
+            self.db.execute('''CREATE TABLE IF NOT EXISTS enrichment_cache (key text NOT NULL PRIMARY KEY,
+                                                                           expires real,
+                                                                           graph blob);''')
+            self.db.commit()
+
+
+    def key(self, plugin, topic, topic_type):
+        """
+
+        :return: a string key for the enrichment result or None if the topic can't be used as a key
+        """
+        if type(topic) in (list, set, tuple, frozenset):
+            topic = sorted(topic)
+        try:
+            return json.dumps([plugin, topic, topic_type])
+        except (TypeError, ValueError):
+            return None
+
+
+    def get_ttl(self, plugin, kind="graph"):
+        """
+
+        :param plugin: name of the enrichment plugin
+        :param kind: "graph", "miss", or "failure"
+        :return: seconds an entry of that kind stays valid for the plugin
+        """
+        if kind == "miss":
+            return float(self.miss_ttls.get(plugin, self.miss_ttl))
+        elif kind == "failure":
+            return float(self.failure_ttls.get(plugin, self.failure_ttl))
+        return float(self.ttls.get(plugin, self.ttl))
+
+
+    def count(self, plugin, counter):
+        """ Increments a per plugin counter.  Caller holds the lock. """
+        counts = self.plugin_counts.setdefault(plugin, {'hits': 0, 'misses': 0, 'negative_hits': 0,
+                                                        'failure_hits': 0, 'failures': 0})
+        counts[counter] += 1
+
+
+    def get(self, plugin, topic, topic_type):
+        """
+
+        :param plugin: name of the enrichment plugin
+        :param topic: the topic enriched
+        :param topic_type: type of the topic (e.g. "ip", "domain")
+        :return: the cached networkx graph or None if not cached or expired
+        :raises CachedFailure: if the enrichment recently failed on the topic
+        """
+        key = self.key(plugin, topic, topic_type)
+        if key is None:
+            return None
+        now = time.time()
+        with self.lock:
+            entry = self.memory.pop(key, None)
+            if entry is not None and entry[0] > now:
+                self.memory[key] = entry  # Re-insert as most recently used
+                self.memory_hits += 1
+            else:
+                entry = None
+                if self.db is not None:
+                    row = self.db.execute('''SELECT expires, graph FROM enrichment_cache WHERE key = ?;''', (key,)).fetchone()
+                    if row is not None and row[0] > now:
+                        entry = (row[0], str(row[1]))
+                        self.remember(key, entry)
+                        self.disk_hits += 1
+                    elif row is not None:
+                        self.db.execute('''DELETE FROM enrichment_cache WHERE key = ?;''', (key,))
+                        self.db.commit()
+
+            if entry is None:
+                self.misses += 1
+                self.count(plugin, 'misses')
+                return None
+
+            self.hits += 1
+            self.count(plugin, 'hits')
+            kind, value = pickle.loads(entry[1])
+            if kind == "miss":
+                self.count(plugin, 'negative_hits')
+            elif kind == "failure":
+                self.count(plugin, 'failure_hits')
+
+        if kind == "failure":
+            raise CachedFailure("{0} recently failed on {1} with error: {2}".format(plugin, topic, value))
+        return value
+
+
+    def put(self, plugin, topic, topic_type, g, ttl=None):
+        """
+
+        :param plugin: name of the enrichment plugin
+        :param topic: the topic enriched
+        :param topic_type: type of the topic (e.g. "ip", "domain")
+        :param g: networkx graph returned by the enrichment.  A graph with no edges is cached as a miss.
+        :param ttl: seconds the result is valid.  Defaults to the plugin's TTL for the kind of result.
+        """
+        if g.number_of_edges() == 0:
+            self.store(plugin, topic, topic_type, "miss", g, ttl)
+        else:
+            self.store(plugin, topic, topic_type, "graph", g, ttl)
+
+
+    def put_failure(self, plugin, topic, topic_type, error, ttl=None):
+        """
+
+        :param plugin: name of the enrichment plugin
+        :param topic: the topic enriched
+        :param topic_type: type of the topic (e.g. "ip", "domain")
+        :param error: the exception raised by the enrichment
+        :param ttl: seconds to skip the enrichment.  Defaults to the plugin's failure TTL.
+        """
+        with self.lock:
+            self.count(plugin, 'failures')
+        self.store(plugin, topic, topic_type, "failure", repr(error), ttl)
+
+
+    def store(self, plugin, topic, topic_type, kind, value, ttl=None):
+        if ttl is None:
+            ttl = self.get_ttl(plugin, kind)
+        key = self.key(plugin, topic, topic_type)
+        if key is None or ttl <= 0:
+            return
+        entry = (time.time() + ttl, pickle.dumps((kind, value), pickle.HIGHEST_PROTOCOL))
+        with self.lock:
+            self.remember(key, entry)
+            if self.db is not None:
+                self.db.execute('''INSERT OR REPLACE INTO enrichment_cache VALUES (?, ?, ?);''',
+                                (key, entry[0], sqlite3.Binary(entry[1])))
+                self.db.commit()
+
+
+    def remember(self, key, entry):
+        """ Adds an entry to the memory tier, evicting the least recently used entries.  Caller holds the lock. """
+        self.memory.pop(key, None)
+        self.memory[key] = entry
+        while len(self.memory) > self.size:
+            self.memory.popitem(last=False)
+            self.evictions += 1
+
+
+    def purge(self):
+        """
+
+        Removes expired entries from both tiers.
+        """
+        now = time.time()
+        with self.lock:
+            for key in [k for k, v in self.memory.iteritems() if v[0] <= now]:
+                del self.memory[key]
+            if self.db is not None:
+                self.db.execute('''DELETE FROM enrichment_cache WHERE expires <= ?;''', (now,))
+                self.db.commit()
+
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            if self.db is not None:
+                self.db.execute('''DELETE FROM enrichment_cache;''')
+                self.db.commit()
+
+
+    def stats(self):
+        """
+
+        :return: dictionary of cache counters
+        """
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'memory_entries': len(self.memory),
+                'plugins': {plugin: dict(counts) for plugin, counts in self.plugin_counts.iteritems()}
+            }
+
+
+class QueryCache():
+    max_bytes = None  # Memory budget of the cached results
+    bytes = 0  # Size of the cached results
+    memory = None  # LRU ordered dictionary of key -> (storage generation, pickled graph)
+    generations = None  # Storage name -> generation
+    lock = None  # Guards the entries, generations, and counters
+    hits = 0
+    misses = 0
+    stale = 0  # Lookups which found a result from an older generation
+    evictions = 0
+
+    def __init__(self, max_bytes=QUERY_CACHE_BYTES):
+        """
+
+        :param max_bytes: memory budget of the cached results, measured as pickled bytes
+        """
+        self.max_bytes = int(max_bytes)
+        self.memory = OrderedDict()
+        self.generations = dict()
+        self.lock = threading.Lock()
+
+
+    def key(self, topic, max_depth, dont_follow, storage):
+        """
+
+        :param topic: the networkx graph (or topic node URI) queried
+        :return: a key for the query or None if the query can't be cached
+        """
+        if hasattr(topic, "nodes"):
+            topic = tuple(sorted(topic.nodes()))
+        elif isinstance(topic, basestring):
+            topic = (topic,)
+        else:
+            return None
+        if dont_follow is not None:
+            dont_follow = tuple(sorted(dont_follow))
+        return (storage, topic, max_depth, dont_follow)
+
+
+    def generation(self, storage):
+        """
+
+        :param storage: name of the storage plugin
+        :return: the storage's current generation.  Take this before querying and pass it to put().
+        """
+        return self.generations.get(storage, 0)
+
+
+    def bump(self, storage):
+        """ Invalidates the storage's cached results.
+
+        :param storage: name of the storage plugin written to
+        """
+        with self.lock:
+            self.generations[storage] = self.generations.get(storage, 0) + 1
+
+
+    def get(self, key):
+        """
+
+        :param key: the query's key from key()
+        :return: the cached networkx graph or None if not cached or stale
+        """
+        if key is None:
+            return None
+        with self.lock:
+            entry = self.memory.pop(key, None)
+            if entry is not None and entry[0] != self.generations.get(key[0], 0):
+                self.bytes -= len(entry[1])
+                self.stale += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.memory[key] = entry  # Re-insert as most recently used
+            self.hits += 1
+        return pickle.loads(entry[1])
+
+
+    def put(self, key, g, generation):
+        """
+
+        :param key: the query's key from key()
+        :param g: the networkx graph the query returned
+        :param generation: the storage's generation from generation() taken before the query ran.  If the storage
+                            was written to during the query, the result is already stale and isn't cached.
+        """
+        if key is None or g is None:
+            return
+        blob = pickle.dumps(g, pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        with self.lock:
+            if generation != self.generations.get(key[0], 0):
+                return
+            old = self.memory.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old[1])
+            self.memory[key] = (generation, blob)
+            self.bytes += len(blob)
+            while self.bytes > self.max_bytes:
+                _, evicted = self.memory.popitem(last=False)
+                self.bytes -= len(evicted[1])
+                self.evictions += 1
+
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            self.bytes = 0
+
+
+    def stats(self):
+        """
+
+        :return: dictionary of cache counters
+        """
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'entries': len(self.memory),
+                'bytes': self.bytes,
+                'generations': dict(self.generations)
+            }
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ A small thread pool used by the app to run enrichment plugins concurrently.
+
+ NOTES:
+ Jobs report (tag, result, error) tuples to a results queue supplied by the caller so that
+  each caller can collect its own results as they finish.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+WORKERS = 8  # Default number of worker threads
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import logging
+import threading
+import Queue
+import time
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+
+## EXECUTION
+class WorkerPool():
+    size = None  # The number of worker threads
+    jobs = None  # Queue of jobs waiting for a worker
+    workers = None  # The worker threads
+    lock = None  # Guards starting the workers
+
+    def __init__(self, size=WORKERS):
+        self.size = max(1, int(size))
+        self.jobs = Queue.Queue()
+        self.workers = list()
+        self.lock = threading.Lock()
+
+
+    def start(self):
+        """
+
+        Starts the worker threads.  Called automatically by submit().
+        """
+        with self.lock:
+            while len(self.workers) < self.size:
+                t = threading.Thread(target=self.work, name="verum-worker-{0}".format(len(self.workers)))
+                t.daemon = True  # Workers must not keep the interpreter alive
+                t.start()
+                self.workers.append(t)
+
+
+    def submit(self, results, tag, fn, *args, **kwargs):
+        """
+
+        :param results: a Queue.Queue to put (tag, result, error) on when the job finishes
+        :param tag: a value identifying the job to the caller
+        :param fn: the function to run.  Remaining arguments are passed to it.
+        """
+        if len(self.workers) < self.size:
+            self.start()
+        self.jobs.put((results, tag, fn, args, kwargs))
+
+
+    def work(self):
+        while True:
+            results, tag, fn, args, kwargs = self.jobs.get()
+            try:
+                results.put((tag, fn(*args, **kwargs), None))
+            except Exception as e:
+                logging.debug("Job {0} failed with error {1}.".format(tag, e), exc_info=True)
+                results.put((tag, None, e))
+
+
+    def as_completed(self, results, pending, timeout=None, unfinished=None):
+        """ Queue, int or list, float, list -> generator of (tag, result, error) tuples
+
+        :param results: the results queue passed to submit()
+        :param pending: the number of jobs submitted against the queue, or a list of their tags
+        :param timeout: seconds to wait for all jobs.  None waits indefinitely.
+        :param unfinished: an optional list.  If the timeout passes, the tags of the jobs still running are appended
+                            to it.  (pending must be the list of tags.)
+        :return: yields results in the order jobs finish.  Stops early when the timeout passes.
+        """
+        tags = None
+        if not isinstance(pending, (int, long)):
+            tags = list(pending)
+            pending = len(tags)
+        deadline = None
+        if timeout is not None:
+            deadline = time.time() + timeout
+
+        while pending > 0:
+            if deadline is None:
+                item = results.get()
+            else:
+                item = None
+                remaining = deadline - time.time()
+                if remaining > 0:
+                    try:
+                        item = results.get(timeout=remaining)
+                    except Queue.Empty:
+                        pass
+                if item is None:
+                    if unfinished is not None and tags is not None:
+                        unfinished.extend(tags)
+                    return
+            pending -= 1
+            if tags is not None and item[0] in tags:
+                tags.remove(item[0])
+            yield item
@@ -57,11 +57,35 @@ import ConfigParser
 import networkx as nx
 import urlparse
 import numpy as np
-from scipy import stats  # for percentile
+import sys
+import imp
+import os
 
 ## SETUP
 __author__ = "Gabriel Bassett"
 
+def load_shared(name):
+    """ Loads a module of the verum directory for plugins and modules loaded by location, which can't rely on a
+         relative import.  The copy already loaded by the app (verum.<name>) or an earlier caller (verum_<name>) is
+         reused so module state (e.g. the uri memos or the tracer) is shared.
+
+    :param name: name of the module in the verum directory (e.g. "uri", "timeutil")
+    :return: the module
+    """
+    module = sys.modules.get("verum." + name, sys.modules.get("verum_" + name))
+    if module is None:
+        fp, pathname, description = imp.find_module(name, [os.path.dirname(os.path.abspath(__file__))])
+        try:
+            module = imp.load_module("verum_" + name, fp, pathname, description)
+        finally:
+            if fp is not None:
+                fp.close()
+    return module
+
+# Shared time normalization and sanitization
+timeutil = load_shared("timeutil")
+sanitize = load_shared("sanitize")
+
 if __name__ == "__main__":
     # Parse Arguments (should correspond to user variables)
     parser = argparse.ArgumentParser(description='This script processes a graph.')
@@ -281,6 +305,8 @@ def score_percentile(scores, node, output="print"):
     :param output: string representing how to output the data.  "print" to print it, dictionary otherwise
     :return: the percentile the node is in.  Higher means more likely.ff
     """
+    from scipy import stats  # for percentile.  Imported here as scipy is slow to import and rarely needed.
+
     node_uri = "class={0}&key={1}&value={2}".format(node['class'], node['key'], node['value'])
 
     p =stats.percentileofscore(scores.values(), scores[node_uri])
@@ -292,51 +318,150 @@ def score_percentile(scores, node, output="print"):
 
 
 def merge_graphs(g1, g2):
-    """
+    """ networkx graph, networkx graph -> networkx graph
 
+    :return: a copy of g1 with g2 merged into it
+
+    NOTE: Copies g1.  When merging many graphs, use a GraphAccumulator instead.
     """
     g = g1.copy()
-    for node, props in g2.nodes(data=True):
-        g.add_node(node, props)
-    for edge in g2.edges(data=True):
-        g.add_edge(edge[0], edge[1], attr_dict=edge[2])
+    merge_graph_into(g, g2)
 
     return g
 
 
-def removeNonAscii(s): return u"".join(i for i in s if ord(i)<128).encode('utf8')
+def merge_graph_into(g, fragment, fold_times=True):
+    """ networkx graph, networkx graph, bool -> NoneType
+
+    :param g: networkx graph to merge into.  (Modified in place.)
+    :param fragment: networkx graph to merge in
+    :param fold_times: If true, an edge already in g keeps the earliest start_time and latest finish_time of the
+                        two edges.  Otherwise the fragment's times replace g's.
+    Nodes are deduplicated by URI (their ID) with the fragment's properties replacing existing ones.  Edges are
+     upserted by edge URI (their 'uri' property or, as the plugins create them, their key) so the same fact
+     enriched twice stays a single edge.  A simple graph g holds one edge per node pair, so its edges are upserted
+     by node pair.
+    """
+    for node, props in fragment.nodes_iter(data=True):
+        g.add_node(node, props)
+    if fragment.is_multigraph():
+        edges = fragment.edges_iter(data=True, keys=True)
+    else:
+        edges = ((src, dst, None, props) for src, dst, props in fragment.edges_iter(data=True))
+    multigraph = g.is_multigraph()
+    for src, dst, key, props in edges:
+        if not multigraph:  # e.g. a topic graph from create_topic().  One edge per node pair.
+            if fold_times and g.has_edge(src, dst):
+                fold_edge(g.edge[src][dst], props)
+            else:
+                g.add_edge(src, dst, attr_dict=props)
+            continue
+        uri = props.get("uri", key if isinstance(key, basestring) else None)
+        if fold_times and uri is not None and g.has_edge(src, dst, uri):
+            fold_edge(g.edge[src][dst][uri], props)
+        else:
+            g.add_edge(src, dst, uri, props)  # A key of None adds a new edge
 
 
-def remove_non_ascii_from_graph(g):
-    """ networkx graph -> networkx graph
+def fold_edge(existing, props):
+    """ dict, dict -> NoneType
 
-    :param g: A networkx graph
-    :return: a networkx graph with nonAscii removed from all node and edge attributes
+    :param existing: the properties of an edge already in a graph.  (Modified in place.)
+    :param props: the properties of the same edge being merged in.  They replace the existing ones except that the
+                   earliest start_time and latest finish_time are kept.
     """
-    # ascii safe node key and value
-    for node, data in g.nodes(data=True):
-        for attr in data.keys():
-            data[attr] = removeNonAscii(data[attr])
-        g.node[node] = data
-
-    if type(g) in [nx.classes.multidigraph.MultiDiGraph, nx.classes.multigraph.MultiGraph]:
-        for edge in g.edges(data=True, keys=True):
-            edge_attr = edge[3]
-            for attr in edge_attr:
-                if type(edge_attr[attr]) is str:
-                    edge_attr[attr] = removeNonAscii(edge_attr[attr])
-            g.edge[edge[0]][edge[1]][edge[2]] = edge_attr
-    else:
-        for edge in g.edges(data=True):
-            edge_attr = edge[2]
-            for attr in edge_attr:
-                if type(edge_attr[attr]) is str:
-                    edge_attr[attr] = removeNonAscii(edge_attr[attr])
-            g.edge[edge[0]][edge[1]] = edge_attr
+    start_time = fold_time(existing.get("start_time"), props.get("start_time"), min)
+    finish_time = fold_time(existing.get("finish_time"), props.get("finish_time"), max)
+    existing.update(props)
+    if start_time is not None:
+        existing["start_time"] = start_time
+    if finish_time is not None:
+        existing["finish_time"] = finish_time
+
+
+def fold_time(t1, t2, fold=min):
+    """ time, time, function -> time
+
+    :param t1: a time (ISO 8601 string as the plugins create them, or datetime) or None
+    :param t2: a time or None
+    :param fold: min for the earliest time or max for the latest
+    :return: the folded time or whichever was given if the other is None
+    """
+    if t1 is None or t1 == "":
+        return t2
+    if t2 is None or t2 == "":
+        return t1
+    e1, e2 = timeutil.to_epoch(t1), timeutil.to_epoch(t2)
+    if e1 is not None and e2 is not None:
+        return t1 if fold(e1, e2) == e1 else t2  # Compare as times but keep the value as given
+    return fold(t1, t2)
+
+
+class GraphAccumulator():
+    """ Merges graphs in place as they are added and returns the merged graph from build().  Replaces chains of
+         g = merge_graphs(g, g2) which copy the accumulated graph on every merge.
+
+        acc = GraphAccumulator()
+        acc.add(app.run_enrichments("www.google.com", "domain"))
+        app.store_graph(acc)  # or acc.build()
+    """
+    graph = None  # The graph accumulated so far.  Read but don't modify it.
+    fold_times = True  # Duplicate edges keep the earliest start_time and latest finish_time
 
+    def __init__(self, g=None, fold_times=True):
+        """
 
-    # return the safed node
-    return g
+        :param g: an optional networkx graph to start from
+        :param fold_times: If true, duplicate edges keep the earliest start_time and latest finish_time.  Otherwise
+                            the last added edge's times are kept.
+        """
+        self.graph = nx.MultiDiGraph()
+        self.fold_times = fold_times
+        if g is not None:
+            self.add(g)
+
+
+    def add(self, fragment):
+        """ networkx graph -> GraphAccumulator
+
+        :param fragment: networkx graph (or GraphAccumulator) to merge in
+        :return: the accumulator so adds can be chained
+        """
+        if isinstance(fragment, GraphAccumulator):
+            fragment = fragment.graph
+        if fragment is not None:
+            merge_graph_into(self.graph, fragment, self.fold_times)
+        return self
+
+
+    def build(self):
+        """ NoneType -> networkx MultiDiGraph
+
+        :return: the merged graph.  The accumulator is emptied so it can be reused.
+        """
+        g = self.graph
+        self.graph = nx.MultiDiGraph()
+        return g
+
+
+def removeNonAscii(s):
+    """ str or unicode -> str
+
+    :param s: a string
+    :return: s with non-ascii characters removed
+    """
+    return sanitize.ascii_only(s)
+
+
+def remove_non_ascii_from_graph(g, domains=True):
+    """ networkx graph -> networkx graph
+
+    :param g: A networkx graph
+    :param domains: If true, also lower case domains and convert internationalized domains to punycode
+    :return: a networkx graph with nonAscii removed from all node and edge attributes.  (A new graph if domain
+              nodes were renamed.  Otherwise g.)
+    """
+    return sanitize.sanitize_graph(g, domains)
 
 ## MAIN LOOP EXECUTION
 def main():
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Timing and throughput metrics of the enrichment, storage, and scoring plugins.
+
+ NOTES:
+ Each (kind, plugin, operation) series (e.g. ("enrichment", "DNS Enrichment", "run")) counts calls, errors, and
+  calls answered from a cache, keeps a latency histogram, and totals the nodes and edges of the graphs returned.
+ prometheus() renders the metrics in the Prometheus text exposition format so they can be served to a scraper
+  (e.g. from a minion or a small HTTP handler).
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]  # Latency histogram bounds in seconds
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import threading
+import bisect
+import re
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+NAME_CHARS = re.compile("[^a-zA-Z0-9_:]")  # Characters not allowed in Prometheus metric names
+
+
+## EXECUTION
+class Histogram():
+    bounds = None  # Upper bounds of the buckets.  A final bucket holds everything larger.
+    counts = None  # Observations per bucket (not cumulative)
+    sum = 0.0
+    count = 0
+    max = 0.0
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = sorted(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+
+    def quantile(self, q):
+        """
+
+        :param q: quantile between 0 and 1 (e.g. 0.95)
+        :return: the upper bound of the bucket holding the quantile.  (The largest value seen for the last bucket.)
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c > 0:
+                if i < len(self.bounds):
+                    return min(self.bounds[i], self.max)
+                return self.max
+        return self.max
+
+
+    def snapshot(self):
+        cumulative = list()
+        seen = 0
+        for c in self.counts:
+            seen += c
+            cumulative.append(seen)
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else None,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': zip(self.bounds + [float("inf")], cumulative)
+        }
+
+
+class Series():
+    calls = 0
+    errors = 0
+    cached = 0  # Calls answered from a cache rather than the plugin
+    nodes = 0  # Nodes of the graphs returned
+    edges = 0  # Edges of the graphs returned
+    latency = None  # Histogram of seconds per call
+
+    def __init__(self):
+        self.latency = Histogram()
+
+
+class Metrics():
+    series = None  # (kind, plugin, operation) -> Series
+    lock = None  # Guards the series
+
+    def __init__(self):
+        self.series = dict()
+        self.lock = threading.Lock()
+
+
+    def get_series(self, kind, plugin, operation):
+        """ Caller holds the lock. """
+        key = (kind, plugin, operation)
+        s = self.series.get(key)
+        if s is None:
+            s = Series()
+            self.series[key] = s
+        return s
+
+
+    def record(self, kind, plugin, operation, seconds, g=None, error=False):
+        """
+
+        :param kind: the kind of plugin (e.g. "enrichment", "storage", "score")
+        :param plugin: the plugin name
+        :param operation: what the plugin did (e.g. "run", "store", "query", "score")
+        :param seconds: how long the call took
+        :param g: the networkx graph the call returned (or was given for writes), for its size
+        :param error: True if the call raised
+        """
+        nodes = edges = 0
+        if g is not None and hasattr(g, "number_of_nodes"):
+            nodes, edges = g.number_of_nodes(), g.number_of_edges()
+        with self.lock:
+            s = self.get_series(kind, plugin, operation)
+            s.calls += 1
+            s.latency.observe(seconds)
+            s.nodes += nodes
+            s.edges += edges
+            if error:
+                s.errors += 1
+
+
+    def record_cached(self, kind, plugin, operation):
+        """ Counts a call answered from a cache. """
+        with self.lock:
+            self.get_series(kind, plugin, operation).cached += 1
+
+
+    def snapshot(self):
+        """
+
+        :return: dictionary of kind -> plugin -> operation -> counters and latency summary
+        """
+        out = dict()
+        with self.lock:
+            for (kind, plugin, operation), s in self.series.iteritems():
+                out.setdefault(kind, {}).setdefault(plugin, {})[operation] = {
+                    'calls': s.calls,
+                    'errors': s.errors,
+                    'cached': s.cached,
+                    'nodes': s.nodes,
+                    'edges': s.edges,
+                    'seconds': s.latency.snapshot()
+                }
+        return out
+
+
+    def reset(self):
+        with self.lock:
+            self.series = dict()
+
+
+    def prometheus(self, extra=None):
+        """
+
+        :param extra: dictionary of name -> dictionary of counters (e.g. {"cache": app.get_cache_stats()}) to also
+                       export.  Numeric values are exported as verum_<name>_<counter>.  See flatten().
+        :return: the metrics in the Prometheus text exposition format
+        """
+        lines = list()
+        snapshot = self.snapshot()
+        rows = list()
+        for kind in sorted(snapshot):
+            for plugin in sorted(snapshot[kind]):
+                for operation in sorted(snapshot[kind][plugin]):
+                    labels = {'kind': kind, 'plugin': plugin, 'operation': operation}
+                    rows.append((labels, snapshot[kind][plugin][operation]))
+
+        for name, field, help_text in [("verum_plugin_calls_total", "calls", "Calls to the plugin."),
+                                       ("verum_plugin_errors_total", "errors", "Calls to the plugin which raised."),
+                                       ("verum_plugin_cached_total", "cached", "Calls answered from a cache."),
+                                       ("verum_plugin_nodes_total", "nodes", "Nodes of the graphs returned or written."),
+                                       ("verum_plugin_edges_total", "edges", "Edges of the graphs returned or written.")]:
+            lines.append("# HELP {0} {1}".format(name, help_text))
+            lines.append("# TYPE {0} counter".format(name))
+            for labels, values in rows:
+                lines.append("{0}{1} {2}".format(name, format_labels(labels), values[field]))
+
+        name = "verum_plugin_seconds"
+        lines.append("# HELP {0} Seconds per call to the plugin.".format(name))
+        lines.append("# TYPE {0} histogram".format(name))
+        for labels, values in rows:
+            seconds = values['seconds']
+            for bound, count in seconds['buckets']:
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append("{0}_bucket{1} {2}".format(name, format_labels(labels, le=le), count))
+            lines.append("{0}_sum{1} {2}".format(name, format_labels(labels), repr(seconds['sum'])))
+            lines.append("{0}_count{1} {2}".format(name, format_labels(labels), seconds['count']))
+
+        if extra:
+            for prefix in sorted(extra):
+                flatten("verum_" + prefix, extra[prefix], dict(), lines)
+
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels, **more):
+    labels = dict(labels, **more)
+    if not labels:
+        return ""
+    parts = list()
+    for k in sorted(labels):
+        v = unicode(labels[k]).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(u'{0}="{1}"'.format(k, v))
+    return u"{" + u",".join(parts) + u"}"
+
+
+def flatten(name, value, labels, lines):
+    """ Appends the numeric values of a (nested) dictionary of counters as Prometheus samples.
+
+    A dictionary whose values are all dictionaries (e.g. counters per plugin) is keyed by name: its keys become a
+     'name' label rather than part of the metric name.
+    """
+    if isinstance(value, bool) or value is None:
+        return
+    if isinstance(value, (int, long, float)):
+        sample = repr(value) if isinstance(value, float) else value
+        lines.append(u"{0}{1} {2}".format(NAME_CHARS.sub("_", name), format_labels(labels), sample))
+    elif isinstance(value, dict) and value and all(isinstance(v, dict) for v in value.values()):
+        for k in sorted(value):
+            flatten(name, value[k], dict(labels, name=k), lines)
+    elif isinstance(value, dict):
+        for k in sorted(value):
+            flatten(u"{0}_{1}".format(name, k), value[k], labels, lines)
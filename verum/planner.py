@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Plans which enrichments to run on a topic, and in what order, to fit a latency or cost budget.
+
+ NOTES:
+ The planner keeps the latest WINDOW latencies of each enrichment and plans with their PERCENTILE percentile.  An
+  enrichment observed fewer than MIN_SAMPLES times is assumed to take SPEED_SECONDS per point of its configured
+  speed (1-10).  Calls which hit their plugin's timeout are observed at the time they were given, so slow plugins
+  are learned even though their true latency is unknown.  Calls cancelled when the caller's budget ran out aren't
+  observed, as a short budget would otherwise make a plugin look slow and keep it out of every later plan.
+ With no value to trade off, the best plan is the one running the most enrichments:
+  - Run in sequence, the budget bounds the sum of the estimates, so enrichments are taken fastest (then cheapest)
+     first while they fit, and run in that order so the most finish if the estimates turn out low.
+  - Run in parallel, the budget bounds each estimate.  Enrichments estimated to finish in time are taken cheapest
+     first while they fit the cost budget, and started slowest first so they overlap the most.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+WINDOW = 100  # Latest latencies kept per enrichment
+MIN_SAMPLES = 5  # Calls observed before an enrichment is planned by its observed latency rather than its speed
+PERCENTILE = 90  # Percentile of the observed latencies an enrichment is planned with
+SPEED_SECONDS = 0.2  # Seconds per point of configured speed assumed of an enrichment not yet observed
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import math
+import threading
+from collections import deque
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+
+## EXECUTION
+class LatencyStats():
+    window = None  # The latest latencies in seconds
+    count = 0  # Calls observed
+
+    def __init__(self, size=WINDOW):
+        self.window = deque(maxlen=size)
+
+
+    def observe(self, seconds):
+        self.window.append(seconds)
+        self.count += 1
+
+
+    def percentile(self, p):
+        """ Nearest rank percentile (p between 0 and 100) of the latencies in the window.  None if empty. """
+        values = sorted(self.window)
+        if not values:
+            return None
+        rank = int(math.ceil(p / 100.0 * len(values))) - 1
+        return values[min(max(rank, 0), len(values) - 1)]
+
+
+class Planner():
+    stats = None  # enrichment name -> LatencyStats
+    lock = None
+    percentile = PERCENTILE
+    min_samples = MIN_SAMPLES
+    speed_seconds = SPEED_SECONDS
+
+    def __init__(self, percentile=PERCENTILE, min_samples=MIN_SAMPLES, speed_seconds=SPEED_SECONDS):
+        """
+
+        :param percentile: percentile of the observed latencies enrichments are planned with
+        :param min_samples: calls observed before an enrichment is planned by its observed latency
+        :param speed_seconds: seconds per point of configured speed assumed of an enrichment not yet observed
+        """
+        self.stats = dict()
+        self.lock = threading.Lock()
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.speed_seconds = speed_seconds
+
+
+    def observe(self, name, seconds):
+        """
+
+        :param name: the name of the enrichment
+        :param seconds: how long a call took
+        """
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = LatencyStats()
+                self.stats[name] = stats
+            stats.observe(seconds)
+
+
+    def estimate(self, name, speed):
+        """
+
+        :param name: the name of the enrichment
+        :param speed: its configured speed (1-10, 1 = fastest)
+        :return: seconds a call to the enrichment is planned to take
+        """
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is not None and len(stats.window) >= self.min_samples:
+                return stats.percentile(self.percentile)
+        return speed * self.speed_seconds
+
+
+    def plan(self, candidates, latency=None, cost=None, parallel=True):
+        """
+
+        :param candidates: list of (name, cost, speed) of the enrichments which could run
+        :param latency: seconds the enrichments may take.  None for no limit.
+        :param cost: total cost of the enrichments run.  None for no limit.
+        :param parallel: If true, plan for the enrichments running concurrently.  Otherwise one after another.
+        :return: list of (name, estimated seconds) of the enrichments to run in the order to start them
+        """
+        estimated = [(name, c, self.estimate(name, s)) for name, c, s in candidates]
+        chosen = list()
+        spent_cost = 0
+        spent_seconds = 0.0
+        if parallel:
+            for name, c, seconds in sorted(estimated, key=lambda e: (e[1], e[2], e[0])):
+                if latency is not None and seconds > latency:
+                    continue
+                if cost is not None and spent_cost + c > cost:
+                    continue
+                spent_cost += c
+                chosen.append((name, seconds))
+            chosen.sort(key=lambda e: e[1], reverse=True)
+        else:
+            for name, c, seconds in sorted(estimated, key=lambda e: (e[2], e[1], e[0])):
+                if latency is not None and spent_seconds + seconds > latency:
+                    continue
+                if cost is not None and spent_cost + c > cost:
+                    continue
+                spent_cost += c
+                spent_seconds += seconds
+                chosen.append((name, seconds))
+        return chosen
+
+
+    def get_stats(self):
+        """
+
+        :return: dictionary of enrichment name -> calls observed and the planned (percentile) and median latency
+        """
+        with self.lock:
+            return {name: {'calls': stats.count,
+                           'planned_seconds': stats.percentile(self.percentile),
+                           'median_seconds': stats.percentile(50)}
+                    for name, stats in self.stats.iteritems()}
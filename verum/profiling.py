@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Samples calls to the enrichment, storage, and scoring plugins with cProfile and saves them as .pstats files, and
+  samples the stacks of long running threads (e.g. minions) into collapsed stacks for flame graphs.
+
+ NOTES:
+ Profiles are written to <directory>/<kind>.<plugin>.<operation>.<UTC time>.pstats (e.g.
+  enrichment.DNS_Enrichment.run.20261018T120000.123456.pstats) and only the newest KEEP files of each plugin
+  operation are kept.  The app profiles the operations "run" of enrichments, "store" and "query" of storage, and
+  "score" of scoring plugins.  Read them with pstats (e.g.
+  pstats.Stats(path).sort_stats("cumulative").print_stats(20)) or snakeviz.  pstats.Stats(*paths) adds several
+  samples together.
+ cProfile only sees the thread it was enabled on, so a profile covers the plugin call itself and not work it hands
+  to other threads.  A call made while another profile is running on the same thread (e.g. a plugin calling back
+  into the app) isn't profiled separately.  It's part of the outer profile.
+ The app only consults the profiler while profiling is enabled, so disabled profiling costs nothing.
+ StackSampler reads the stacks of the threads attached to it from sys._current_frames() every INTERVAL seconds on
+  its own thread.  The sampled threads aren't instrumented, so it can be attached to running minions and left on.
+  Samples are counted per thread label (e.g. the minion name) and exported in the collapsed stack format
+  ("label;outer frame;...;inner frame count" per line) read by flamegraph.pl and speedscope.  A thread waiting in
+  C (e.g. time.sleep() or a socket read) is sampled at the Python frame that called it.  A thread waiting on
+  breaker.call_with_timeout() is sampled as its own stack down to the call followed by the stack of the thread
+  running the call.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+DIRECTORY = "/tmp/verum_profiles"  # Directory .pstats files are written to
+SAMPLE = 0.1  # Fraction of calls profiled
+KEEP = 10  # Profiles kept per plugin operation.  Older ones are deleted.
+INTERVAL = 0.02  # Seconds between stack samples
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import cProfile
+import logging
+import threading
+import random
+import sys
+import time
+import os
+import re
+import breaker
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+FILE_CHARS = re.compile("[^a-zA-Z0-9_-]")  # Characters replaced in plugin names to make file names
+
+
+## EXECUTION
+class Profiler():
+    directory = None  # Directory .pstats files are written to
+    plugins = None  # Set of plugin names profiled.  None to profile all plugins.
+    sample = SAMPLE  # Fraction of calls profiled
+    keep = KEEP  # Profiles kept per plugin operation
+    lock = None  # Guards the counters and rotation
+    local = None  # Per thread flag of a running profile
+    counts = None  # (kind, plugin, operation) -> [calls seen, calls profiled, seconds profiled]
+
+    def __init__(self, directory=DIRECTORY, plugins=None, sample=SAMPLE, keep=KEEP):
+        """
+
+        :param directory: directory to write .pstats files to.  Created if it doesn't exist.
+        :param plugins: list of plugin names to profile.  None to profile all plugins.
+        :param sample: fraction (0 to 1) of calls to profile
+        :param keep: profiles kept per plugin operation.  Older ones are deleted.
+        """
+        if not 0 <= sample <= 1:
+            raise ValueError("Profiling sample must be between 0 and 1, not {0}.".format(sample))
+        if keep < 1:
+            raise ValueError("Profiling must keep at least 1 profile, not {0}.".format(keep))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        if plugins is not None:
+            plugins = set(plugins)
+        self.plugins = plugins
+        self.sample = sample
+        self.keep = keep
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.counts = dict()
+
+
+    def wrap(self, kind, name, operation, fn):
+        """
+
+        :param kind: the kind of plugin (e.g. "enrichment", "storage", "score")
+        :param name: the plugin name
+        :param operation: what the plugin does: "run" for enrichments, "store" or "query" for storage, "score" for
+                           scoring
+        :param fn: the plugin function about to be called
+        :return: fn, profiled if this call is sampled
+        """
+        if self.plugins is not None and name not in self.plugins:
+            return fn
+        key = (kind, name, operation)
+        sampled = random.random() < self.sample and not getattr(self.local, "running", False)
+        with self.lock:
+            counts = self.counts.setdefault(key, [0, 0, 0.0])
+            counts[0] += 1
+        if not sampled:
+            return fn
+
+        def profiled(*args, **kwargs):
+            profile = cProfile.Profile()
+            self.local.running = True
+            start = time.time()
+            try:
+                return profile.runcall(fn, *args, **kwargs)
+            finally:
+                self.local.running = False
+                seconds = time.time() - start
+                with self.lock:
+                    counts[1] += 1
+                    counts[2] += seconds
+                self.save(profile, key)
+        return profiled
+
+
+    def save(self, profile, key):
+        """ Writes a profile and deletes the oldest of its plugin operation beyond keep. """
+        prefix = ".".join(FILE_CHARS.sub("_", k) for k in key) + "."
+        now = time.time()
+        path = os.path.join(self.directory, "{0}{1}.{2:06d}.pstats".format(
+            prefix, time.strftime("%Y%m%dT%H%M%S", time.gmtime(now)), int(now % 1 * 1000000)))
+        try:
+            profile.dump_stats(path)
+        except (IOError, OSError) as e:
+            logging.warning("Could not write profile {0} due to {1}.".format(path, e))
+            return
+        with self.lock:
+            # The names sort by time.  (The digit check skips another operation whose name starts with this one's.)
+            names = sorted(f for f in os.listdir(self.directory)
+                           if f.startswith(prefix) and f.endswith(".pstats") and f[len(prefix):len(prefix) + 1].isdigit())
+            for old in names[:-self.keep]:
+                try:
+                    os.remove(os.path.join(self.directory, old))
+                except OSError as e:
+                    logging.debug("Could not remove old profile {0} due to {1}.".format(old, e))
+
+
+    def stats(self):
+        """
+
+        :return: dictionary of kind -> plugin -> operation -> {'calls', 'profiled', 'seconds'} of the calls seen
+        """
+        out = dict()
+        with self.lock:
+            for (kind, name, operation), (calls, profiled, seconds) in self.counts.iteritems():
+                out.setdefault(kind, dict()).setdefault(name, dict())[operation] = {
+                    'calls': calls,
+                    'profiled': profiled,
+                    'seconds': seconds
+                }
+        return out
+
+
+class StackSampler():
+    interval = INTERVAL  # Seconds between samples
+    lines = False  # Include line numbers in the frames (splits a function's samples by line)
+    threads = None  # label -> threading.Thread sampled
+    samples = None  # label -> collapsed stack -> samples
+    ticks = 0  # Times the stacks were sampled
+    lock = None  # Guards threads and samples
+    thread = None  # The sampling thread
+    running = False
+
+    def __init__(self, interval=INTERVAL, lines=False):
+        """
+
+        :param interval: seconds between samples
+        :param lines: If true, frames include line numbers
+        """
+        if interval <= 0:
+            raise ValueError("Sampling interval must be positive, not {0}.".format(interval))
+        self.interval = interval
+        self.lines = lines
+        self.threads = dict()
+        self.samples = dict()
+        self.lock = threading.Lock()
+
+
+    def attach(self, label, thread):
+        """
+
+        :param label: the label the thread's samples are counted under (e.g. the minion name)
+        :param thread: a threading.Thread to sample
+        """
+        with self.lock:
+            self.threads[label] = thread
+
+
+    def detach(self, label):
+        """ Stops sampling the thread.  Its samples are kept. """
+        with self.lock:
+            self.threads.pop(label, None)
+
+
+    def start(self):
+        """ Samples on a background thread until stop().  Returns the sampler. """
+        if self.thread is not None and self.thread.isAlive():
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="verum-stack-sampler")
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(10 * self.interval + 1)
+        self.thread = None
+
+
+    def run(self):
+        while self.running:
+            start = time.time()
+            try:
+                self.sample()
+            except Exception as e:
+                logging.warning("Stack sample failed due to {0}.".format(e))
+            time.sleep(max(self.interval - (time.time() - start), 0))
+
+
+    def sample(self):
+        """ Counts the current stack of each attached thread once. """
+        with self.lock:
+            targets = [(label, t.ident) for label, t in self.threads.iteritems() if t is not None and t.isAlive()]
+        frames = sys._current_frames()
+        stacks = list()
+        for label, ident in targets:
+            frame = frames.get(ident)
+            if frame is not None:
+                # A thread waiting on a call with a timeout is sampled at the call, on the thread running it
+                helper = breaker.delegates.get(ident)
+                stacks.append((label, self.collapse(frame, frames.get(helper.ident) if helper is not None else None)))
+        del frames
+        with self.lock:
+            self.ticks += 1
+            for label, stack in stacks:
+                counts = self.samples.setdefault(label, dict())
+                counts[stack] = counts.get(stack, 0) + 1
+
+
+    def collapse(self, frame, delegate=None):
+        """
+
+        :param frame: the innermost frame of a stack
+        :param delegate: the innermost frame of the thread running the stack's call_with_timeout() call, if any
+        :return: the stack from the outermost frame in, e.g. "alexa_1M:minion;app:store_graph"
+        """
+        frames = self.frames(frame)
+        if delegate is not None:
+            waiting = [i for i, f in enumerate(frames) if f.f_code is breaker.call_with_timeout.__code__]
+            running = [i for i, f in enumerate(self.frames(delegate)) if f.f_code is breaker.run_delegated.__code__]
+            if waiting and running:
+                frames = frames[:waiting[-1] + 1] + self.frames(delegate)[running[0] + 1:]
+        names = list()
+        for f in frames:
+            code = f.f_code
+            module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            if self.lines:
+                names.append("{0}:{1}:{2}".format(module, code.co_name, f.f_lineno))
+            else:
+                names.append("{0}:{1}".format(module, code.co_name))
+        return ";".join(n.replace(";", ":") for n in names)
+
+
+    def frames(self, frame):
+        """
+
+        :param frame: the innermost frame of a stack
+        :return: list of the stack's frames from the outermost in
+        """
+        frames = list()
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()
+        return frames
+
+
+    def get_samples(self, labels=None):
+        """
+
+        :param labels: list of labels to return.  None for all.
+        :return: dictionary of label -> collapsed stack -> samples
+        """
+        with self.lock:
+            return {label: dict(counts) for label, counts in self.samples.iteritems()
+                    if labels is None or label in labels}
+
+
+    def collapsed(self, labels=None):
+        """
+
+        :param labels: list of labels to export.  None for all.
+        :return: the samples in the collapsed stack format, one "label;frame;...;frame count" line per stack
+        """
+        out = list()
+        for label, counts in sorted(self.get_samples(labels).iteritems()):
+            for stack, count in sorted(counts.iteritems()):
+                out.append("{0};{1} {2}".format(label.replace(";", ":"), stack, count))
+        return "\n".join(out) + ("\n" if out else "")
+
+
+    def reset(self):
+        with self.lock:
+            self.samples = dict()
+            self.ticks = 0
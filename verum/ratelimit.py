@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Token bucket rate limits of the external services the enrichment plugins query.
+
+ NOTES:
+ Each service (e.g. whois.cymru.com) has one bucket shared by every plugin and app in the process that names it.  A
+  bucket holds up to 'burst' tokens and refills at 'rate' tokens per second.  Each enrichment call takes a token.
+ When the bucket is empty, acquire() reserves the next token and sleeps until it refills rather than failing, so
+  callers queue in the order they arrived and the service sees at most 'rate' requests per second (after an initial
+  burst) no matter how many threads are enriching.
+ Enrichments name their service in a [RateLimit] section of their .yapsy-plugin file:
+  [RateLimit]
+  Service = whois.cymru.com
+  Rate = 1
+  Burst = 5
+ Where plugins naming the same service disagree, the slowest rate and smallest burst is kept.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+BURST = 1  # Tokens a bucket holds when a plugin sets a rate but no burst
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import threading
+import time
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+
+## EXECUTION
+class TokenBucket():
+    rate = None  # Tokens added per second
+    burst = None  # Tokens the bucket holds when full
+    tokens = None  # Tokens available.  Negative while callers are waiting for reserved tokens.
+    updated = None  # time.time() tokens were last refilled
+    lock = None
+    calls = 0  # Tokens taken
+    waited = 0  # Calls which had to wait for a token
+    wait_seconds = 0.0  # Total seconds callers waited
+    max_wait = 0.0
+
+    def __init__(self, rate, burst=BURST):
+        """
+
+        :param rate: tokens added per second (i.e. requests per second allowed)
+        :param burst: tokens the bucket holds when full (i.e. requests allowed at once after a quiet period)
+        """
+        if rate <= 0:
+            raise ValueError("Rate limit must be positive, not {0}.".format(rate))
+        if burst < 1:
+            raise ValueError("Rate limit burst must be at least 1, not {0}.".format(burst))
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = self.burst
+        self.updated = time.time()
+        self.lock = threading.Lock()
+
+
+    def reserve(self):
+        """ Takes a token, borrowing from the future if the bucket is empty.
+
+        :return: seconds until the reserved token is available
+        """
+        with self.lock:
+            now = time.time()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            self.calls += 1
+            if self.tokens >= 0:
+                return 0.0
+            wait = -self.tokens / self.rate
+            self.waited += 1
+            self.wait_seconds += wait
+            if wait > self.max_wait:
+                self.max_wait = wait
+            return wait
+
+
+    def acquire(self):
+        """ Takes a token, sleeping until one is available.
+
+        :return: seconds waited
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+    def configure(self, rate, burst):
+        with self.lock:
+            self.rate = float(rate)
+            self.burst = float(burst)
+            self.tokens = min(self.tokens, self.burst)
+
+
+    def stats(self):
+        with self.lock:
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'calls': self.calls,
+                'waited': self.waited,
+                'wait_seconds': self.wait_seconds,
+                'max_wait': self.max_wait
+            }
+
+
+class RateLimits():
+    buckets = None  # service -> TokenBucket
+    lock = None
+
+    def __init__(self):
+        self.buckets = dict()
+        self.lock = threading.Lock()
+
+
+    def configure(self, service, rate, burst=BURST):
+        """ Sets a service's limit.  If the service already has one, the slower rate and smaller burst is kept.
+
+        :param service: name of the service (e.g. "whois.cymru.com")
+        :param rate: requests per second
+        :param burst: requests allowed at once
+        :return: the service's bucket
+        """
+        with self.lock:
+            bucket = self.buckets.get(service)
+            if bucket is None:
+                bucket = TokenBucket(rate, burst)
+                self.buckets[service] = bucket
+            elif rate < bucket.rate or burst < bucket.burst:
+                bucket.configure(min(rate, bucket.rate), min(burst, bucket.burst))
+            return bucket
+
+
+    def get(self, service):
+        """
+
+        :return: the service's TokenBucket or None if it isn't limited
+        """
+        return self.buckets.get(service)
+
+
+    def acquire(self, service):
+        """ Takes a token from the service's bucket, sleeping until one is available.
+
+        :return: seconds waited (0 if the service isn't limited)
+        """
+        bucket = self.buckets.get(service)
+        if bucket is None:
+            return 0.0
+        return bucket.acquire()
+
+
+    def stats(self):
+        """
+
+        :return: dictionary of service -> rate, burst, and counts of calls and waits
+        """
+        with self.lock:
+            buckets = dict(self.buckets)
+        return {service: bucket.stats() for service, bucket in buckets.iteritems()}
+
+
+LIMITS = RateLimits()  # The rate limits shared by the apps in the process
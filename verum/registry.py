@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: yapsy
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ A registry of plugins so unchanged plugins aren't re-imported and re-configured each time an app is created.
+
+ NOTES:
+ Plugins are identified by their .yapsy-plugin file and signed by the modification time, size and sha1 of the
+  .yapsy-plugin and module files.  Files whose modification time and size haven't changed aren't re-hashed.
+ Within a process, the configure() results of plugins are shared by every app (e.g. the apps minions create) so
+  they register unchanged plugins without importing them.  Each app still imports and configures its own copy of a
+  plugin when first used, as plugins hold per app state (e.g. a storage plugin's connection and the app's query
+  cache of it, or a minion's thread).
+ Across processes, the configure() results of each plugin are kept in a JSON manifest so the app can register
+  unchanged plugins without importing them.  The plugin is imported and configured when first used.  The manifest
+  is off unless a file is configured.  It records what the app will trust without importing, so keep it somewhere
+  only the app's user can write (e.g. beside the app's config), not a shared directory such as /tmp.
+ Plugins not in the manifest are registered from their .yapsy-plugin file by describe() and are likewise only
+  imported and configured when first used.
+ Files a plugin loads itself (e.g. cymru_api.py) are not part of its signature.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+REGISTRY_FILE = None  # The plugin manifest.  None keeps the registry in memory only.
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import logging
+import threading
+import json
+import os
+import sys
+import hashlib
+from yapsy.PluginManager import PluginManager
+from yapsy.IPlugin import IPlugin
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+LOADED = dict()  # .yapsy-plugin file -> (signature, configure() result) of plugins configured in the process
+LOCK = threading.RLock()  # Guards LOADED and plugin imports
+
+
+## EXECUTION
+def plugin_files(candidate):
+    """ yapsy candidate -> list of files
+
+    :param candidate: a (info file, module path, plugin info) tuple from yapsy's PluginManager.getPluginCandidates()
+    :return: the files the plugin is signed by
+    """
+    infofile, filepath = candidate[0], candidate[1]
+    files = [infofile]
+    if filepath.endswith(".py"):
+        filepath = filepath[:-3]
+    if os.path.isfile(filepath + ".py"):
+        files.append(filepath + ".py")
+    elif os.path.isfile(os.path.join(filepath, "__init__.py")):
+        files.append(os.path.join(filepath, "__init__.py"))
+    return files
+
+
+def sign(files, previous=None):
+    """ list of files, dict -> dict
+
+    :param files: the files to sign
+    :param previous: a previous signature of the files.  Hashes of files with the same mtime and size are reused.
+    :return: dictionary of file -> [mtime, size, sha1]
+    """
+    if previous is None:
+        previous = dict()
+    signature = dict()
+    for f in files:
+        stat = os.stat(f)
+        old = previous.get(f)
+        if old is not None and old[0] == stat.st_mtime and old[1] == stat.st_size:
+            signature[f] = old
+        else:
+            with open(f, 'rb') as fp:
+                signature[f] = [stat.st_mtime, stat.st_size, hashlib.sha1(fp.read()).hexdigest()]
+    return signature
+
+
+def unchanged(signature, previous):
+    """ dict, dict -> bool
+
+    :return: True if both signatures cover the same files with the same contents
+    """
+    if previous is None or set(signature) != set(previous):
+        return False
+    for f in signature:
+        if signature[f][2] != previous[f][2]:
+            return False
+    return True
+
+
+def describe(plugin_info):
+    """ PluginInfo -> list or None
+
+    :param plugin_info: the yapsy plugin info of a located (but not loaded) plugin
+    :return: a list in the form the plugin's configure() returns built from its .yapsy-plugin file, or None if the
+              file doesn't give the plugin's type
+    """
+    details = plugin_info.details
+    if not details.has_section('Configuration') or not details.has_option('Configuration', 'type'):
+        return None
+
+    def option(name, default):
+        if details.has_option('Configuration', name):
+            return details.get('Configuration', name)
+        return default
+
+    plugin_type = details.get('Configuration', 'type').strip().lower()
+    cost = option('cost', 9999)
+    speed = option('speed', 9999)
+    if plugin_type == 'enrichment':
+        inputs = [l.strip().lower() for l in option('inputs', '').split(",") if l.strip()]
+        return [plugin_type, True, plugin_info.name, plugin_info.description, inputs, cost, speed]
+    elif plugin_type == 'interface':
+        return [plugin_type, True, plugin_info.name]
+    elif plugin_type == 'score':
+        return [plugin_type, True, plugin_info.name, plugin_info.description, cost, speed]
+    elif plugin_type == 'minion':
+        return [plugin_type, True, plugin_info.name, plugin_info.description, cost]
+    return None
+
+
+def load_candidate(manager, candidate):
+    """ PluginManager, yapsy candidate -> PluginInfo
+
+    :param manager: the yapsy PluginManager loading the plugin
+    :param candidate: a (info file, module path, plugin info) tuple from yapsy's PluginManager.getPluginCandidates()
+    :return: the plugin info with plugin_object set to an instance of the plugin.  It is not added to the manager's
+              categories so it can be configured first.
+
+    Imports the plugin module the way yapsy's PluginManager.loadPlugins() does, but for a single plugin.
+    """
+    infofile, filepath, plugin_info = candidate
+    if filepath.endswith(".py"):
+        filepath = filepath[:-3]
+    if "__init__" in os.path.basename(filepath):
+        filepath = os.path.dirname(filepath)
+
+    with LOCK:
+        # Attribute a unique module name to the plugin as yapsy does
+        for i in range(len(sys.modules) + 1):
+            module_name = "yapsy_loaded_plugin_{0}_{1}".format(plugin_info.name.replace(" ", "_"), i)
+            if module_name not in sys.modules:
+                break
+        module = PluginManager._importModule(module_name, filepath)
+
+    for element_name in dir(module):
+        element = getattr(module, element_name)
+        try:
+            is_plugin = issubclass(element, IPlugin) and element is not IPlugin
+        except TypeError:
+            continue
+        if is_plugin:
+            plugin_info.plugin_object = manager.instanciateElementWithImportInfo(element, element_name, module_name, filepath)
+            if "Default" not in plugin_info.categories:
+                plugin_info.categories.append("Default")
+            return plugin_info
+
+    raise ValueError("No plugin class found in {0}.".format(filepath))
+
+
+class PluginRegistry():
+    path = None  # The manifest file (None if the registry isn't persisted)
+    manifest = None  # .yapsy-plugin file -> {"signature": signature, "config": configure() result}
+    changed = False  # The manifest has changes not yet saved
+    lock = LOCK  # Guards loading plugins.  Shared by every registry in the process.
+
+    def __init__(self, path=REGISTRY_FILE):
+        """
+
+        :param path: JSON file the plugin manifest is kept in.  None keeps the registry in memory only.
+        """
+        self.path = path
+        self.manifest = dict()
+        if path and os.path.isfile(path):
+            try:
+                with open(path, 'r') as f:
+                    self.manifest = json.load(f)
+            except (IOError, ValueError) as e:
+                logging.warning("Plugin manifest {0} could not be read due to {1}.  Plugins will be reloaded.".format(path, e))
+
+
+    def lookup(self, candidate):
+        """ yapsy candidate -> (signature, configure() result or None)
+
+        :param candidate: a (info file, module path, plugin info) tuple from yapsy's PluginManager.getPluginCandidates()
+        :return: the plugin's current signature and its configure() result if the plugin hasn't changed since it was
+                  last configured (by an app in this process or in the manifest)
+        """
+        infofile = candidate[0]
+        entry = self.manifest.get(infofile, {})
+        with LOCK:
+            loaded = LOADED.get(infofile)
+        previous = entry.get("signature")
+        if loaded is not None:
+            previous = loaded[0]
+        signature = sign(plugin_files(candidate), previous)
+
+        if loaded is not None and unchanged(signature, loaded[0]):
+            return signature, loaded[1]
+        if unchanged(signature, entry.get("signature")):
+            if signature != entry["signature"]:  # Touched but not changed.  Save the new mtimes.
+                entry["signature"] = signature
+                self.changed = True
+            return signature, entry.get("config")
+        return signature, None
+
+
+    def record(self, candidate, signature, config):
+        """
+
+        :param candidate: a (info file, module path, plugin info) tuple from yapsy's PluginManager.getPluginCandidates()
+        :param signature: the plugin's signature from lookup()
+        :param config: the plugin's configure() result
+        """
+        infofile = candidate[0]
+        self.manifest[infofile] = {"signature": signature, "config": config}
+        self.changed = True
+        with LOCK:
+            LOADED[infofile] = (signature, config)
+
+
+    def save(self):
+        """
+
+        Writes the manifest if it has changed.
+        """
+        if not self.path or not self.changed:
+            return
+        tmp = "{0}.{1}.tmp".format(self.path, os.getpid())
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(self.manifest, f)
+            os.rename(tmp, self.path)  # Replace atomically so concurrent apps never read a partial manifest
+            self.changed = False
+        except (IOError, OSError, TypeError, ValueError) as e:
+            logging.warning("Plugin manifest {0} could not be saved due to {1}.".format(self.path, e))
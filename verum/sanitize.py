@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: networkx
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Sanitizes graphs before storage: removes non-ascii characters from attributes and normalizes domains.
+
+ NOTES:
+ Strings already known to be ascii are remembered so the repeated values of a graph (classes, keys, relationships,
+  origins, times) are checked with a single set lookup.  Other strings are stripped with str.translate() or
+  unicode.encode() rather than character by character.
+ Domains are lower cased, lose any trailing ".", and have internationalized labels converted to punycode
+  (e.g. u"B\\xfccher.de" -> "xn--bcher-kva.de").  Nodes whose domain changes are renamed to the URI of the
+  normalized domain and the edge URIs of their edges are rebuilt.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+CACHE_SIZE = 100000  # Strings remembered before the caches are cleared
+DOMAIN_KEYS = ["domain"]  # Node keys whose values are domains
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import logging
+import sys
+import imp
+import os
+import networkx as nx
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+# Shared URI builders (helper loads this module by location so it can't rely on a relative import)
+uris = sys.modules.get("verum.uri", sys.modules.get("verum_uri"))
+if uris is None:
+    fp, pathname, description = imp.find_module("uri", [os.path.dirname(os.path.abspath(__file__))])
+    uris = imp.load_module("verum_uri", fp, pathname, description)
+
+NON_ASCII = "".join(chr(i) for i in range(128, 256))  # Bytes str.translate() deletes
+ASCII = set()  # Strings known to be ascii
+DOMAINS = dict()  # domain -> normalized domain
+
+
+## EXECUTION
+def ascii_only(s):
+    """ str or unicode -> str
+
+    :param s: a string.  Other values are returned unchanged.
+    :return: s with non-ascii characters removed
+    """
+    if not isinstance(s, basestring) or s in ASCII:
+        return s
+    if isinstance(s, str):
+        clean = s.translate(None, NON_ASCII)
+    else:
+        clean = s.encode("ascii", "ignore")
+    if len(ASCII) >= CACHE_SIZE:
+        ASCII.clear()
+    ASCII.add(clean)
+    return clean
+
+
+def domain(d):
+    """ str or unicode -> str
+
+    :param d: a domain (e.g. "WDC-News-post.com." or u"b\\xfccher.de")
+    :return: the domain lower cased, without a trailing ".", and with internationalized labels in punycode
+    """
+    try:
+        return DOMAINS[d]
+    except KeyError:
+        pass
+    except TypeError:  # unhashable
+        return d
+    if not isinstance(d, basestring):
+        return d
+
+    value = d.strip().rstrip(".")
+    if type(value) is str:
+        try:
+            value.decode("ascii")
+        except UnicodeDecodeError:
+            value = value.decode("utf-8", "ignore")
+    if type(value) is unicode:
+        try:
+            value = value.encode("idna")
+        except UnicodeError:
+            logging.debug("Domain {0} is not a valid internationalized domain.".format(repr(d)))
+            value = ascii_only(value)
+    value = value.lower()
+
+    if len(DOMAINS) >= CACHE_SIZE:
+        DOMAINS.clear()
+    DOMAINS[d] = value
+    return value
+
+
+def sanitize_attributes(data):
+    """ Strips non-ascii from the string values of an attribute dictionary in place. """
+    for attr, value in data.iteritems():
+        if isinstance(value, basestring) and value not in ASCII:
+            data[attr] = ascii_only(value)  # Replacing the value of an existing key is safe while iterating
+
+
+def sanitize_graph(g, domains=True):
+    """ networkx graph, bool -> networkx graph
+
+    :param g: A networkx graph.  Modified in place.
+    :param domains: If true, normalize domain nodes with domain()
+    :return: the sanitized graph.  If domain nodes are renamed, this is a new graph rather than g.
+    """
+    renamed = dict()
+    for node, data in g.nodes_iter(data=True):
+        if domains and data.get("key") in DOMAIN_KEYS and isinstance(data.get("value"), basestring):
+            value = domain(data["value"])
+            if value != data["value"]:
+                data["value"] = value
+                node_uri = uris.node_uri(data["key"], value, data.get("class", "attribute"))
+                if "uri" in data:
+                    data["uri"] = node_uri
+                if node_uri != node:
+                    renamed[node] = node_uri
+        sanitize_attributes(data)
+
+    if g.is_multigraph():
+        for _, _, _, data in g.edges_iter(data=True, keys=True):
+            sanitize_attributes(data)
+    else:
+        for _, _, data in g.edges_iter(data=True):
+            sanitize_attributes(data)
+
+    if renamed:
+        g = rename_nodes(g, renamed)
+    return g
+
+
+def sanitize_graphs(graphs, domains=True):
+    """ iterable of networkx graphs -> list of networkx graphs
+
+    :param graphs: graphs to sanitize (e.g. a batch from run_enrichments_many())
+    :param domains: If true, normalize domain nodes with domain()
+    :return: the sanitized graphs
+    """
+    return [sanitize_graph(g, domains) for g in graphs]
+
+
+def rename_nodes(g, renamed):
+    """ networkx graph, dict -> networkx graph
+
+    :param g: A networkx graph
+    :param renamed: dictionary of old node -> new node
+    :return: a new graph with the nodes renamed.  Nodes renamed to the same node are merged.  The URIs of edges
+              touching renamed nodes are rebuilt.
+    """
+    h = g.__class__()
+    h.graph.update(g.graph)
+    for node, data in g.nodes_iter(data=True):
+        h.add_node(renamed.get(node, node), data)
+
+    if g.is_multigraph():
+        for src, dst, key, data in g.edges_iter(data=True, keys=True):
+            new_src, new_dst = renamed.get(src, src), renamed.get(dst, dst)
+            if (new_src != src or new_dst != dst) and isinstance(key, basestring):
+                key = uris.edge_uri(new_src, new_dst, data)
+                if "uri" in data:
+                    data["uri"] = key
+            h.add_edge(new_src, new_dst, key, data)
+    else:
+        for src, dst, data in g.edges_iter(data=True):
+            h.add_edge(renamed.get(src, src), renamed.get(dst, dst), data)
+    return h
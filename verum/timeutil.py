@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: dateutil (optional, for non-canonical time strings)
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Normalizes the start_time and finish_time of nodes and edges.
+
+ NOTES:
+ Times are stored on the graph as ISO 8601 strings in the form "%Y-%m-%dT%H:%M:%SZ" (e.g. 2014-11-01T10:34:00Z).
+  Internally they are compared as integer seconds since the epoch (UTC).
+ Strings already in the canonical form are parsed by slicing rather than strptime or dateutil.  Other strings are
+  parsed by dateutil.  Either way, parsed strings are cached so values repeated across nodes and edges are only
+  parsed once.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+CACHE_SIZE = 10000  # Time strings remembered before the cache is cleared
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import logging
+import calendar
+import time
+from datetime import datetime
+try:
+    import dateutil.parser
+    dateutil_import = True
+except ImportError:
+    dateutil_import = False
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+EPOCHS = dict()  # time string -> epoch seconds (None if it doesn't parse)
+STRINGS = dict()  # epoch seconds -> canonical time string
+NOW = [None, None]  # The second and canonical string of the last call to now()
+
+
+## EXECUTION
+def parse_canonical(t):
+    """ str -> int or None
+
+    :param t: a time string
+    :return: epoch seconds if t is in the canonical form, otherwise None
+    """
+    if len(t) != 20 or t[4] != "-" or t[7] != "-" or t[10] != "T" or t[13] != ":" or t[16] != ":" or t[19] != "Z":
+        return None
+    try:
+        fields = (int(t[0:4]), int(t[5:7]), int(t[8:10]), int(t[11:13]), int(t[14:16]), int(t[17:19]))
+    except ValueError:
+        return None
+    if not (1 <= fields[1] <= 12 and 1 <= fields[2] <= 31 and fields[3] <= 23 and fields[4] <= 59 and fields[5] <= 59):
+        return None
+    return calendar.timegm(fields)
+
+
+def to_epoch(t):
+    """ time -> int or None
+
+    :param t: an ISO 8601 string, datetime (assumed UTC if naive), or epoch seconds
+    :return: integer seconds since the epoch or None if t is empty or can't be parsed
+    """
+    if isinstance(t, basestring):
+        try:
+            return EPOCHS[t]
+        except KeyError:
+            pass
+        epoch = parse_canonical(t)
+        if epoch is None and t and dateutil_import:
+            try:
+                epoch = to_epoch(dateutil.parser.parse(t))
+            except (ValueError, TypeError, OverflowError):
+                logging.debug("Could not parse time {0}.".format(t))
+        if len(EPOCHS) >= CACHE_SIZE:
+            EPOCHS.clear()
+        EPOCHS[t] = epoch
+        return epoch
+    elif isinstance(t, datetime):
+        if t.utcoffset() is not None:
+            return calendar.timegm(t.utctimetuple())
+        return calendar.timegm(t.timetuple())
+    elif isinstance(t, (int, long, float)):
+        return int(t)
+    return None
+
+
+def to_iso(epoch):
+    """ int -> str
+
+    :param epoch: seconds since the epoch
+    :return: the time as a canonical ISO 8601 string
+    """
+    try:
+        return STRINGS[epoch]
+    except KeyError:
+        pass
+    t = time.strftime(ISO_FORMAT, time.gmtime(epoch))
+    if len(STRINGS) >= CACHE_SIZE:
+        STRINGS.clear()
+    STRINGS[epoch] = t
+    return t
+
+
+def now():
+    """ -> str
+
+    :return: the current UTC time as a canonical ISO 8601 string
+    """
+    second = int(time.time())
+    last = NOW
+    if last[0] != second:
+        last = [second, to_iso(second)]
+        NOW[:] = last
+    return last[1]
+
+
+def parse(t):
+    """ time -> str
+
+    :param t: string in ISO 8601 combined date and time format (e.g. 2014-11-01T10:34Z), datetime object, or epoch
+               seconds
+    :return: the time as a canonical ISO 8601 string
+    :raises ValueError: if t is empty or can't be parsed
+    """
+    epoch = to_epoch(t)
+    if epoch is not None and STRINGS.get(epoch) == t:
+        return t  # Already canonical
+    if epoch is None:
+        raise ValueError("Could not parse time {0}.".format(t))
+    return to_iso(epoch)
+
+
+def normalize(start_time):
+    """ time -> str
+
+    :param start_time: string in ISO 8601 combined date and time format (e.g. 2014-11-01T10:34Z), datetime object,
+                        or epoch seconds
+    :return: the time as a canonical ISO 8601 string.  The current time if start_time is empty or can't be parsed.
+
+    Enrichment plugins call this on the start_time passed to run().
+    """
+    try:
+        return parse(start_time)
+    except ValueError:
+        return now()
+
+
+def earlier(t1, t2):
+    """ time, time -> bool
+
+    :return: True if t1 is before t2.  False if either time is unset or can't be parsed.
+    """
+    e1, e2 = to_epoch(t1), to_epoch(t2)
+    if e1 is None or e2 is None:
+        return False
+    return e1 < e2
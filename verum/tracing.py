@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Lightweight span tracing of the app's enrich, store, query, and score calls.
+
+ NOTES:
+ A span times one call and carries attributes such as the topic, plugin, and node count.  Spans opened while
+  another span is open on the same thread are its children and share its trace_id, so a slow investigation can be
+  broken down into the enrichments, writes, and queries it made.  Use wrap() to carry the current span into work
+  run on another thread (e.g. the worker pool).
+ Finished spans are written to a JSONL file, one span per line:
+  {"trace_id": .., "span_id": .., "parent_id": .., "name": .., "start": <epoch seconds>, "duration": <seconds>,
+   "thread": .., "error": <error or null>, "attributes": {..}}
+ Tracing is off until configure() is given a file.  While off, span() returns a shared no-op span.
+ Storage plugins which trace their internals have a tracer attribute, which the app sets to TRACER before calling
+  their configure(), and open spans with its span() so they land in the app's trace even if the plugin loaded its
+  own copy of this module.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+FILE = None  # JSONL file spans are written to.  None to not trace.
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import logging
+import threading
+import random
+import json
+import time
+from contextlib import contextmanager
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+
+## EXECUTION
+class Span():
+    trace_id = None
+    span_id = None
+    parent_id = None  # None for the root span of a trace
+    name = None
+    start = None  # Epoch seconds
+    duration = None  # Seconds
+    thread = None
+    error = None  # repr() of the exception if the call raised
+    attributes = None
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.span_id = new_id()
+        if parent is None:
+            self.trace_id = new_id()
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+        self.attributes = dict(attributes or {})
+        self.thread = threading.current_thread().name
+        self.start = time.time()
+
+
+    def set(self, **attributes):
+        """ Adds attributes to the span (e.g. the node count once a result is known). """
+        self.attributes.update(attributes)
+
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'duration': self.duration,
+            'thread': self.thread,
+            'error': self.error,
+            'attributes': self.attributes
+        }
+
+
+class NullSpan():
+    """ Returned by span() while tracing is off. """
+    trace_id = None
+    span_id = None
+
+    def set(self, **attributes):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer():
+    path = None  # JSONL file spans are written to
+    out = None  # The open file
+    lock = None  # Guards writes to the file
+    local = None  # Per thread stack of open spans
+    spans = 0  # Spans written
+
+    def __init__(self, path=None):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.configure(path)
+
+
+    def configure(self, path):
+        """
+
+        :param path: JSONL file to append spans to.  None to stop tracing.
+        """
+        with self.lock:
+            if self.out is not None:
+                self.out.close()
+                self.out = None
+            self.path = path
+            if path is not None:
+                self.out = open(path, "a")
+
+
+    def stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = list()
+            self.local.stack = stack
+        return stack
+
+
+    def current(self):
+        """
+
+        :return: the innermost open span of this thread or None
+        """
+        stack = getattr(self.local, "stack", None)
+        if stack:
+            return stack[-1]
+        return None
+
+
+    @contextmanager
+    def span(self, name, parent=None, **attributes):
+        """ Times the body of a with statement as a span.
+
+        :param name: name of the span (e.g. "run_query")
+        :param parent: parent span.  Defaults to the innermost open span of this thread.
+        :param attributes: attributes of the span (e.g. topic="1.1.1.1")
+        :return: (yields) the span so attributes can be added with set()
+        """
+        if self.out is None:
+            yield NULL_SPAN
+            return
+        if parent is None:
+            parent = self.current()
+        s = Span(name, parent, attributes)
+        stack = self.stack()
+        stack.append(s)
+        try:
+            yield s
+        except Exception as e:
+            s.error = repr(e)
+            raise
+        finally:
+            s.duration = time.time() - s.start
+            stack.pop()
+            self.export(s)
+
+
+    def wrap(self, fn):
+        """
+
+        :param fn: a function to run on another thread
+        :return: fn, run with the current span of this thread as the parent of its spans
+        """
+        parent = self.current()
+        if parent is None:
+            return fn
+
+        def wrapped(*args, **kwargs):
+            stack = self.stack()
+            stack.append(parent)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stack.pop()
+        return wrapped
+
+
+    def export(self, s):
+        try:
+            line = json.dumps(s.to_dict(), default=repr)
+        except (TypeError, ValueError) as e:
+            logging.debug("Could not serialize span {0} due to {1}.".format(s.name, e))
+            return
+        with self.lock:
+            if self.out is None:
+                return
+            self.out.write(line + "\n")
+            if s.parent_id is None:
+                self.out.flush()  # Flush once per trace rather than per span
+            self.spans += 1
+
+
+    def close(self):
+        self.configure(None)
+
+
+def new_id():
+    return "{0:016x}".format(random.getrandbits(64))
+
+
+TRACER = Tracer(FILE)  # The tracer shared by the app and plugins
+
+
+def configure(path):
+    """
+
+    :param path: JSONL file to append spans to.  None to stop tracing.
+    """
+    TRACER.configure(path)
+
+
+def span(name, parent=None, **attributes):
+    """ See Tracer.span().  e.g.:
+
+    with tracing.span("neo4j.commit", nodes=g.number_of_nodes()) as s:
+        ...
+    """
+    return TRACER.span(name, parent, **attributes)
+
+
+def current():
+    return TRACER.current()
+
+
+def wrap(fn):
+    return TRACER.wrap(fn)
+
+
+def enabled():
+    return TRACER.out is not None
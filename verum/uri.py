@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: None
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ Builds the node and edge URIs used by the enrichment, storage and minion plugins.
+
+ NOTES:
+ Node URIs are "class=<class>&key=<key>&value=<value>".  Edge URIs are
+  "source=<uuid3 of source URI>&destionation=<uuid3 of destination URI>" followed by the relationship chain
+  and origin of the edge.  (The "destionation" spelling is kept so URIs match those already stored.)
+ Results are memoized so the same node URI (e.g. the enrichment node of a plugin) is one shared string and
+  its uuid3 is computed once rather than on every edge.  The memos are bounded and keep recently used entries
+  (see Memo).
+ Run this file to benchmark the builders against building URIs by hand.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+MEMO_SIZE = 100000  # Entries kept in each memo before the least recently used are dropped
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import uuid
+import timeit
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+
+## EXECUTION
+class Memo():
+    """ A bounded memo which keeps recently used entries.
+
+    Entries live in two generations.  New entries go in the current generation.  When it fills, it becomes the
+     previous generation and the old previous generation is dropped.  Entries found in the previous generation are
+     moved back to the current one.  This approximates an LRU with plain dictionary operations, which (unlike an
+     ordered dictionary) are atomic so no lock is needed.
+    """
+    size = None  # Maximum entries per generation
+    current = None
+    previous = None
+
+    def __init__(self, size=MEMO_SIZE):
+        self.size = max(1, int(size))
+        self.current = dict()
+        self.previous = dict()
+
+
+    def get(self, key):
+        """
+
+        :return: the memoized value or None if the key isn't memoized
+        """
+        value = self.current.get(key)
+        if value is None:
+            value = self.previous.get(key)
+            if value is not None:
+                self.put(key, value)
+        return value
+
+
+    def put(self, key, value):
+        if len(self.current) >= self.size:
+            self.previous = self.current
+            self.current = dict()
+        self.current[key] = value
+
+
+    def clear(self):
+        self.current = dict()
+        self.previous = dict()
+
+
+NODE_URIS = Memo()  # (class, key, value) -> node URI
+HASHES = Memo()  # node URI -> str(uuid3)
+EDGE_URIS = Memo()  # (source URI, destination URI, relationship chain, origin) -> edge URI
+
+
+def build(template, *args):
+    """ Formats a unicode result if any argument is unicode so non-ascii values don't raise. """
+    for arg in args:
+        if type(arg) is unicode:
+            return unicode(template).format(*args)
+    return template.format(*args)
+
+
+def node_uri(key, value, cls="attribute"):
+    """ str, str, str -> str
+
+    :param key: the node key (e.g. "domain")
+    :param value: the node value (e.g. "www.google.com")
+    :param cls: the node class
+    :return: the node URI.  Repeated calls return the same string object.
+    """
+    memo_key = (cls, key, value)
+    uri = NODE_URIS.get(memo_key)
+    if uri is None:
+        uri = build("class={0}&key={1}&value={2}", cls, key, value)
+        NODE_URIS.put(memo_key, uri)
+    return uri
+
+
+def uri_hash(uri):
+    """ str -> str
+
+    :param uri: a node URI
+    :return: the string uuid3 of the URI in the URL namespace
+    """
+    h = HASHES.get(uri)
+    if h is None:
+        if type(uri) is unicode:
+            h = str(uuid.uuid3(uuid.NAMESPACE_URL, uri.encode("utf-8")))  # Same hash for ascii.  Doesn't raise on non-ascii.
+        else:
+            h = str(uuid.uuid3(uuid.NAMESPACE_URL, uri))
+        HASHES.put(uri, h)
+    return h
+
+
+def edge_uri(source_uri, dest_uri, edge_attr):
+    """ str, str, dict -> str
+
+    :param source_uri: the URI of the edge's source node
+    :param dest_uri: the URI of the edge's destination node
+    :param edge_attr: the edge's properties.  The relationship chain starts at 'relationship' and follows each
+                       value as the next property name.  'origin' is appended if present.
+    :return: the edge URI
+    """
+    chain = list()
+    rel_chain = "relationship"
+    while rel_chain in edge_attr:
+        chain.append(rel_chain)
+        rel_chain = edge_attr[rel_chain]
+        chain.append(rel_chain)
+    origin = edge_attr.get("origin")
+    memo_key = (source_uri, dest_uri, tuple(chain), origin)
+
+    uri = EDGE_URIS.get(memo_key)
+    if uri is None:
+        uri = build("source={0}&destionation={1}", uri_hash(source_uri), uri_hash(dest_uri))
+        for i in range(0, len(chain), 2):
+            uri += build("&{0}={1}", chain[i], chain[i + 1])
+        if "origin" in edge_attr:
+            uri += build("&{0}={1}", "origin", origin)
+        EDGE_URIS.put(memo_key, uri)
+    return uri
+
+
+def clear():
+    """ Empties the memos. """
+    NODE_URIS.clear()
+    HASHES.clear()
+    EDGE_URIS.clear()
+
+
+def by_hand(domain, ip):
+    """ Builds an edge URI the way the plugins did before this module.  Used by the benchmark. """
+    domain_uri = "class=attribute&key={0}&value={1}".format("domain", domain)
+    ip_uri = "class=attribute&key={0}&value={1}".format("ip", ip)
+    edge_attr = {"relationship": "describedBy", "origin": "dns"}
+    source_hash = uuid.uuid3(uuid.NAMESPACE_URL, domain_uri)
+    dest_hash = uuid.uuid3(uuid.NAMESPACE_URL, ip_uri)
+    uri = "source={0}&destionation={1}".format(str(source_hash), str(dest_hash))
+    rel_chain = "relationship"
+    while rel_chain in edge_attr:
+        uri = uri + "&{0}={1}".format(rel_chain,edge_attr[rel_chain])
+        rel_chain = edge_attr[rel_chain]
+    if "origin" in edge_attr:
+        uri += "&{0}={1}".format("origin", edge_attr["origin"])
+    return uri
+
+
+def memoized(domain, ip):
+    """ Builds the same edge URI as by_hand() with this module.  Used by the benchmark. """
+    return edge_uri(node_uri("domain", domain), node_uri("ip", ip), {"relationship": "describedBy", "origin": "dns"})
+
+
+## MAIN LOOP EXECUTION
+def main():
+    """ Micro-benchmark of building edge URIs by hand vs. with the memoized builders. """
+    number = 100000
+    assert by_hand("www.google.com", "1.1.1.1") == memoized("www.google.com", "1.1.1.1")
+
+    # Repeated: the same enrichment edge built over and over (e.g. domain -> enrichment node)
+    for name, fn in [("by hand", by_hand), ("memoized", memoized)]:
+        seconds = timeit.timeit(lambda: fn("www.google.com", "1.1.1.1"), number=number)
+        print "{0} (repeated edge): {1:,.0f} edge URIs/s".format(name, number / seconds)
+
+    # Distinct: a new source node every time but a shared destination node
+    for name, fn in [("by hand", by_hand), ("memoized", memoized)]:
+        clear()
+        domains = iter(xrange(number))
+        seconds = timeit.timeit(lambda: fn("{0}.com".format(next(domains)), "1.1.1.1"), number=number)
+        print "{0} (distinct edges): {1:,.0f} edge URIs/s".format(name, number / seconds)
+
+
+if __name__ == "__main__":
+    main()
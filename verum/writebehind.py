@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+"""
+ AUTHOR: Gabriel Bassett
+ DATE: 10-18-2026
+ DEPENDENCIES: networkx
+ Copyright 2015 Gabriel Bassett
+
+ LICENSE:
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+ DESCRIPTION:
+ A write-behind buffer which batches graphs stored through a storage plugin.
+
+ NOTES:
+ Graphs put in the buffer are merged into one batch graph, so nodes and edges repeated across graphs are written
+  once (duplicate edges keep the earliest start_time and latest finish_time).  A background thread writes the
+  batch when it reaches a number of nodes or has waited long enough.
+ When the storage falls behind, put() blocks until the pending batches are written rather than letting them grow
+  without bound.
+ Batches which fail to write are retried on the next flush.  After MAX_RETRIES failures the batch is dropped
+  and logged.
+
+"""
+# PRE-USER SETUP
+pass
+
+########### NOT USER EDITABLE ABOVE THIS POINT #################
+
+
+# USER VARIABLES
+BATCH_NODES = 5000  # Nodes in a batch before it is written
+BATCH_SECONDS = 5  # Seconds a graph may wait in the buffer before its batch is written
+MAX_PENDING_NODES = 50000  # Nodes buffered (including a batch being written) before put() blocks
+MAX_RETRIES = 3  # Times a batch is retried before it is dropped
+
+
+########### NOT USER EDITABLE BELOW THIS POINT #################
+
+
+## IMPORTS
+import logging
+import threading
+import time
+from helper import GraphAccumulator
+
+## SETUP
+__author__ = "Gabriel Bassett"
+
+
+## EXECUTION
+class WriteBehind():
+    write = None  # Function writing a graph to the storage
+    name = None  # Name of the storage, for logging
+    batch_nodes = None  # Nodes in a batch before it is written
+    batch_seconds = None  # Seconds a graph waits before its batch is written
+    max_pending = None  # Nodes buffered before put() blocks
+    batch = None  # GraphAccumulator of the batch being filled
+    batch_started = None  # Time the first graph was put in the batch
+    writing = 0  # Nodes in the batch being written
+    retries = 0  # Times the current batch has failed
+    lock = None  # Guards the batch.  Also the condition put() waits on for space.
+    write_lock = None  # Serializes writes so batches are written in order
+    thread = None  # The background thread writing batches
+    closed = False
+    graphs = 0  # Graphs put in the buffer
+    batches = 0  # Batches written
+    nodes = 0  # Nodes written
+    errors = 0  # Failed writes
+    dropped = 0  # Batches dropped after MAX_RETRIES failures
+    blocked = 0.0  # Seconds put() spent waiting for the storage
+
+    def __init__(self, write, name=None, batch_nodes=BATCH_NODES, batch_seconds=BATCH_SECONDS,
+                 max_pending=MAX_PENDING_NODES):
+        """
+
+        :param write: function which writes a networkx graph to the storage (e.g. a storage plugin's enrich())
+        :param name: name of the storage, for logging
+        :param batch_nodes: nodes in a batch before it is written
+        :param batch_seconds: seconds a graph may wait in the buffer before its batch is written
+        :param max_pending: nodes buffered before put() blocks.  At least batch_nodes.
+        """
+        self.write = write
+        self.name = name
+        self.batch_nodes = max(1, int(batch_nodes))
+        self.batch_seconds = float(batch_seconds)
+        self.max_pending = max(self.batch_nodes, int(max_pending))
+        self.batch = GraphAccumulator()
+        self.lock = threading.Condition()
+        self.write_lock = threading.Lock()
+
+
+    def start(self):
+        """
+
+        Starts the background writer.  Called automatically by put().
+        """
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="verum-write-behind-{0}".format(self.name))
+                self.thread.daemon = True  # Call flush() at shutdown.  The writer doesn't keep the interpreter alive.
+                self.thread.start()
+
+
+    def pending(self):
+        """ Nodes buffered, including a batch being written.  Caller holds the lock. """
+        return self.batch.graph.number_of_nodes() + self.writing
+
+
+    def put(self, g):
+        """
+
+        :param g: a networkx graph (or helper GraphAccumulator) to store
+        """
+        if self.closed:
+            raise ValueError("Write-behind buffer for {0} is closed.".format(self.name))
+        if self.thread is None:
+            self.start()
+        with self.lock:
+            if self.pending() >= self.max_pending:
+                start = time.time()
+                while self.pending() >= self.max_pending and not self.closed:
+                    self.lock.wait(self.batch_seconds)
+                self.blocked += time.time() - start
+            if self.batch_started is None:
+                self.batch_started = time.time()
+            self.batch.add(g)
+            self.graphs += 1
+            if self.batch.graph.number_of_nodes() >= self.batch_nodes:
+                self.lock.notify_all()  # Wake the writer
+
+
+    def run(self):
+        while True:
+            with self.lock:
+                while not self.closed and not self.due():
+                    if self.batch_started is None:
+                        self.lock.wait(self.batch_seconds)
+                    else:
+                        self.lock.wait(max(0.01, self.batch_started + self.batch_seconds - time.time()))
+                if self.closed:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error("Write-behind batch to {0} failed with error {1}.".format(self.name, e))
+                time.sleep(self.batch_seconds)  # Back off before retrying
+
+
+    def due(self):
+        """ True if the batch should be written.  Caller holds the lock. """
+        if self.batch_started is None:
+            return False
+        return self.batch.graph.number_of_nodes() >= self.batch_nodes or \
+               time.time() - self.batch_started >= self.batch_seconds
+
+
+    def flush(self):
+        """
+
+        Writes the buffered graphs now.  Call before shutting down.
+        :raises: the storage's error if the write fails.  The batch is kept to be retried.
+        """
+        with self.write_lock:
+            with self.lock:
+                g = self.batch.build()
+                if g.number_of_nodes() == 0:
+                    return
+                self.batch = GraphAccumulator()
+                self.batch_started = None
+                self.writing = g.number_of_nodes()
+            try:
+                self.write(g)
+            except Exception:
+                with self.lock:
+                    self.errors += 1
+                    self.writing = 0
+                    self.retries += 1
+                    if self.retries > MAX_RETRIES:
+                        logging.error("Dropping write-behind batch of {0} nodes to {1} after {2} failures.".format(
+                            g.number_of_nodes(), self.name, self.retries))
+                        self.dropped += 1
+                        self.retries = 0
+                    else:
+                        self.batch = GraphAccumulator(g).add(self.batch)  # Retry ahead of newer graphs
+                        if self.batch_started is None:
+                            self.batch_started = time.time()
+                    self.lock.notify_all()
+                raise
+            with self.lock:
+                self.batches += 1
+                self.nodes += g.number_of_nodes()
+                self.writing = 0
+                self.retries = 0
+                self.lock.notify_all()  # Wake blocked put()s
+
+
+    def close(self):
+        """
+
+        Flushes the buffer and stops the background writer.
+        """
+        try:
+            self.flush()
+        finally:
+            with self.lock:
+                self.closed = True
+                self.lock.notify_all()
+            if self.thread is not None and self.thread is not threading.current_thread():
+                self.thread.join(self.batch_seconds)
+
+
+    def stats(self):
+        """
+
+        :return: dictionary of buffer counters
+        """
+        with self.lock:
+            return {
+                'graphs': self.graphs,
+                'batches': self.batches,
+                'nodes_written': self.nodes,
+                'nodes_pending': self.pending(),
+                'errors': self.errors,
+                'dropped': self.dropped,
+                'seconds_blocked': self.blocked
+            }